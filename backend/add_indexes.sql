@@ -1,3 +1,5 @@
+-- NOTE: superseded by the versioned migrations in app/migrations (python -m app.migrations upgrade).
+-- Kept for reference only; do not apply by hand.
 -- Add performance indexes for faster queries
 CREATE INDEX IF NOT EXISTS idx_cashback_entries_card_id ON cashback_entries(card_id);
 CREATE INDEX IF NOT EXISTS idx_cashback_entries_merchant_id ON cashback_entries(merchant_id);
@@ -1,3 +1,5 @@
+-- NOTE: superseded by the versioned migrations in app/migrations (python -m app.migrations upgrade).
+-- Kept for reference only; do not apply by hand.
 -- Migration Script to convert varchar columns to native Postgres Enums
 -- Run this in your Supabase SQL Editor
 
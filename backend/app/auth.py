@@ -1,5 +1,5 @@
 import os
-import jwt
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
@@ -7,7 +7,7 @@ from sqlmodel import Session, select
 import uuid
 import base64
 
-from app.database import get_session
+from app.database import get_session, primary_session_for
 from app.models import Profile
 
 # Security scheme
@@ -28,11 +28,21 @@ def log_debug(message: str):
     except:
         pass
 
+# pyjwt pulls in cryptography (~35 ms of import time), so it is imported on the
+# first authenticated request instead of at worker startup.
+@lru_cache(maxsize=16)
+def get_jwks_client(jwks_url: str):
+    """One client per issuer, so the fetched signing keys are cached between requests"""
+    import jwt
+    return jwt.PyJWKClient(jwks_url)
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Decodes the JWT token from Supabase and returns the user payload.
     Supports both HS256 (symmetric secret) and ES256/RS256 (JWKS).
     """
+    import jwt
+
     token = credentials.credentials
     
     # Allow Demo Token for Guest Mode (Only if enabled)
@@ -88,7 +98,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             jwks_url = f"{iss}/.well-known/jwks.json"
             
             # Use PyJWKClient to fetch keys
-            jwks_client = jwt.PyJWKClient(jwks_url)
+            jwks_client = get_jwks_client(jwks_url)
             signing_key = jwks_client.get_signing_key_from_jwt(token)
             
             payload = jwt.decode(
@@ -126,7 +136,8 @@ def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depe
     # but since it's a dependency, we can't call it easily without mocking.
     # So we duplicate the core logic or refactor. 
     # For now, let's just copy the robust logic to be safe.
-    
+    import jwt
+
     token = credentials.credentials
     if token == "demo-token":
         return {
@@ -153,7 +164,7 @@ def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depe
         elif alg in ['RS256', 'ES256']:
             unverified_payload = jwt.decode(token, options={"verify_signature": False})
             iss = unverified_payload.get('iss')
-            jwks_client = jwt.PyJWKClient(f"{iss}/.well-known/jwks.json")
+            jwks_client = get_jwks_client(f"{iss}/.well-known/jwks.json")
             signing_key = jwks_client.get_signing_key_from_jwt(token)
             return jwt.decode(token, signing_key.key, algorithms=[alg], audience="authenticated")
             
@@ -209,9 +220,14 @@ def get_current_profile(
             avatar_url=avatar_url,
             role="user"
         )
-        session.add(profile)
-        session.commit()
-        session.refresh(profile)
+        # GET /profile/me may be running on a read replica; profiles are written to the primary
+        write_session = primary_session_for(session)
+        write_session.add(profile)
+        write_session.commit()
+        write_session.refresh(profile)
+        if write_session is not session:
+            write_session.expunge(profile)
+            write_session.close()
         
     return profile
         
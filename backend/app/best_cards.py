@@ -0,0 +1,170 @@
+"""
+"Best card for this merchant" index.
+
+`merchant_best_cards` keeps one row per (merchant, card) with the rate of the
+most trusted entry for that pair, so GET /merchants/{id}/best-cards is a
+single primary-key range read. An entry's confidence combines:
+
+* status: verified > pending > disputed; rejected entries are ignored
+* votes: (up + 1) / (up + down + 2), so an unvoted entry counts as 0.5
+* freshness: halves every BEST_CARD_HALF_LIFE_DAYS since it was last
+  verified (or created), floored at MIN_FRESHNESS
+
+Write paths call refresh_pairs() for the pairs they touched, inside their own
+transaction. Freshness only moves with time, so rebuild() should also run
+periodically (e.g. a nightly cron):
+
+    python -m app.best_cards
+"""
+import os
+import time
+
+import sqlalchemy as sa
+from sqlmodel import Session, select, delete
+
+from app.database import upsert
+from app.models import CashbackEntry, MerchantBestCard, EntryStatus, ist_now
+
+BEST_CARD_HALF_LIFE_DAYS = float(os.environ.get("BEST_CARD_HALF_LIFE_DAYS", "180"))
+MIN_FRESHNESS = 0.25
+STATUS_WEIGHT = {
+    EntryStatus.verified: 1.0,
+    EntryStatus.pending: 0.6,
+    EntryStatus.disputed: 0.25,
+    EntryStatus.rejected: 0.0,
+}
+INSERT_CHUNK = 1000
+
+_ENTRY_COLUMNS = (
+    CashbackEntry.id, CashbackEntry.merchant_id, CashbackEntry.card_id,
+    CashbackEntry.reported_cashback_rate, CashbackEntry.status,
+    CashbackEntry.upvote_count, CashbackEntry.downvote_count,
+    CashbackEntry.last_verified_at, CashbackEntry.created_at,
+)
+_UPDATE_COLUMNS = [
+    "best_entry_id", "rate", "confidence", "score", "entry_count",
+    "verified_count", "last_verified_at", "updated_at",
+]
+
+
+def confidence(status, upvotes: int, downvotes: int, last_verified_at, created_at, now) -> float:
+    weight = STATUS_WEIGHT.get(EntryStatus(status), 0.0)
+    if weight == 0.0:
+        return 0.0
+    votes = (upvotes + 1) / (upvotes + downvotes + 2)
+    age_days = max((now - (last_verified_at or created_at)).total_seconds(), 0) / 86400
+    freshness = max(0.5 ** (age_days / BEST_CARD_HALF_LIFE_DAYS), MIN_FRESHNESS)
+    return weight * votes * freshness
+
+
+def _summarize(merchant_id, card_id, rows, now):
+    """Index row for one pair, or None if no entry counts"""
+    best, best_key = None, None
+    verified, last_verified = 0, None
+    for row in rows:
+        if row.status == EntryStatus.verified:
+            verified += 1
+        if row.last_verified_at and (last_verified is None or row.last_verified_at > last_verified):
+            last_verified = row.last_verified_at
+        conf = confidence(row.status, row.upvote_count, row.downvote_count,
+                          row.last_verified_at, row.created_at, now)
+        if conf == 0.0:
+            continue
+        # Most trusted entry wins; ties go to the higher rate, then the newer entry
+        key = (conf, row.reported_cashback_rate, row.created_at)
+        if best_key is None or key > best_key:
+            best, best_key = row, key
+    if best is None:
+        return None
+    return {
+        "merchant_id": merchant_id,
+        "card_id": card_id,
+        "best_entry_id": best.id,
+        "rate": best.reported_cashback_rate,
+        "confidence": round(best_key[0], 6),
+        "score": round(best.reported_cashback_rate * best_key[0], 6),
+        "entry_count": len(rows),
+        "verified_count": verified,
+        "last_verified_at": last_verified,
+        "updated_at": now,
+    }
+
+
+def refresh_pairs(session: Session, pairs):
+    """
+    Recomputes the index rows for (merchant_id, card_id) pairs. Call before
+    session.commit(); pending entry changes are autoflushed by the select.
+    """
+    pairs = list(set(pairs))
+    if not pairs:
+        return
+    rows = session.exec(
+        select(*_ENTRY_COLUMNS).where(
+            sa.tuple_(CashbackEntry.merchant_id, CashbackEntry.card_id).in_(pairs)
+        )
+    ).all()
+    by_pair = {pair: [] for pair in pairs}
+    for row in rows:
+        by_pair[(row.merchant_id, row.card_id)].append(row)
+
+    now = ist_now()
+    upserts = []
+    for (merchant_id, card_id), pair_rows in by_pair.items():
+        summary = _summarize(merchant_id, card_id, pair_rows, now)
+        if summary:
+            upserts.append(summary)
+        else:
+            session.execute(
+                delete(MerchantBestCard)
+                .where(MerchantBestCard.merchant_id == merchant_id)
+                .where(MerchantBestCard.card_id == card_id)
+            )
+    upsert(session, MerchantBestCard.__table__, upserts,
+           index_elements=["merchant_id", "card_id"], update_columns=_UPDATE_COLUMNS)
+
+
+def refresh_entry(session: Session, entry: CashbackEntry):
+    refresh_pairs(session, [(entry.merchant_id, entry.card_id)])
+
+
+def rebuild(session: Session) -> int:
+    """Recomputes the whole index in one transaction (caller commits)"""
+    now = ist_now()
+    rows = session.exec(
+        select(*_ENTRY_COLUMNS).order_by(CashbackEntry.merchant_id, CashbackEntry.card_id)
+    ).all()
+    session.execute(delete(MerchantBestCard))
+
+    table = MerchantBestCard.__table__
+    batch, total = [], 0
+    pair, pair_rows = None, []
+
+    def flush_pair():
+        nonlocal total
+        summary = _summarize(pair[0], pair[1], pair_rows, now) if pair else None
+        if summary:
+            batch.append(summary)
+            total += 1
+        if len(batch) >= INSERT_CHUNK:
+            session.execute(table.insert(), batch)
+            batch.clear()
+
+    for row in rows:
+        if (row.merchant_id, row.card_id) != pair:
+            flush_pair()
+            pair, pair_rows = (row.merchant_id, row.card_id), []
+        pair_rows.append(row)
+    flush_pair()
+    if batch:
+        session.execute(table.insert(), batch)
+    return total
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = rebuild(session)
+        session.commit()
+    print(f"Rebuilt merchant_best_cards: {count} rows in {time.perf_counter() - started:.1f}s")
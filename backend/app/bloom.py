@@ -0,0 +1,198 @@
+"""
+Negative-lookup filter for merchant names and statement aliases.
+
+Most submissions are for statement names nobody has entered before, so
+create_entry's alias lookup, and then its canonical_name lookup (both
+case-insensitive), usually find nothing. This per-worker Bloom filter holds every
+merchant_aliases.alias_text and merchants.canonical_name (normalized). When it
+says "definitely not there", both queries are skipped. The same applies to
+the exact-alias step of statement matching.
+
+* Sizing: room for twice the current rows (at least BLOOM_MIN_CAPACITY) at
+  BLOOM_FP_RATE, capped at BLOOM_MAX_BYTES. If the cap applies, the actual
+  false-positive rate is higher; bloom_estimated_fp_rate reports it.
+* Built in a background thread started at startup. Until it is ready,
+  every check answers "maybe", so requests just query as before.
+* This worker's inserts are added immediately. Rows created by other
+  workers are added every BLOOM_REFRESH_SECONDS (created_at watermark).
+  The filter is rebuilt, and resized, every BLOOM_REBUILD_SECONDS.
+
+Bloom filters have no false negatives for what they contain. The only gap
+is a row another worker created within the last refresh interval. A
+submission in that window creates a new merchant instead of reusing it,
+the same outcome as a spelling variant (merged later by the clustering job).
+
+Metrics: bloom_checks_total{kind,result}, bloom_false_positives_total{kind},
+bloom_items, bloom_bytes, bloom_estimated_fp_rate.
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from datetime import timedelta
+
+from sqlmodel import Session, select
+
+from app import metrics
+from app.models import Merchant, MerchantAlias
+
+BLOOM_ENABLED = os.environ.get("BLOOM_ENABLED", "true").lower() == "true"
+BLOOM_FP_RATE = float(os.environ.get("BLOOM_FP_RATE", "0.01"))
+BLOOM_MAX_BYTES = int(os.environ.get("BLOOM_MAX_BYTES", str(8 * 1024 * 1024)))
+BLOOM_MIN_CAPACITY = int(os.environ.get("BLOOM_MIN_CAPACITY", "10000"))
+BLOOM_REFRESH_SECONDS = float(os.environ.get("BLOOM_REFRESH_SECONDS", "10"))
+BLOOM_REBUILD_SECONDS = float(os.environ.get("BLOOM_REBUILD_SECONDS", "3600"))
+SYNC_OVERLAP = timedelta(minutes=2)
+
+logger = logging.getLogger("app.bloom")
+
+
+def normalize(text: str) -> str:
+    """Exact matches share a key; so may a few near-misses, which only costs a query"""
+    return " ".join(text.lower().split())
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float, max_bytes: int):
+        bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        self.size = max(8, min(bits, max_bytes * 8))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.items = 0
+        self._lock = threading.Lock()  # bytearray |= is read-modify-write
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        positions = self._positions(key)
+        with self._lock:
+            if all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in positions):
+                return  # already present (or indistinguishable); keeps items an estimate of distinct keys
+            for pos in positions:
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.items += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.items / self.size)) ** self.hashes
+
+
+class _State:
+    def __init__(self, bloom: BloomFilter, watermark):
+        self.bloom = bloom
+        self.watermark = watermark
+
+
+_state = None
+_thread = None
+_start_lock = threading.Lock()
+
+
+def _key(kind: str, text: str) -> str:
+    return f"{kind}:{normalize(text)}"
+
+
+def _report(state: _State):
+    metrics.set_gauge("bloom_items", state.bloom.items)
+    metrics.set_gauge("bloom_bytes", len(state.bloom.bits))
+    metrics.set_gauge("bloom_estimated_fp_rate", round(state.bloom.estimated_fp_rate, 6))
+
+
+def _rows(session: Session, since=None):
+    merchants = select(Merchant.canonical_name, Merchant.created_at)
+    aliases = select(MerchantAlias.alias_text, MerchantAlias.created_at)
+    if since is not None:
+        merchants = merchants.where(Merchant.created_at > since)
+        aliases = aliases.where(MerchantAlias.created_at > since)
+    return [("merchant",) + tuple(row) for row in session.exec(merchants).all()] + \
+           [("alias",) + tuple(row) for row in session.exec(aliases).all()]
+
+
+def _add_rows(state: _State, rows):
+    watermark = state.watermark
+    for kind, text, created_at in rows:
+        state.bloom.add(_key(kind, text))
+        if created_at and (watermark is None or created_at > watermark):
+            watermark = created_at
+    state.watermark = watermark
+
+
+def build(session: Session) -> _State:
+    started = time.perf_counter()
+    rows = _rows(session)
+    capacity = max(2 * len(rows), BLOOM_MIN_CAPACITY)
+    state = _State(BloomFilter(capacity, BLOOM_FP_RATE, BLOOM_MAX_BYTES), None)
+    _add_rows(state, rows)
+    _report(state)
+    metrics.inc("bloom_builds_total")
+    metrics.observe("bloom_build_seconds", time.perf_counter() - started)
+    return state
+
+
+def sync(session: Session, state: _State):
+    since = state.watermark - SYNC_OVERLAP if state.watermark else None
+    _add_rows(state, _rows(session, since))
+    _report(state)
+
+
+def _run():
+    from app.database import engine
+
+    global _state
+    last_build = None
+    while True:
+        try:
+            with Session(engine) as session:
+                if _state is None or time.monotonic() - last_build > BLOOM_REBUILD_SECONDS:
+                    _state = build(session)
+                    last_build = time.monotonic()
+                else:
+                    sync(session, _state)
+        except Exception:
+            logger.exception("Bloom filter refresh failed")
+        time.sleep(BLOOM_REFRESH_SECONDS)
+
+
+def start():
+    """Called from the app lifespan; builds in the background"""
+    global _thread
+    if not BLOOM_ENABLED:
+        return
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="bloom-refresh", daemon=True)
+            _thread.start()
+
+
+def might_exist(kind: str, text: str) -> bool:
+    """False means no row has this alias_text / canonical_name; True means query"""
+    state = _state
+    if state is None or not text:
+        return True
+    found = _key(kind, text) in state.bloom
+    metrics.inc("bloom_checks_total", kind=kind, result="maybe" if found else "miss")
+    return found
+
+
+def false_positive(kind: str):
+    """Call when might_exist() said maybe and the query found nothing"""
+    if _state is not None:
+        metrics.inc("bloom_false_positives_total", kind=kind)
+
+
+def add(kind: str, text: str):
+    """Call when this worker inserts an alias / merchant (before commit is fine)"""
+    state = _state
+    if state is not None and text:
+        state.bloom.add(_key(kind, text))
+
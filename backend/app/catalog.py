@@ -0,0 +1,136 @@
+"""
+Per-worker card catalog.
+
+The card list changes about once a month, so each worker keeps an immutable
+snapshot of the `cards` table indexed by id and slug, with the /cards/
+response bodies pre-serialized. A snapshot is replaced (never mutated) when:
+
+* a Card row is written through the ORM in this worker (after commit),
+* POST /admin/cards/refresh is called,
+* it is older than CARD_CATALOG_TTL_SECONDS - this is how other workers pick
+  up changes, including cards edited directly in Supabase.
+
+Every load takes a version number before it reads, and installs its snapshot
+only if that number is newer than the current snapshot's and than the last
+invalidation, so a slow load that read the table earlier can't overwrite a
+newer one.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from app import metrics
+from app.models import Card
+
+CARD_CATALOG_TTL_SECONDS = float(os.environ.get("CARD_CATALOG_TTL_SECONDS", "300"))
+
+
+class CardCatalog:
+    """Immutable snapshot; build a new one instead of changing this one"""
+
+    def __init__(self, cards, version: int):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.cards = tuple(cards)
+        self.by_id = {card.id: card for card in self.cards}
+        self.by_slug = {card.slug: card for card in self.cards}
+
+        # Same body FastAPI produced when read_cards returned the models
+        rows = jsonable_encoder(self.cards)
+        self._json = {
+            None: json.dumps(rows).encode(),
+            True: json.dumps([r for r in rows if r["active"]]).encode(),
+            False: json.dumps([r for r in rows if not r["active"]]).encode(),
+        }
+        # Content hash, so every worker hands out the same ETag for the same data
+        self.etag = '"cards-' + hashlib.sha1(self._json[None]).hexdigest()[:16] + '"'
+
+    def json_bytes(self, active: Optional[bool] = None) -> bytes:
+        return self._json[active]
+
+    def get(self, card_id) -> Optional[Card]:
+        if not isinstance(card_id, uuid.UUID):
+            try:
+                card_id = uuid.UUID(str(card_id))
+            except ValueError:
+                return None
+        return self.by_id.get(card_id)
+
+    def get_by_slug(self, slug: str) -> Optional[Card]:
+        return self.by_slug.get(slug)
+
+
+_lock = threading.Lock()
+_snapshot: Optional[CardCatalog] = None
+_version = 0  # last version handed out
+_invalidated_version = 0  # loads with a version up to this one read before the last invalidation
+
+
+def _load(session: Session) -> CardCatalog:
+    global _snapshot, _version
+    with _lock:
+        _version += 1
+        version = _version
+    cards = session.exec(select(Card).order_by(Card.created_at, Card.slug)).all()
+    # Detached copies: the snapshot outlives the session and is shared by all threads
+    detached = [Card.model_validate(card.model_dump()) for card in cards]
+    snapshot = CardCatalog(detached, version)
+    with _lock:
+        current = _snapshot
+        if current is not None and current.version > version:
+            return current  # a load that started later already installed newer data
+        if version <= _invalidated_version:
+            return snapshot  # read before the last invalidation: serve it to this caller only
+        _snapshot = snapshot
+    metrics.inc("card_catalog_loads_total")
+    metrics.set_gauge("card_catalog_version", snapshot.version)
+    metrics.set_gauge("card_catalog_size", len(snapshot.cards))
+    return snapshot
+
+
+def get_catalog(session: Session) -> CardCatalog:
+    """Current snapshot; only touches the database when it is missing or expired"""
+    snapshot = _snapshot
+    if snapshot is None or time.monotonic() - snapshot.loaded_at > CARD_CATALOG_TTL_SECONDS:
+        snapshot = _load(session)
+    return snapshot
+
+
+def refresh(session: Session) -> CardCatalog:
+    return _load(session)
+
+
+def invalidate():
+    global _snapshot, _invalidated_version
+    with _lock:
+        _snapshot = None
+        _invalidated_version = _version
+    metrics.inc("card_catalog_invalidations_total")
+
+
+def _mark_dirty(mapper, connection, target):
+    OrmSession.object_session(target).info["card_catalog_dirty"] = True
+
+
+def _after_commit(session):
+    if session.info.pop("card_catalog_dirty", False):
+        invalidate()
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("card_catalog_dirty", None)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Card, _event, _mark_dirty)
+event.listen(OrmSession, "after_commit", _after_commit)
+event.listen(OrmSession, "after_soft_rollback", _after_rollback)
@@ -0,0 +1,143 @@
+"""
+Change feed for client-side mirrors of the entries.
+
+Every insert or update of a cashback entry stamps it with the next
+`change_seq`. Every delete leaves a row in `entry_tombstones` with its own
+sequence number. GET /entries/changes?since=<token> returns what changed
+after the token, found through the change_seq indexes. A sync therefore
+costs O(changes), not O(entries).
+
+Sequence numbers come from one row in `change_counters`. Allocating them
+locks that row until the transaction commits, so numbers become visible in
+commit order: a client that has seen N can never miss a later commit
+carrying a number below N. The price is that entry writes serialize on that
+row for the rest of their transaction; they are short.
+
+An ORM before_flush hook stamps the entries changed in each flush. Core
+statements that write cashback_entries bypass it, so they must call touch()
+(after UPDATE) or tombstone() (before DELETE) themselves.
+"""
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from app import projections
+from app.models import CashbackEntry, ChangeCounter, EntryFeed, EntryTombstone, ist_now
+
+COUNTER = "cashback_entries"
+MAX_LIMIT = 1000
+
+_counters = ChangeCounter.__table__
+_entries = CashbackEntry.__table__
+_tombstones = EntryTombstone.__table__
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def allocate(connection, count: int) -> int:
+    """Reserves `count` consecutive sequence numbers and returns the first"""
+    connection.execute(
+        sa.update(_counters).where(_counters.c.name == COUNTER).values(value=_counters.c.value + count)
+    )
+    last = connection.execute(sa.select(_counters.c.value).where(_counters.c.name == COUNTER)).scalar()
+    return last - count + 1
+
+
+def touch(session, entry_ids):
+    """Stamps entries changed by Core UPDATEs"""
+    entry_ids = list(set(entry_ids))
+    if not entry_ids:
+        return
+    connection = session.connection()
+    first = allocate(connection, len(entry_ids))
+    connection.execute(
+        sa.update(_entries).where(_entries.c.id == sa.bindparam("entry_id")).values(change_seq=sa.bindparam("seq")),
+        [{"entry_id": entry_id, "seq": first + i} for i, entry_id in enumerate(entry_ids)],
+    )
+
+
+def tombstone(session, entry_ids):
+    """Records entries about to be removed by Core DELETEs"""
+    entry_ids = list(set(entry_ids))
+    if not entry_ids:
+        return
+    connection = session.connection()
+    first = allocate(connection, len(entry_ids))
+    now = ist_now()
+    connection.execute(_tombstones.insert(), [
+        {"entry_id": entry_id, "change_seq": first + i, "deleted_at": now}
+        for i, entry_id in enumerate(entry_ids)
+    ])
+
+
+def _before_flush(session, flush_context, instances):
+    changed = [obj for obj in session.new if isinstance(obj, CashbackEntry)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, CashbackEntry) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, CashbackEntry)]
+    if not changed and not deleted:
+        return
+    first = allocate(session.connection(), len(changed)) if changed else None
+    for i, obj in enumerate(changed):
+        obj.change_seq = first + i
+    tombstone(session, deleted)
+
+
+event.listen(OrmSession, "before_flush", _before_flush)
+
+
+def parse_token(token) -> int:
+    if not token:
+        return 0
+    try:
+        since = int(token)
+    except ValueError:
+        raise InvalidToken(token)
+    if since < 0:
+        raise InvalidToken(token)
+    return since
+
+
+def read(session, since: int, limit: int, serialize) -> dict:
+    """
+    Changes after `since`, oldest first, at most `limit` of them.
+    serialize turns an entry_feed row into the response item.
+    """
+    entries = projections.fetch(session,
+        sa.select(_entries.c.id, _entries.c.change_seq)
+        .where(_entries.c.change_seq > since)
+        .order_by(_entries.c.change_seq)
+        .limit(limit + 1)
+    )
+    tombstones = projections.fetch(session,
+        sa.select(_tombstones.c.entry_id, _tombstones.c.change_seq)
+        .where(_tombstones.c.change_seq > since)
+        .order_by(_tombstones.c.change_seq)
+        .limit(limit + 1)
+    )
+    # Each list holds its own limit+1 lowest numbers, so the merged first `limit` are exact
+    merged = sorted(
+        [(row.change_seq, False, row.id) for row in entries] +
+        [(row.change_seq, True, row.entry_id) for row in tombstones]
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changed_ids = [entry_id for _, deleted, entry_id in merged if not deleted]
+    rows = {}
+    if changed_ids:
+        rows = {
+            row.entry_id: row for row in projections.fetch(session,
+                sa.select(*projections.FEED).where(EntryFeed.entry_id.in_(changed_ids))
+            )
+        }
+    return {
+        "entries": [serialize(rows[entry_id]) for entry_id in changed_ids if entry_id in rows],
+        "deleted": [str(entry_id) for _, deleted, entry_id in merged if deleted],
+        "next": str(merged[-1][0] if merged else since),
+        "has_more": has_more,
+    }
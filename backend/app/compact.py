@@ -0,0 +1,68 @@
+"""
+Compact columnar encoding for large feed pages.
+
+Opt in with `?format=compact` or `Accept: application/vnd.cback.compact+json`;
+plain JSON stays the default. Column names are sent once, each entry is an
+array, and merchants, cards and contributors (repeated on every row of a
+filtered page) are sent once in side tables that rows reference by index:
+
+    {
+      "columns": ["id", "statement_name", ..., "merchant", "card", "contributor"],
+      "rows": [["3f2c...", "AMZN Mktp", ..., 0, 0, 1], ...],
+      "merchants": {"columns": ["id", "canonical_name", ...], "rows": [[...]]},
+      "cards": {"columns": [...], "rows": [[...]]},
+      "contributors": {"columns": [...], "rows": [[...]]}
+    }
+
+To decode row r: dict(zip(columns, r)), then replace merchant/card/contributor
+with dict(zip(merchants.columns, merchants.rows[index])) and so on.
+"""
+from fastapi import Request
+
+MEDIA_TYPE = "application/vnd.cback.compact+json"
+
+# Nested objects of a feed row that are dictionary-encoded
+SIDE_TABLES = {
+    "merchant": "merchants",
+    "card": "cards",
+    "contributor": "contributors",
+}
+
+
+def wants_compact(request: Request, response_format: str = None) -> bool:
+    if response_format:
+        return response_format == "compact"
+    return MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def encode(rows: list) -> dict:
+    """Feed rows (dicts as returned by read_entries) -> columnar payload"""
+    columns = []
+    if rows:
+        # *_id columns are in the side tables already
+        skip = {f"{field}_id" for field in SIDE_TABLES}
+        columns = [key for key in rows[0] if key not in skip]
+
+    sides = {field: {"columns": [], "rows": [], "index": {}} for field in SIDE_TABLES}
+    encoded = []
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            side = sides.get(column)
+            if side is not None and value is not None:
+                key = value["id"]
+                index = side["index"].get(key)
+                if index is None:
+                    if not side["columns"]:
+                        side["columns"] = list(value)
+                    index = side["index"][key] = len(side["rows"])
+                    side["rows"].append([value.get(name) for name in side["columns"]])
+                value = index
+            values.append(value)
+        encoded.append(values)
+
+    payload = {"columns": columns, "rows": encoded}
+    for field, name in SIDE_TABLES.items():
+        payload[name] = {"columns": sides[field]["columns"], "rows": sides[field]["rows"]}
+    return payload
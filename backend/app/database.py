@@ -1,5 +1,13 @@
 import os
-from sqlmodel import SQLModel, create_engine, Session
+import hashlib
+import logging
+import threading
+import time
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlmodel import create_engine, Session
+
+from app import query_stats
 
 # Use DATABASE_URL env var if available, otherwise default to local sqlite
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./backend_app.db")
@@ -11,14 +19,14 @@ DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./backend_app.db")
 # For SQLite, we need connect_args={"check_same_thread": False}
 connect_args = {"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 
-print(f"DATABASE_URL: {DATABASE_URL[:60]}...")
-print(f"Using {'SQLite' if 'sqlite' in DATABASE_URL else 'PostgreSQL'}")
-
 engine = create_engine(DATABASE_URL, connect_args=connect_args)
 
+# Per-request query counting / timing (see app/query_stats.py)
+event.listen(engine, "before_cursor_execute", query_stats.before_cursor_execute)
+event.listen(engine, "after_cursor_execute", query_stats.after_cursor_execute)
+
 # Enable WAL mode for SQLite for better concurrency
 if "sqlite" in DATABASE_URL:
-    from sqlalchemy import event
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
@@ -26,9 +34,147 @@ if "sqlite" in DATABASE_URL:
         cursor.execute("PRAGMA synchronous=NORMAL")
         cursor.close()
 
-def get_session():
-    with Session(engine) as session:
+# Optional read replica: GET/HEAD handlers read from it unless the client wrote
+# recently (sticky to primary) or the replica is lagging/unreachable
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+STICKY_PRIMARY_SECONDS = float(os.environ.get("STICKY_PRIMARY_SECONDS", "10"))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_SECONDS = float(os.environ.get("REPLICA_CHECK_SECONDS", "5"))
+READ_METHODS = {"GET", "HEAD"}
+STICKY_COOKIE = "cback_primary_until"
+
+replica_engine = None
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, pool_pre_ping=True)
+    event.listen(replica_engine, "before_cursor_execute", query_stats.before_cursor_execute)
+    event.listen(replica_engine, "after_cursor_execute", query_stats.after_cursor_execute)
+
+_replica_healthy = False  # until the first lag check passes
+_recent_writers = {}  # client key -> monotonic time until which reads go to the primary
+_monitor = None
+
+# 0 when caught up (an idle primary would otherwise look like growing lag)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+def _client_key(request: Request) -> str:
+    # The bearer token identifies the user without decoding it; anonymous clients by address
+    auth = request.headers.get("authorization")
+    if auth:
+        return hashlib.sha1(auth.encode()).hexdigest()
+    return request.client.host if request.client else "unknown"
+
+def _sticky_to_primary(request: Request) -> bool:
+    until = _recent_writers.get(_client_key(request))
+    if until and until > time.monotonic():
+        return True
+    # Set by whichever worker handled the write
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def mark_write(request: Request, response):
+    """Called for every successful non-GET request: read your own writes for a while"""
+    if replica_engine is None or request.method in READ_METHODS or response.status_code >= 400:
+        return
+    if len(_recent_writers) > 10000:
+        now = time.monotonic()
+        for key, until in list(_recent_writers.items()):
+            if until < now:
+                _recent_writers.pop(key, None)
+    _recent_writers[_client_key(request)] = time.monotonic() + STICKY_PRIMARY_SECONDS
+    secure = request.url.scheme == "https"
+    response.set_cookie(
+        STICKY_COOKIE, str(int(time.time() + STICKY_PRIMARY_SECONDS) + 1),
+        max_age=int(STICKY_PRIMARY_SECONDS) + 1, httponly=True,
+        samesite="none" if secure else "lax", secure=secure,
+    )
+
+def check_replica():
+    """One lag probe; routes reads back to the primary when it fails or lags"""
+    global _replica_healthy
+    from app import metrics
+    try:
+        with replica_engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+            else:
+                conn.execute(text("SELECT 1"))
+                lag = 0.0
+    except Exception as exc:
+        if _replica_healthy:
+            logging.getLogger("app.database").warning("Replica unreachable, reading from primary: %s", exc)
+        _replica_healthy = False
+        metrics.set_gauge("db_replica_healthy", 0)
+        return
+    metrics.set_gauge("db_replica_lag_seconds", lag)
+    healthy = lag <= REPLICA_MAX_LAG_SECONDS
+    if healthy != _replica_healthy:
+        logging.getLogger("app.database").warning(
+            "Replica %s (lag %.1fs)", "back in rotation" if healthy else "lagging, reading from primary", lag
+        )
+    _replica_healthy = healthy
+    metrics.set_gauge("db_replica_healthy", int(healthy))
+
+def _monitor_loop():
+    while True:
+        check_replica()
+        time.sleep(REPLICA_CHECK_SECONDS)
+
+def start_replica_monitor():
+    global _monitor
+    if replica_engine is not None and _monitor is None:
+        check_replica()
+        _monitor = threading.Thread(target=_monitor_loop, name="replica-monitor", daemon=True)
+        _monitor.start()
+
+if replica_engine is not None:
+    @event.listens_for(replica_engine, "handle_error")
+    def _replica_error(context):
+        # Fail over right away on a dropped connection; the monitor restores it
+        global _replica_healthy
+        if context.is_disconnect:
+            _replica_healthy = False
+
+def describe_database() -> str:
+    """For the startup log line; never includes credentials"""
+    url = engine.url
+    return f"{url.get_backend_name()} {url.host or url.database}"
+
+def upsert(session, table, rows, index_elements, update_columns, increment_columns=()):
+    """
+    INSERT ... ON CONFLICT DO UPDATE for Postgres and SQLite (both support it).
+    update_columns are overwritten, increment_columns are added to the existing row.
+    """
+    if not rows:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(table).values(rows)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    set_.update({column: table.c[column] + stmt.excluded[column] for column in increment_columns})
+    stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+    session.execute(stmt)
+
+def get_session(request: Request = None):
+    bind = engine
+    if (replica_engine is not None and _replica_healthy and request is not None
+            and request.method in READ_METHODS and not _sticky_to_primary(request)):
+        bind = replica_engine
+    if replica_engine is not None:
+        from app import metrics
+        metrics.inc("db_sessions_total", target="replica" if bind is replica_engine else "primary")
+    with Session(bind) as session:
+        session.info["replica"] = bind is replica_engine
         yield session
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+def primary_session_for(session: Session) -> Session:
+    """For the rare write inside a GET handler: a primary session if `session` is a replica one"""
+    if session.info.get("replica"):
+        return Session(engine)
+    return session
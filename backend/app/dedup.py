@@ -0,0 +1,230 @@
+"""
+One row per (card, merchant, statement name).
+
+An entry's key is its card, its merchant and `statement_key`, the statement
+name lowercased with whitespace collapsed. create_entry looks the key up
+before inserting. A resubmission at the same rate becomes a confirmation: an
+upvote from the submitter, or a fresh last_verified_at on a verified entry
+when the submitter already vouches for it. A resubmission at another rate
+becomes a rate suggestion. The unique index uq_cashback_entries_statement_key
+turns a concurrent double insert into an IntegrityError, which create_entry
+handles as a confirmation too.
+
+Rows written before the key existed may repeat it, so migration m0007 only
+creates the unique index when there are no duplicates. Otherwise, merge them
+offline, in batches of groups with one transaction per batch, and the job
+then creates the index:
+
+    python -m app.dedup [--batch 200]
+
+For each group, the survivor is the verified entry, then the one with the
+best net votes, then the oldest. The other entries' votes move to it (one
+per user, the survivor's own votes win), as do their comments and rate
+suggestions. Their contributors count as upvotes, and if their rate differs
+it is recorded as a pending suggestion. Then they are deleted through the
+ORM, so entry_feed and the change feed (tombstones) follow.
+"""
+import argparse
+import time
+import uuid
+
+import sqlalchemy as sa
+from sqlmodel import Session, select
+
+from app import changes, entry_feed, trust  # noqa: F401 - register the hooks that follow entry writes
+from app.models import (
+    CashbackEntry, EntryVote, EntryComment, RateSuggestion, MerchantBestCard,
+    VoteType, EntryStatus, SuggestionStatus,
+)
+
+UNIQUE_INDEX = "uq_cashback_entries_statement_key"
+KEY_COLUMNS = "card_id, merchant_id, statement_key"
+BATCH = 200
+MERGED_REASON = "Merged from a duplicate entry"
+
+
+def statement_key(statement_name: str) -> str:
+    return " ".join(statement_name.lower().split())
+
+
+def find_existing(session: Session, card_id, merchant_id, statement_name: str):
+    return session.exec(
+        select(CashbackEntry)
+        .where(CashbackEntry.card_id == card_id)
+        .where(CashbackEntry.merchant_id == merchant_id)
+        .where(CashbackEntry.statement_key == statement_key(statement_name))
+    ).first()
+
+
+def backfill_keys(connection, batch: int = 1000) -> int:
+    """Sets statement_key where it is missing; connection is a Session or Connection"""
+    table = CashbackEntry.__table__
+    rows = connection.execute(
+        sa.select(table.c.id, table.c.statement_name).where(table.c.statement_key.is_(None))
+    ).all()
+    update = sa.update(table).where(table.c.id == sa.bindparam("entry_id")).values(statement_key=sa.bindparam("key"))
+    for start in range(0, len(rows), batch):
+        connection.execute(update, [
+            {"entry_id": row.id, "key": statement_key(row.statement_name)} for row in rows[start:start + batch]
+        ])
+    return len(rows)
+
+
+def duplicate_groups(connection, limit: int = None) -> list:
+    table = CashbackEntry.__table__
+    query = (
+        sa.select(table.c.card_id, table.c.merchant_id, table.c.statement_key)
+        .where(table.c.statement_key.is_not(None))
+        .group_by(table.c.card_id, table.c.merchant_id, table.c.statement_key)
+        .having(sa.func.count() > 1)
+    )
+    if limit:
+        query = query.limit(limit)
+    return [tuple(row) for row in connection.execute(query).all()]
+
+
+def _survivor_order(entry: CashbackEntry):
+    return (
+        entry.status != EntryStatus.verified,
+        -(entry.upvote_count - entry.downvote_count),
+        entry.created_at,
+    )
+
+
+def merge_group(session: Session, entries: list, survivor: CashbackEntry = None) -> CashbackEntry:
+    """Merges entries into `survivor`, by default the best of them (caller commits); returns it"""
+    from app.routers.votes import update_status
+
+    if survivor is None:
+        survivor = min(entries, key=_survivor_order)
+    losers = [entry for entry in entries if entry is not survivor]
+    loser_ids = [entry.id for entry in losers]
+
+    # Votes: one per user; the survivor's existing votes win
+    votes_table = EntryVote.__table__
+    votes = session.execute(
+        sa.select(votes_table).where(votes_table.c.entry_id.in_([survivor.id] + loser_ids)).order_by(votes_table.c.created_at)
+    ).all()
+    voters = {vote.user_id for vote in votes if vote.entry_id == survivor.id}
+    moved = []
+    for vote in votes:
+        if vote.entry_id != survivor.id and vote.user_id not in voters:
+            voters.add(vote.user_id)
+            moved.append({"user_id": vote.user_id, "vote_type": vote.vote_type, "created_at": vote.created_at})
+    session.execute(sa.delete(votes_table).where(votes_table.c.entry_id.in_(loser_ids)))
+
+    # Resubmissions at the same rate are confirmations, at another rate suggestions
+    suggestions = RateSuggestion.__table__
+    pending = {
+        (row.user_id, row.proposed_rate) for row in session.execute(
+            sa.select(suggestions.c.user_id, suggestions.c.proposed_rate)
+            .where(suggestions.c.entry_id.in_([survivor.id] + loser_ids))
+            .where(suggestions.c.status == SuggestionStatus.pending)
+        ).all()
+    }
+    new_suggestions = []
+    for loser in losers:
+        if loser.reported_cashback_rate != survivor.reported_cashback_rate:
+            if (loser.contributor_id, loser.reported_cashback_rate) not in pending:
+                pending.add((loser.contributor_id, loser.reported_cashback_rate))
+                new_suggestions.append({
+                    "id": uuid.uuid4(), "entry_id": survivor.id, "user_id": loser.contributor_id,
+                    "proposed_rate": loser.reported_cashback_rate, "reason": MERGED_REASON,
+                    "status": SuggestionStatus.pending, "upvotes": 0, "downvotes": 0,
+                    "created_at": loser.created_at,
+                })
+        elif loser.contributor_id != survivor.contributor_id and loser.contributor_id not in voters:
+            voters.add(loser.contributor_id)
+            moved.append({"user_id": loser.contributor_id, "vote_type": VoteType.up, "created_at": loser.created_at})
+    if moved:
+        session.execute(votes_table.insert(), [dict(vote, entry_id=survivor.id) for vote in moved])
+    if new_suggestions:
+        session.execute(suggestions.insert(), new_suggestions)
+
+    session.execute(sa.update(suggestions).where(suggestions.c.entry_id.in_(loser_ids)).values(entry_id=survivor.id))
+    comments = EntryComment.__table__
+    session.execute(sa.update(comments).where(comments.c.entry_id.in_(loser_ids)).values(entry_id=survivor.id))
+    best = MerchantBestCard.__table__
+    session.execute(sa.update(best).where(best.c.best_entry_id.in_(loser_ids)).values(best_entry_id=survivor.id))
+
+    survivor.upvote_count += sum(1 for vote in moved if vote["vote_type"] == VoteType.up)
+    survivor.downvote_count += sum(1 for vote in moved if vote["vote_type"] == VoteType.down)
+    verified_at = [entry.last_verified_at for entry in entries if entry.last_verified_at]
+    if verified_at:
+        survivor.last_verified_at = max(verified_at)
+    update_status(survivor)
+    session.add(survivor)
+    for loser in losers:
+        session.delete(loser)
+    return survivor
+
+
+def merge_batch(session: Session, groups: list, tags: set = None) -> int:
+    """
+    Merges the given duplicate groups (caller commits); returns the number of entries removed.
+    Adds the feed cache tags of every merged entry, card and merchant to `tags` if given.
+    """
+    from app import best_cards
+
+    entries = session.exec(
+        select(CashbackEntry).where(
+            sa.tuple_(CashbackEntry.card_id, CashbackEntry.merchant_id, CashbackEntry.statement_key).in_(groups)
+        )
+    ).all()
+    by_group = {}
+    for entry in entries:
+        by_group.setdefault((entry.card_id, entry.merchant_id, entry.statement_key), []).append(entry)
+
+    removed = 0
+    for group in by_group.values():
+        if len(group) > 1:
+            if tags is not None:
+                tags.update(f"entry:{entry.id}" for entry in group)
+                tags.update((f"card:{group[0].card_id}", f"merchant:{group[0].merchant_id}"))
+            merge_group(session, group)
+            removed += len(group) - 1
+    best_cards.refresh_pairs(session, [(merchant_id, card_id) for card_id, merchant_id, _ in by_group])
+    return removed
+
+
+def create_unique_index(connection):
+    from app.migrations.helpers import create_index
+
+    create_index(connection, UNIQUE_INDEX, "cashback_entries", KEY_COLUMNS, unique=True)
+
+
+def run(engine, batch: int = BATCH) -> dict:
+    from app import feed_cache
+
+    with Session(engine) as session:
+        keys = backfill_keys(session)
+        session.commit()
+
+    groups = removed = 0
+    while True:
+        with Session(engine) as session:
+            pending = duplicate_groups(session, batch)
+            if not pending:
+                break
+            tags = set()
+            removed += merge_batch(session, pending, tags)
+            session.commit()
+        groups += len(pending)
+        feed_cache.invalidate("feed", *sorted(tags))
+
+    with Session(engine) as session:
+        create_unique_index(session.connection())
+        session.commit()
+    return {"keys_backfilled": keys, "groups_merged": groups, "entries_removed": removed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate cashback entries")
+    parser.add_argument("--batch", type=int, default=BATCH, help="duplicate groups per transaction")
+    args = parser.parse_args()
+
+    from app.database import engine
+
+    started = time.perf_counter()
+    result = run(engine, args.batch)
+    print(f"{result} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,160 @@
+"""
+Denormalized feed read model.
+
+`entry_feed` holds one row per cashback entry. The merchant, card and
+contributor fields the feed shows are inlined, together with its sort keys,
+so GET /entries/ and GET /entries/{id} are single-table indexed reads with no
+joins and no relationship loads.
+
+The table is kept in sync inside the writing transaction:
+
+* An after_flush hook on every ORM session copies inserted entries (one
+  INSERT ... SELECT), updates the changed columns of updated entries, and
+  deletes the rows of deleted entries.
+* Merchant, card and profile edits are copied to the rows of their entries.
+  On Postgres, triggers (migration m0004) do this, so edits made directly in
+  Supabase are picked up too. On other databases the same hook does it.
+
+Core statements (e.g. session.execute(update(CashbackEntry)...)) bypass the
+hook. Call refresh_entries() with the ids they touched. To rebuild from
+scratch:
+
+    python -m app.entry_feed
+"""
+import time
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+
+from app.models import CashbackEntry, Merchant, Card, Profile, EntryFeed
+
+CHUNK = 500
+
+# Copied as-is from cashback_entries
+ENTRY_COLUMNS = [
+    "card_id", "merchant_id", "contributor_id", "statement_name", "reported_cashback_rate",
+    "mcc", "notes", "status", "upvote_count", "downvote_count",
+    "created_at", "updated_at", "last_verified_at", "trust_score",
+]
+# Changing one of these changes the inlined names too
+_REJOIN_COLUMNS = {"card_id", "merchant_id", "contributor_id"}
+
+# model -> (entry_feed key column, {model column: entry_feed column})
+DIMENSIONS = {
+    Merchant: ("merchant_id", {
+        "canonical_name": "merchant_name",
+        "category": "merchant_category",
+        "default_mcc": "merchant_default_mcc",
+    }),
+    Card: ("card_id", {
+        "slug": "card_slug",
+        "name": "card_name",
+        "issuer": "card_issuer",
+        "network": "card_network",
+        "max_cashback_rate": "card_max_cashback_rate",
+    }),
+    Profile: ("contributor_id", {
+        "display_name": "contributor_name",
+    }),
+}
+
+_table = EntryFeed.__table__
+_FEED_COLUMNS = ["entry_id"] + ENTRY_COLUMNS + [
+    column for _, mapping in DIMENSIONS.values() for column in mapping.values()
+]
+
+
+def _source():
+    """SELECT producing entry_feed rows, columns in _FEED_COLUMNS order"""
+    columns = [CashbackEntry.id] + [getattr(CashbackEntry, name) for name in ENTRY_COLUMNS]
+    for model, (_, mapping) in DIMENSIONS.items():
+        columns += [getattr(model, name) for name in mapping]
+    return (
+        sa.select(*columns)
+        .join(Merchant, Merchant.id == CashbackEntry.merchant_id)
+        .join(Card, Card.id == CashbackEntry.card_id)
+        .outerjoin(Profile, Profile.id == CashbackEntry.contributor_id)
+    )
+
+
+def _copy(connection, entry_ids):
+    for start in range(0, len(entry_ids), CHUNK):
+        chunk = entry_ids[start:start + CHUNK]
+        connection.execute(
+            _table.insert().from_select(_FEED_COLUMNS, _source().where(CashbackEntry.id.in_(chunk)))
+        )
+
+
+def _delete(connection, entry_ids):
+    for start in range(0, len(entry_ids), CHUNK):
+        connection.execute(sa.delete(_table).where(_table.c.entry_id.in_(entry_ids[start:start + CHUNK])))
+
+
+def refresh_entries(connection, entry_ids):
+    """Re-copies entries from the source tables; connection is a Session or Connection"""
+    entry_ids = list(set(entry_ids))
+    if entry_ids:
+        _delete(connection, entry_ids)
+        _copy(connection, entry_ids)
+
+
+def rebuild(session: Session) -> int:
+    """Recomputes the whole table in one transaction (caller commits)"""
+    session.execute(sa.delete(_table))
+    session.execute(_table.insert().from_select(_FEED_COLUMNS, _source()))
+    return session.execute(sa.select(sa.func.count()).select_from(_table)).scalar()
+
+
+def _changed(obj, names):
+    state = sa.inspect(obj)
+    return [name for name in names if state.attrs[name].history.has_changes()]
+
+
+def _after_flush(session, flush_context):
+    # Instances still show their pre-flush state and history here
+    new_ids, rejoin_ids, deleted_ids, updates, dimension_updates = [], [], [], [], []
+    for obj in session.new:
+        if isinstance(obj, CashbackEntry):
+            new_ids.append(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, CashbackEntry):
+            deleted_ids.append(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, CashbackEntry):
+            changed = _changed(obj, ENTRY_COLUMNS)
+            if _REJOIN_COLUMNS.intersection(changed):
+                rejoin_ids.append(obj.id)
+            elif changed:
+                updates.append((obj.id, {name: getattr(obj, name) for name in changed}))
+        elif type(obj) in DIMENSIONS:
+            key, mapping = DIMENSIONS[type(obj)]
+            changed = _changed(obj, mapping)
+            if changed:
+                dimension_updates.append((key, obj.id, {mapping[name]: getattr(obj, name) for name in changed}))
+
+    if not (new_ids or rejoin_ids or deleted_ids or updates or dimension_updates):
+        return
+    connection = session.connection()
+    _copy(connection, new_ids)
+    refresh_entries(connection, rejoin_ids)
+    _delete(connection, deleted_ids)
+    for entry_id, values in updates:
+        connection.execute(sa.update(_table).where(_table.c.entry_id == entry_id).values(**values))
+    if connection.dialect.name != "postgresql":  # Postgres has triggers for these
+        for key, key_value, values in dimension_updates:
+            connection.execute(sa.update(_table).where(_table.c[key] == key_value).values(**values))
+
+
+event.listen(OrmSession, "after_flush", _after_flush)
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = rebuild(session)
+        session.commit()
+    print(f"Rebuilt entry_feed: {count} rows in {time.perf_counter() - started:.1f}s")
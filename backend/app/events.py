@@ -0,0 +1,225 @@
+"""
+Live update bus for Server-Sent Events.
+
+Write handlers publish small event dicts after commit:
+
+    events.publish({"type": "entry", "entry_id": ..., "card_id": ..., ...})
+
+The message goes to a broker, which delivers it to the bus of every worker
+(including this one). Each bus hands it to its subscribers for
+"entry:<entry_id>" and "card:<card_id>".
+
+* LocalBroker (default) delivers in-process only. It is fine for one worker
+  and is what tests use.
+* RedisBroker (EVENTS_REDIS_URL, needs the redis package) fans out across
+  workers and instances over one pub/sub channel.
+
+Subscribers coalesce snapshots: a pending event is replaced by a newer one
+with the same key, and a subscriber flushes at most once per
+EVENTS_COALESCE_SECONDS. Keys:
+
+* entry: (entry, entry_id), the entry's current counts and status, so a
+  hot entry costs each client at most one message per interval
+* suggestion: (suggestion, suggestion_id), the suggestion's current state
+* comment: (comment, comment id); every comment is delivered
+
+A subscriber that falls more than EVENTS_MAX_PENDING distinct events behind
+gets its pending events replaced by one {"type": "resync"}, after which the
+client refetches instead of receiving a partial history.
+
+Handlers are sync and run in the threadpool while subscribers live on the
+event loop, so delivery goes through loop.call_soon_threadsafe.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+from app import metrics
+
+EVENTS_REDIS_URL = os.environ.get("EVENTS_REDIS_URL")
+EVENTS_COALESCE_SECONDS = float(os.environ.get("EVENTS_COALESCE_SECONDS", "0.5"))
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get("EVENTS_MAX_SUBSCRIBERS", "1000"))
+EVENTS_MAX_PENDING = int(os.environ.get("EVENTS_MAX_PENDING", "500"))
+EVENTS_REDIS_TIMEOUT_SECONDS = float(os.environ.get("EVENTS_REDIS_TIMEOUT_SECONDS", "5"))
+CHANNEL = "cback:events"
+
+logger = logging.getLogger("app.events")
+
+RESYNC = {"type": "resync"}
+
+
+def coalesce_key(event: dict) -> tuple:
+    """Events with the same key are snapshots of the same thing; the newest wins"""
+    kind = event.get("type")
+    if kind == "comment":
+        return kind, (event.get("comment") or {}).get("id")
+    if kind == "suggestion":
+        return kind, event.get("suggestion_id")
+    return kind, event.get("entry_id")
+
+
+class Subscription:
+    def __init__(self, loop, topics):
+        self.loop = loop
+        self.topics = topics
+        self.pending = {}  # coalesce_key -> latest event
+        self.wakeup = asyncio.Event()
+        self.last_flush = 0.0
+
+    def offer(self, event):
+        """Runs on the event loop"""
+        key = coalesce_key(event)
+        if key in self.pending:
+            metrics.inc("events_coalesced_total")
+        elif len(self.pending) >= EVENTS_MAX_PENDING or "resync" in self.pending:
+            # Too far behind to catch up item by item: the client refetches
+            metrics.inc("events_resync_total")
+            self.pending = {"resync": RESYNC}
+            self.wakeup.set()
+            return
+        self.pending[key] = event
+        self.wakeup.set()
+
+    async def next_batch(self, timeout: float):
+        """Coalesced events since the last call; [] on timeout (send a heartbeat)"""
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        wait = self.last_flush + EVENTS_COALESCE_SECONDS - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self.wakeup.clear()
+        batch, self.pending = list(self.pending.values()), {}
+        self.last_flush = time.monotonic()
+        return batch
+
+
+class Bus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}  # topic -> set of Subscription
+
+    def subscribe(self, topics) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), topics)
+        with self.lock:
+            if sum(len(subs) for subs in self.subscriptions.values()) >= EVENTS_MAX_SUBSCRIBERS:
+                raise OverflowError("Too many live subscribers")
+            for topic in topics:
+                self.subscriptions.setdefault(topic, set()).add(subscription)
+            metrics.set_gauge("events_subscribers", self._count())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            for topic in subscription.topics:
+                subs = self.subscriptions.get(topic)
+                if subs:
+                    subs.discard(subscription)
+                    if not subs:
+                        del self.subscriptions[topic]
+            metrics.set_gauge("events_subscribers", self._count())
+
+    def _count(self):
+        return len({sub for subs in self.subscriptions.values() for sub in subs})
+
+    def dispatch(self, event: dict):
+        """Any thread; delivers to subscribers of the event's entry and card topics"""
+        topics = [f"entry:{event.get('entry_id')}"]
+        if event.get("card_id"):
+            topics.append(f"card:{event['card_id']}")
+        with self.lock:
+            targets = {sub for topic in topics for sub in self.subscriptions.get(topic, ())}
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                pass  # loop closed (worker shutting down)
+        metrics.inc("events_dispatched_total", type=event.get("type", "unknown"))
+
+
+class LocalBroker:
+    name = "local"
+
+    def __init__(self, bus: Bus):
+        self.bus = bus
+
+    def publish(self, event: dict):
+        self.bus.dispatch(event)
+
+
+class RedisBroker:
+    name = "redis"
+
+    def __init__(self, bus: Bus, url: str):
+        import redis
+        self.bus = bus
+        # Timeouts so an unreachable or half-open server raises instead of hanging
+        # the request or the listener thread; health checks ping idle connections
+        self.client = redis.Redis.from_url(
+            url,
+            socket_timeout=EVENTS_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=EVENTS_REDIS_TIMEOUT_SECONDS,
+            health_check_interval=30,
+        )
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(**{CHANNEL: self._on_message})
+        self.thread = self.pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._on_error)
+
+    def _on_error(self, error, pubsub, thread):
+        # Keep listening; the next read reconnects and resubscribes
+        metrics.inc("events_broker_errors_total")
+        logger.warning("Live event listener error: %s", error)
+        time.sleep(1.0)
+
+    def _on_message(self, message):
+        try:
+            self.bus.dispatch(json.loads(message["data"]))
+        except Exception:
+            logger.exception("Bad live event from broker")
+
+    def publish(self, event: dict):
+        self.client.publish(CHANNEL, json.dumps(event, default=str))
+
+
+bus = Bus()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Raises if EVENTS_REDIS_URL is set but the server cannot be reached;
+    nothing is cached then, so the next call tries again.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker = None
+                if EVENTS_REDIS_URL:
+                    try:
+                        broker = RedisBroker(bus, EVENTS_REDIS_URL)
+                    except ImportError:
+                        logger.warning("EVENTS_REDIS_URL is set but redis is not installed; live updates stay in-process")
+                _broker = broker or LocalBroker(bus)
+    return _broker
+
+
+def set_broker(broker):
+    """For tests / custom transports"""
+    global _broker
+    _broker = broker
+
+
+def publish(event: dict):
+    """Call after commit. Never raises: live updates are best effort"""
+    try:
+        get_broker().publish(event)
+        metrics.inc("events_published_total", type=event.get("type", "unknown"))
+    except Exception:
+        metrics.inc("events_publish_errors_total")
+        logger.exception("Publishing live event failed")
@@ -0,0 +1,230 @@
+"""
+Feed page cache.
+
+Caches the anonymous part of GET /entries/ pages (everything except
+user_vote, which read_entries overlays per request) keyed by the normalized
+query parameters. Invalidation is by tag version: every cached page records
+the versions of its tags, and a write bumps the tags it affects, which makes
+every page carrying them stale at once.
+
+Page tags:
+* "card:<id>" / "merchant:<id>" for pages filtered by them, "feed" otherwise
+  (which entries are on the page can change)
+* "sort:<sort>" (ordering can change without touching the page's entries)
+* "entry:<id>" for each entry shown (its counts/status/rate can change)
+
+Writers call invalidate() AFTER commit. Readers call begin() before their
+query and store() skips the page if any write was invalidated in between, so
+a page read before a commit is never stored under the new versions.
+
+Backends: in-process LRU (default, per worker) or Redis when
+FEED_CACHE_REDIS_URL is set and the redis package is installed (shared by
+all workers).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app import metrics
+
+FEED_CACHE_ENABLED = os.environ.get("FEED_CACHE_ENABLED", "true").lower() == "true"
+FEED_CACHE_TTL_SECONDS = int(os.environ.get("FEED_CACHE_TTL_SECONDS", "60"))
+FEED_CACHE_MAX_PAGES = int(os.environ.get("FEED_CACHE_MAX_PAGES", "2000"))
+FEED_CACHE_REDIS_URL = os.environ.get("FEED_CACHE_REDIS_URL")
+SORTS = ("merchant", "cashback-high", "cashback-low", "verified", "newest", "trusted")
+
+logger = logging.getLogger("app.feed_cache")
+
+
+class InProcessBackend:
+    name = "memory"
+
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self.lock = threading.Lock()
+        self.pages = OrderedDict()  # key -> (expires_at, tags, versions, rows)
+        # Versions are kept only for tags some cached page carries, so this stays
+        # bounded by the pages; an in-flight read of a dropped tag is caught by seq
+        self.tags = {}  # tag -> version
+        self.refs = {}  # tag -> number of cached pages carrying it
+        self.seq = 0
+
+    def _drop(self, key):
+        """Removes a page and the versions of tags no other page carries (caller holds the lock)"""
+        page = self.pages.pop(key, None)
+        if page is None:
+            return
+        for tag in page[1]:
+            self.refs[tag] -= 1
+            if not self.refs[tag]:
+                del self.refs[tag]
+                self.tags.pop(tag, None)
+
+    def get(self, key):
+        with self.lock:
+            page = self.pages.get(key)
+            if page is None:
+                return None, False
+            expires_at, tags, versions, rows = page
+            if expires_at < time.monotonic() or versions != tuple(self.tags.get(t, 0) for t in tags):
+                self._drop(key)
+                return None, True
+            self.pages.move_to_end(key)
+            return rows, False
+
+    def begin(self):
+        return self.seq
+
+    def put(self, key, rows, tags, token, ttl):
+        with self.lock:
+            if self.seq != token:
+                return False
+            self._drop(key)
+            tags = tuple(dict.fromkeys(tags))
+            for tag in tags:
+                self.refs[tag] = self.refs.get(tag, 0) + 1
+            versions = tuple(self.tags.get(t, 0) for t in tags)
+            self.pages[key] = (time.monotonic() + ttl, tags, versions, rows)
+            while len(self.pages) > self.max_pages:
+                self._drop(next(iter(self.pages)))
+            return True
+
+    def bump(self, tags):
+        with self.lock:
+            for tag in tags:
+                if tag in self.refs:
+                    self.tags[tag] = self.tags.get(tag, 0) + 1
+            self.seq += 1
+
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
+            self.tags.clear()
+            self.refs.clear()
+
+
+class RedisBackend:
+    name = "redis"
+    PREFIX = "cback:feed:"
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.25)
+
+    def _versions(self, tags):
+        if not tags:
+            return []
+        return [int(v or 0) for v in self.client.mget([self.PREFIX + "tag:" + t for t in tags])]
+
+    def get(self, key):
+        raw = self.client.get(self.PREFIX + "page:" + key)
+        if raw is None:
+            return None, False
+        page = json.loads(raw)
+        if page["versions"] != self._versions(page["tags"]):
+            return None, True
+        return page["rows"], False
+
+    def begin(self):
+        return int(self.client.get(self.PREFIX + "seq") or 0)
+
+    def put(self, key, rows, tags, token, ttl):
+        # Not atomic with bump(); a write landing in this window is bounded by the TTL
+        if self.begin() != token:
+            return False
+        page = {"tags": list(tags), "versions": self._versions(list(tags)), "rows": rows}
+        self.client.set(self.PREFIX + "page:" + key, json.dumps(page), ex=ttl)
+        return True
+
+    def bump(self, tags):
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.incr(self.PREFIX + "tag:" + tag)
+        pipe.incr(self.PREFIX + "seq")
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(self.PREFIX + "page:*"):
+            self.client.delete(key)
+
+
+def _make_backend():
+    if FEED_CACHE_REDIS_URL:
+        try:
+            return RedisBackend(FEED_CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("FEED_CACHE_REDIS_URL is set but redis is not installed; using the in-process feed cache")
+    return InProcessBackend(FEED_CACHE_MAX_PAGES)
+
+
+backend = _make_backend()
+
+
+def page_key(card_id=None, merchant_id=None, search=None, sort=None, offset=0, limit=20) -> str:
+    """Parameters that produce the same SQL produce the same key"""
+    sort = sort if sort in SORTS else "merchant"
+    search = search.lower() if search else ""
+    return json.dumps([str(card_id or ""), str(merchant_id or ""), search, sort, offset, limit])
+
+
+def page_tags(card_id, merchant_id, sort, entry_ids):
+    sort = sort if sort in SORTS else "merchant"
+    tags = [f"sort:{sort}"]
+    if card_id:
+        tags.append(f"card:{card_id}")
+    if merchant_id:
+        tags.append(f"merchant:{merchant_id}")
+    if not card_id and not merchant_id:
+        tags.append("feed")
+    tags.extend(f"entry:{entry_id}" for entry_id in entry_ids)
+    return tags
+
+
+def _guard(default):
+    """A cache outage must never fail a request; fall back to the database"""
+    def wrap(fn):
+        def inner(*args, **kwargs):
+            if not FEED_CACHE_ENABLED:
+                return default
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                metrics.inc("feed_cache_errors_total", backend=backend.name)
+                logger.exception("Feed cache %s failed", fn.__name__)
+                return default
+        return inner
+    return wrap
+
+
+@_guard(None)
+def lookup(key):
+    rows, stale = backend.get(key)
+    if rows is not None:
+        metrics.inc("feed_cache_hits_total")
+    else:
+        metrics.inc("feed_cache_misses_total", reason="stale" if stale else "absent")
+    return rows
+
+
+@_guard(None)
+def begin():
+    return backend.begin()
+
+
+@_guard(False)
+def store(key, rows, tags, token):
+    if token is None:
+        return False
+    stored = backend.put(key, rows, tags, token, FEED_CACHE_TTL_SECONDS)
+    if not stored:
+        metrics.inc("feed_cache_store_skipped_total")
+    return stored
+
+
+@_guard(None)
+def invalidate(*tags):
+    backend.bump(tags)
+    metrics.inc("feed_cache_invalidations_total")
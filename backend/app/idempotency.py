@@ -0,0 +1,193 @@
+"""
+Idempotency-Key support for write requests.
+
+Mobile clients retry writes on flaky networks. A retry of POST /entries/ or
+POST /comments/ would write twice (and award reputation twice), and a retried
+vote would toggle the vote back off. A client that sends the same
+`Idempotency-Key: <uuid>` header on every attempt gets the first attempt's
+response back instead, without the write running again.
+
+* Applies to POST/PUT/PATCH/DELETE requests that carry the header; others
+  pass through untouched.
+* Keys are scoped to the caller (JWT `sub`; anonymous callers share one
+  scope). The table stores only a hash of caller + key, a fingerprint of
+  method, path, query and body, and the zlib-compressed response with its
+  headers (Location, Set-Cookie, ...).
+* The same key with a different request -> 422. The same key while the first
+  request is still running -> 409 with Retry-After; a reservation older than
+  IDEMPOTENCY_LOCK_SECONDS is treated as abandoned and taken over.
+* 5xx and 429 responses are not stored, so the retry runs the request again.
+* Rows expire after IDEMPOTENCY_TTL_SECONDS. Each worker deletes expired rows
+  every IDEMPOTENCY_PURGE_SECONDS, through the expires_at index.
+
+Replayed responses carry `Idempotent-Replayed: true`.
+Metrics: idempotency_requests_total{result}.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import timedelta
+
+import sqlalchemy as sa
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+
+from app import metrics
+from app.models import IdempotencyKey, ist_now
+
+IDEMPOTENCY_ENABLED = os.environ.get("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_LOCK_SECONDS = float(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_PURGE_SECONDS = float(os.environ.get("IDEMPOTENCY_PURGE_SECONDS", "300"))
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+UNSTORED_STATUS = {429}
+UNSTORED_HEADERS = {"content-length"}
+
+_table = IdempotencyKey.__table__
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def _digest(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _caller(authorization: str) -> str:
+    """JWT subject, verified the same way the routes do it"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return "anonymous"
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.auth import get_optional_user
+
+    payload = get_optional_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=authorization[7:]))
+    return f"user:{payload.get('sub')}" if payload else "invalid"
+
+
+def _purge(conn, now):
+    global _last_purge
+    if time.monotonic() - _last_purge < IDEMPOTENCY_PURGE_SECONDS or not _purge_lock.acquire(blocking=False):
+        return
+    try:
+        _last_purge = time.monotonic()
+        conn.execute(sa.delete(_table).where(_table.c.expires_at < now))
+    finally:
+        _purge_lock.release()
+
+
+def _reserve(key: str, fingerprint: str):
+    """("reserved" | "replay" | "mismatch" | "in_progress", stored row or None)"""
+    from app.database import engine
+
+    now = ist_now()
+    with engine.begin() as conn:
+        _purge(conn, now)
+        row = conn.execute(sa.select(_table).where(_table.c.key == key)).first()
+        if row is not None and row.expires_at > now:
+            if row.fingerprint != fingerprint:
+                return "mismatch", None
+            if row.status_code is not None:
+                return "replay", row
+            if row.created_at > now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS):
+                return "in_progress", None
+            # The first attempt died without an answer: take the key over
+            taken = conn.execute(
+                sa.update(_table)
+                .where(_table.c.key == key).where(_table.c.created_at == row.created_at)
+                .values(created_at=now, expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS))
+            ).rowcount
+            return ("reserved" if taken else "in_progress"), None
+        if row is not None:
+            conn.execute(sa.delete(_table).where(_table.c.key == key))  # expired
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(_table.insert().values(
+                key=key, fingerprint=fingerprint, created_at=now,
+                expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            ))
+    except IntegrityError:
+        return "in_progress", None  # a concurrent attempt reserved it first
+    return "reserved", None
+
+
+def _store(key: str, status_code: int, raw_headers, body: bytes):
+    from app.database import engine
+
+    headers = [
+        [name.decode("latin-1"), value.decode("latin-1")]
+        for name, value in raw_headers if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+    ]
+    content_type = next((value for name, value in headers if name.lower() == "content-type"), None)
+    with engine.begin() as conn:
+        conn.execute(
+            sa.update(_table).where(_table.c.key == key)
+            .values(status_code=status_code, content_type=content_type, headers=json.dumps(headers),
+                    body=zlib.compress(body))
+        )
+
+
+def _replay(row) -> Response:
+    if row.headers is None:  # stored before headers were kept
+        return Response(content=zlib.decompress(row.body), status_code=row.status_code, media_type=row.content_type,
+                        headers={"Idempotent-Replayed": "true"})
+    response = Response(content=zlib.decompress(row.body), status_code=row.status_code,
+                        headers={"Idempotent-Replayed": "true"})
+    for name, value in json.loads(row.headers):
+        response.headers.append(name, value)  # append: keeps repeated headers such as Set-Cookie
+    return response
+
+
+def _release(key: str):
+    from app.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(sa.delete(_table).where(_table.c.key == key).where(_table.c.status_code.is_(None)))
+
+
+async def middleware(request: Request, call_next):
+    idempotency_key = request.headers.get(HEADER)
+    if not IDEMPOTENCY_ENABLED or not idempotency_key or request.method not in WRITE_METHODS:
+        return await call_next(request)
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        return JSONResponse(status_code=400, content={"detail": f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters"})
+
+    body = await request.body()  # cached on the request; the route reads it again
+    caller = await run_in_threadpool(_caller, request.headers.get("authorization"))
+    key = _digest(caller, idempotency_key)
+    fingerprint = _digest(request.method, request.url.path, request.url.query, body)
+    result, row = await run_in_threadpool(_reserve, key, fingerprint)
+    metrics.inc("idempotency_requests_total", result=result)
+
+    if result == "mismatch":
+        return JSONResponse(status_code=422, content={"detail": "Idempotency-Key was already used for a different request"})
+    if result == "in_progress":
+        return JSONResponse(status_code=409, content={"detail": "A request with this Idempotency-Key is in progress"},
+                            headers={"Retry-After": "1"})
+    if result == "replay":
+        return _replay(row)
+
+    try:
+        response = await call_next(request)
+        content = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        await run_in_threadpool(_release, key)
+        raise
+
+    if response.status_code >= 500 or response.status_code in UNSTORED_STATUS:
+        await run_in_threadpool(_release, key)
+    else:
+        await run_in_threadpool(_store, key, response.status_code, response.raw_headers, content)
+    buffered = Response(content=content, status_code=response.status_code)
+    buffered.raw_headers = response.raw_headers
+    return buffered
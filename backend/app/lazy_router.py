@@ -0,0 +1,57 @@
+"""
+Deferred router loading.
+
+A LazyRouter is a placeholder route covering a path prefix. The first request
+under that prefix imports the router module, includes it in the app, drops
+the placeholder and re-dispatches, so rarely used routers (admin, feedback)
+cost nothing at worker startup.
+"""
+import importlib
+
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+from app import metrics
+
+
+class LazyRouter(BaseRoute):
+    def __init__(self, app, prefix: str, module: str):
+        self.app = app
+        self.prefix = prefix
+        self.module = module
+        self.loaded = False
+
+    def matches(self, scope):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def load(self):
+        # Runs on the event loop thread without awaiting, so no other request
+        # can see a half-updated route list
+        if self.loaded:
+            return
+        module = importlib.import_module(self.module)
+        self.app.include_router(module.router)
+        self.app.router.routes.remove(self)
+        self.app.openapi_schema = None
+        self.loaded = True
+        metrics.inc("lazy_routers_loaded_total", module=self.module)
+
+    async def handle(self, scope, receive, send):
+        self.load()
+        await self.app.router(scope, receive, send)
+
+    def url_path_for(self, name, **path_params):
+        raise NoMatchFound(name, path_params)
+
+
+def include_lazy(app, prefix: str, module: str):
+    app.router.routes.append(LazyRouter(app, prefix, module))
+
+
+def load_all(app):
+    for route in list(app.router.routes):
+        if isinstance(route, LazyRouter):
+            route.load()
@@ -0,0 +1,252 @@
+"""
+Contributor leaderboard (GET /profile/leaderboard).
+
+Each worker keeps the top LEADERBOARD_TOP_K profiles by reputation_score:
+one global list, and one per card (contributors of that card's entries) for
+the last MAX_CARD_BOARDS cards asked for. They are loaded through the
+reputation index and reloaded after LEADERBOARD_TTL_SECONDS, which is how
+changes made by other workers arrive. This worker's own changes are applied
+as they commit:
+
+* a profile on a list gets its new score and the list is re-sorted
+* a profile off the global list that now beats its last entry joins it
+* a list that can no longer be trusted (someone on a full list dropped
+  below its last entry, a card gained a contributor) is dropped and
+  reloaded on the next request
+
+"My rank" is 1 + the number of profiles with a higher score. Globally it
+comes from a per-worker histogram (score -> profiles), loaded with one
+GROUP BY over the index and updated on each change. Per card it is one
+query over that card's contributors.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+
+from app import metrics
+from app.models import Profile, CashbackEntry, EntryFeed
+
+LEADERBOARD_TOP_K = int(os.environ.get("LEADERBOARD_TOP_K", "100"))
+LEADERBOARD_TTL_SECONDS = float(os.environ.get("LEADERBOARD_TTL_SECONDS", "300"))
+MAX_CARD_BOARDS = 200
+
+_COLUMNS = (Profile.id, Profile.display_name, Profile.avatar_url, Profile.reputation_score)
+
+_lock = threading.Lock()
+_global = None
+_cards = OrderedDict()  # card_id -> Board, least recently used first
+_histogram = None
+
+
+class Board:
+    def __init__(self, rows: list, card_id=None):
+        self.rows = rows  # dicts, best first; replaced under _lock
+        self.card_id = card_id
+        self.loaded_at = time.monotonic()
+
+    @property
+    def full(self) -> bool:
+        """Profiles may exist below the last row"""
+        return len(self.rows) >= LEADERBOARD_TOP_K
+
+    def ranked(self, limit: int) -> list:
+        """Rows with competition ranks (ties share a rank)"""
+        result, rank, previous = [], 0, None
+        for position, row in enumerate(self.rows[:limit]):
+            if row["reputation_score"] != previous:
+                rank, previous = position + 1, row["reputation_score"]
+            result.append(dict(row, rank=rank))
+        return result
+
+
+class Histogram:
+    def __init__(self, counts: dict):
+        self.counts = counts
+        self.loaded_at = time.monotonic()
+
+    def rank(self, score: int) -> int:
+        return 1 + sum(count for value, count in self.counts.items() if value > score)
+
+    def move(self, old: Optional[int], new: Optional[int]):
+        if old is not None:
+            self.counts[old] = self.counts.get(old, 0) - 1
+            if self.counts[old] <= 0:
+                del self.counts[old]
+        if new is not None:
+            self.counts[new] = self.counts.get(new, 0) + 1
+
+
+def _row(row) -> dict:
+    return {
+        "id": str(row.id),
+        "display_name": row.display_name,
+        "avatar_url": row.avatar_url,
+        "reputation_score": row.reputation_score,
+    }
+
+
+def _expired(cached) -> bool:
+    return cached is None or time.monotonic() - cached.loaded_at > LEADERBOARD_TTL_SECONDS
+
+
+def _contributors(card_id):
+    return sa.select(EntryFeed.contributor_id).where(EntryFeed.card_id == card_id)
+
+
+def _load(session: Session, card_id=None) -> Board:
+    query = sa.select(*_COLUMNS)
+    if card_id is not None:
+        query = query.where(Profile.id.in_(_contributors(card_id)))
+    rows = session.connection().execute(
+        query.order_by(Profile.reputation_score.desc()).limit(LEADERBOARD_TOP_K)
+    ).all()
+    metrics.inc("leaderboard_loads_total", scope="card" if card_id else "global")
+    return Board([_row(row) for row in rows], card_id)
+
+
+def board(session: Session, card_id=None) -> Board:
+    """The global or per-card list; only queries when it is missing or expired"""
+    global _global
+    cached = _global if card_id is None else _cards.get(card_id)
+    if not _expired(cached):
+        if card_id is not None:
+            with _lock:
+                if card_id in _cards:
+                    _cards.move_to_end(card_id)
+        return cached
+    loaded = _load(session, card_id)
+    with _lock:
+        if card_id is None:
+            _global = loaded
+        else:
+            _cards[card_id] = loaded
+            _cards.move_to_end(card_id)
+            while len(_cards) > MAX_CARD_BOARDS:
+                _cards.popitem(last=False)
+    return loaded
+
+
+def global_rank(session: Session, score: int) -> int:
+    global _histogram
+    histogram = _histogram
+    if _expired(histogram):
+        rows = session.connection().execute(
+            sa.select(Profile.reputation_score, sa.func.count()).group_by(Profile.reputation_score)
+        ).all()
+        histogram = Histogram({value: count for value, count in rows})
+        with _lock:
+            _histogram = histogram
+    with _lock:
+        return histogram.rank(score)
+
+
+def card_rank(session: Session, card_id, profile_id, score: int) -> Optional[int]:
+    """None if the profile has no entry on the card"""
+    cached = board(session, card_id)
+    for row in cached.ranked(len(cached.rows)):
+        if row["id"] == str(profile_id):
+            return row["rank"]
+    if not cached.full:
+        return None  # every contributor is on the list
+    connection = session.connection()
+    if connection.execute(_contributors(card_id).where(EntryFeed.contributor_id == profile_id).limit(1)).first() is None:
+        return None
+    higher = connection.execute(
+        sa.select(sa.func.count()).select_from(Profile)
+        .where(Profile.id.in_(_contributors(card_id)))
+        .where(Profile.reputation_score > score)
+    ).scalar()
+    return higher + 1
+
+
+def _apply(cached: Board, row: dict, member: bool) -> bool:
+    """
+    Applies a score change; False if the board has to be reloaded. member:
+    whether the profile belongs on the board at all (unknown for cards).
+    """
+    rows = [existing for existing in cached.rows if existing["id"] != row["id"]]
+    last = cached.rows[-1]["reputation_score"] if cached.rows else None
+    if len(rows) < len(cached.rows):
+        if cached.full and row["reputation_score"] < last:
+            return False  # someone below the list may now rank higher
+    elif not cached.full:
+        if not member:
+            return True  # every contributor is listed, and new ones drop the board
+    elif row["reputation_score"] <= last:
+        return True
+    elif not member:
+        return False  # is this profile a contributor? ask the database
+    rows.append(row)
+    rows.sort(key=lambda existing: -existing["reputation_score"])
+    # Replaced, not changed in place: requests read the rows without the lock
+    cached.rows = rows[:LEADERBOARD_TOP_K]
+    return True
+
+
+def apply_changes(changes: list, new_cards: set):
+    """changes: (row, old score or None if unknown, inserted); called after commit"""
+    global _global, _histogram
+    with _lock:
+        for card_id in new_cards:
+            _cards.pop(card_id, None)
+        for row, old, inserted in changes:
+            if _global is not None and not _apply(_global, row, member=True):
+                _global = None
+            for card_id, cached in list(_cards.items()):
+                if not _apply(cached, row, member=False):
+                    del _cards[card_id]
+            if _histogram is not None:
+                if inserted:
+                    _histogram.move(None, row["reputation_score"])
+                elif old is None:
+                    _histogram = None
+                else:
+                    _histogram.move(old, row["reputation_score"])
+
+
+def _profile_inserted(mapper, connection, target):
+    OrmSession.object_session(target).info.setdefault("leaderboard_changes", []).append(
+        (_row(target), None, True)
+    )
+
+
+def _profile_updated(mapper, connection, target):
+    state = sa.inspect(target)
+    history = state.attrs.reputation_score.history
+    if history.has_changes():
+        old = history.deleted[0] if history.deleted else None
+    elif any(state.attrs[name].history.has_changes() for name in ("display_name", "avatar_url")):
+        old = target.reputation_score
+    else:
+        return
+    OrmSession.object_session(target).info.setdefault("leaderboard_changes", []).append((_row(target), old, False))
+
+
+def _entry_inserted(mapper, connection, target):
+    OrmSession.object_session(target).info.setdefault("leaderboard_cards", set()).add(target.card_id)
+
+
+def _after_commit(session):
+    changes = session.info.pop("leaderboard_changes", None)
+    new_cards = session.info.pop("leaderboard_cards", None)
+    if changes or new_cards:
+        apply_changes(changes or [], new_cards or set())
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("leaderboard_changes", None)
+    session.info.pop("leaderboard_cards", None)
+
+
+event.listen(Profile, "after_insert", _profile_inserted)
+event.listen(Profile, "after_update", _profile_updated)
+event.listen(CashbackEntry, "after_insert", _entry_inserted)
+event.listen(OrmSession, "after_commit", _after_commit)
+event.listen(OrmSession, "after_soft_rollback", _after_rollback)
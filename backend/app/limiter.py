@@ -1,4 +1,8 @@
+import os
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+# Benchmarks / load tests from a single IP turn this off
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+limiter = Limiter(key_func=get_remote_address, enabled=RATE_LIMIT_ENABLED)
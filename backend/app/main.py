@@ -1,3 +1,6 @@
+import time
+_import_started = time.perf_counter()
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -5,16 +8,29 @@ except ImportError:
     pass # Cloudflare Workers has no dotenv, ignores it
 
 import os
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import create_db_and_tables
-from app.routers import entries
+from fastapi.responses import JSONResponse
+from app.database import engine, describe_database, start_replica_monitor, mark_write
+from app.migrations import check_schema
+from app import metrics, query_stats, idempotency
+from app.lazy_router import include_lazy, load_all
 from contextlib import asynccontextmanager
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_db_and_tables()
+    # One SELECT on schema_version when up to date; migrates (once, under a lock) when behind
+    check_schema(engine)
+    start_replica_monitor()
+    from app import bloom
+    bloom.start() # builds in a background thread
+    startup_seconds = time.perf_counter() - _import_started
+    metrics.set_gauge("startup_seconds", startup_seconds)
+    logging.getLogger("uvicorn.error").info(
+        "Worker ready in %.0f ms (%s)", startup_seconds * 1000, describe_database()
+    )
     yield
 
 app = FastAPI(lifespan=lifespan)
@@ -30,6 +46,51 @@ from app.limiter import limiter
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+from app.single_flight import SingleFlightTimeout
+
+@app.exception_handler(SingleFlightTimeout)
+async def single_flight_timeout_handler(request: Request, exc: SingleFlightTimeout):
+    # An identical request is still running; don't pile another query on top of it
+    return JSONResponse(status_code=503, content={"detail": "Busy, please retry"}, headers={"Retry-After": "1"})
+
+_first_request_seen = False
+
+def _record_first_request():
+    global _first_request_seen
+    _first_request_seen = True
+    metrics.set_gauge("startup_first_request_seconds", time.perf_counter() - _import_started)
+
+@app.middleware("http")
+async def track_queries(request: Request, call_next):
+    if not _first_request_seen:
+        _record_first_request()
+    stats, token = query_stats.start(request.url.path)
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.stop(token)
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", "unmatched")
+    metrics.inc("http_requests_total", route=route_path)
+    metrics.observe("db_queries_per_request", stats.count, route=route_path)
+    metrics.observe("db_seconds_per_request", stats.total_time, route=route_path)
+
+    budget_error = query_stats.check_budget(getattr(route, "endpoint", None), stats)
+    if budget_error:
+        logging.getLogger("app.sql").warning("Query budget exceeded: %s", budget_error)
+        if query_stats.ENFORCE_QUERY_BUDGETS:
+            response = JSONResponse(status_code=500, content={"detail": f"Query budget exceeded: {budget_error}"})
+
+    mark_write(request, response)
+    if query_stats.DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+    return response
+
+# Outside track_queries: replayed responses don't count as route requests
+app.middleware("http")(idempotency.middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -53,13 +114,29 @@ app.include_router(profiles.router)
 from app.routers import votes, stats
 app.include_router(votes.router)
 app.include_router(stats.router)
-# app.include_router(merchants.router) # Legacy router removed for V1
 
-from app.routers import feedback
-app.include_router(feedback.router)
+from app.routers import merchants, match
+app.include_router(merchants.router)
+app.include_router(match.router)
+
+from app.routers import live
+app.include_router(live.router)
+
+# Rarely used: imported on the first request under their prefix
+include_lazy(app, "/feedback", "app.routers.feedback")
+include_lazy(app, "/admin", "app.routers.admin")
+
+from app.routers import metrics as metrics_router
+app.include_router(metrics_router.router)
+
+# /docs and /openapi.json should list the lazy routers too
+_default_openapi = app.openapi
+
+def openapi_with_lazy_routers():
+    load_all(app)
+    return _default_openapi()
 
-from app.routers import admin
-app.include_router(admin.router)
+app.openapi = openapi_with_lazy_routers
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,381 @@
+"""
+Near-duplicate merchant detection and merging.
+
+create_entry creates a new merchant whenever a statement name matches no
+alias, so "Swiggy", "SWIGGY LTD" and "Swigy" end up as three merchants. This
+job finds such groups offline and proposes merges for an admin to review:
+
+    python -m app.merchant_clusters propose [--threshold 0.85]
+    python -m app.merchant_clusters apply [--chunk 500] [--approve-above 0.97]
+
+propose:
+1. load: id, name, category and MCC of every merchant, plus entry counts
+2. block: names are normalized like statement lines (statement_match.normalize).
+   Each merchant goes into a block per name token, per 4-character prefix and
+   per 4-character suffix of the name without spaces. Only merchants sharing
+   a block are compared. Blocks larger than MAX_BLOCK (common words) are
+   sorted by name and each merchant is only compared with the WINDOW
+   merchants on either side, so the cost stays linear in the number of
+   merchants. Candidate pairs are generated and scored one merchant at a
+   time rather than collected.
+3. score: name similarity (the statement matcher's), raised when MCC or
+   category agree and lowered when they conflict
+4. write: pairs scoring at least the threshold become `pending` rows in
+   merchant_merge_proposals. The merchant with more entries is the target.
+   Pairs proposed before (in any status) are skipped.
+
+The printed report has the time and row counts for each stage.
+
+apply merges `approved` proposals (GET/POST /admin/merchant-merges) best
+score first. Chains (A -> B, then B -> C) resolve to the final target. A
+source merchant's entries move in chunks, one transaction per chunk. An
+entry whose statement key the target already has is merged into that entry
+(app/dedup.py). Then, in one last transaction, its aliases move, its name
+becomes an alias of the target, and it is deleted.
+"""
+import argparse
+import itertools
+import json
+import time
+import uuid
+from collections import defaultdict
+
+import sqlalchemy as sa
+from sqlmodel import Session, select, func
+
+from app import changes, entry_feed, trust  # noqa: F401 - register the hooks that follow entry writes
+from app.models import Merchant, MerchantAlias, CashbackEntry, MerchantBestCard, MerchantMergeProposal, MergeStatus, ist_now
+from app.statement_match import normalize, similarity
+
+PROPOSE_THRESHOLD = 0.85
+NAME_FLOOR = 0.75  # pairs below this are not scored further
+MIN_TOKEN = 3
+AFFIX = 4
+MAX_BLOCK = 100
+WINDOW = 10
+MCC_BONUS, MCC_PENALTY = 0.05, 0.10
+CATEGORY_BONUS, CATEGORY_PENALTY = 0.03, 0.05
+INSERT_CHUNK = 1000
+APPLY_CHUNK = 500
+
+
+def block_keys(key: str) -> set:
+    keys = {f"t:{token}" for token in key.split() if len(token) >= MIN_TOKEN}
+    compact = key.replace(" ", "")
+    if len(compact) >= AFFIX:
+        keys.add(f"p:{compact[:AFFIX]}")
+        keys.add(f"s:{compact[-AFFIX:]}")
+    return keys
+
+
+def build_blocks(keys: list) -> tuple:
+    """block -> member indexes, and the name-order positions of oversized blocks' members"""
+    blocks = defaultdict(list)
+    for i, key in enumerate(keys):
+        for block in block_keys(key):
+            blocks[block].append(i)
+    # Oversized blocks: position of each member in name order
+    positions = {}
+    for block, members in blocks.items():
+        if len(members) > MAX_BLOCK:
+            members.sort(key=keys.__getitem__)
+            positions[block] = {member: pos for pos, member in enumerate(members)}
+    return blocks, positions
+
+
+def candidate_pairs(keys: list, blocks, positions):
+    """
+    Yields index pairs (i < j) of names sharing a block, one merchant at a
+    time, so they are never all held in memory.
+    """
+    for i, key in enumerate(keys):
+        candidates = set()
+        for block in block_keys(key):
+            members = blocks[block]
+            if block in positions:
+                pos = positions[block][i]
+                members = members[max(0, pos - WINDOW):pos + WINDOW + 1]
+            candidates.update(j for j in members if j > i)
+        for j in candidates:
+            yield i, j
+
+
+def name_score(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    # Lengths alone bound difflib's ratio; only the leading-name case can beat it
+    if not (a.startswith(b + " ") or b.startswith(a + " ")):
+        if 2 * min(len(a), len(b)) / (len(a) + len(b)) < NAME_FLOOR:
+            return 0.0
+    return similarity(a, b)
+
+
+def score_pair(a, b) -> tuple:
+    """(score, name_score, signals) for two loaded merchants"""
+    name = name_score(a["key"], b["key"])
+    if name < NAME_FLOOR:
+        return name, name, []
+    score, signals = name, []
+    if a["mcc"] and b["mcc"]:
+        if a["mcc"] == b["mcc"]:
+            score, signals = score + MCC_BONUS, signals + ["same_mcc"]
+        else:
+            score, signals = score - MCC_PENALTY, signals + ["different_mcc"]
+    if a["category"] and b["category"]:
+        if a["category"].lower() == b["category"].lower():
+            score, signals = score + CATEGORY_BONUS, signals + ["same_category"]
+        else:
+            score, signals = score - CATEGORY_PENALTY, signals + ["different_category"]
+    return max(0.0, min(1.0, score)), name, signals
+
+
+def _load(session: Session) -> list:
+    counts = dict(session.exec(
+        select(CashbackEntry.merchant_id, func.count()).group_by(CashbackEntry.merchant_id)
+    ).all())
+    merchants = []
+    for row in session.exec(select(
+        Merchant.id, Merchant.canonical_name, Merchant.category, Merchant.default_mcc, Merchant.created_at
+    )).all():
+        key = normalize(row.canonical_name)
+        if key:
+            merchants.append({
+                "id": row.id, "name": row.canonical_name, "key": key, "category": row.category,
+                "mcc": row.default_mcc, "created_at": row.created_at, "entries": counts.get(row.id, 0),
+            })
+    return merchants
+
+
+def _clusters(pairs) -> int:
+    """Connected components with more than one merchant"""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs:
+        parent[find(i)] = find(j)
+    return len({find(x) for x in parent})
+
+
+def propose(engine, threshold: float = PROPOSE_THRESHOLD) -> dict:
+    report, stages = {}, {}
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        merchants = _load(session)
+    stages["load"] = time.perf_counter() - started
+    report["merchants"] = len(merchants)
+
+    n = len(merchants)
+    report["all_pairs"] = n * (n - 1) // 2
+
+    started = time.perf_counter()
+    keys = [m["key"] for m in merchants]
+    blocks, positions = build_blocks(keys)
+    stages["block"] = time.perf_counter() - started
+    report["blocks"] = len(blocks)
+    report["oversized_blocks"] = len(positions)
+
+    started = time.perf_counter()
+    matches, compared = [], 0
+    for i, j in candidate_pairs(keys, blocks, positions):
+        compared += 1
+        score, name, signals = score_pair(merchants[i], merchants[j])
+        if score >= threshold:
+            matches.append((i, j, score, name, signals))
+    stages["score"] = time.perf_counter() - started
+    report["candidate_pairs"] = compared
+    report["matches"] = len(matches)
+    report["clusters"] = _clusters((i, j) for i, j, *_ in matches)
+
+    started = time.perf_counter()
+    proposals = MerchantMergeProposal.__table__
+    now = ist_now()
+    with Session(engine) as session:
+        seen = {
+            frozenset(row) for row in session.execute(
+                sa.select(proposals.c.source_merchant_id, proposals.c.target_merchant_id)
+            ).all()
+        }
+        rows = []
+        for i, j, score, name, signals in matches:
+            a, b = merchants[i], merchants[j]
+            if frozenset((a["id"], b["id"])) in seen:
+                continue
+            # Keep the merchant with more entries, then the older one
+            target, source = sorted((a, b), key=lambda m: (-m["entries"], m["created_at"], str(m["id"])))
+            rows.append({
+                "id": uuid.uuid4(), "source_merchant_id": source["id"], "target_merchant_id": target["id"],
+                "source_name": source["name"], "target_name": target["name"],
+                "score": round(score, 4), "name_score": round(name, 4), "signals": ",".join(signals) or None,
+                "status": MergeStatus.pending.value, "created_at": now,
+            })
+        for start in range(0, len(rows), INSERT_CHUNK):
+            session.execute(proposals.insert(), rows[start:start + INSERT_CHUNK])
+        session.commit()
+    stages["write"] = time.perf_counter() - started
+    report["proposed"] = len(rows)
+
+    report["seconds"] = {name: round(seconds, 3) for name, seconds in stages.items()}
+    report["seconds"]["total"] = round(sum(stages.values()), 3)
+    return report
+
+
+def _move_entries(session: Session, entries: list, source_id, target_id):
+    from app import best_cards, dedup
+
+    keys = {(entry.card_id, entry.statement_key) for entry in entries if entry.statement_key is not None}
+    existing = {}
+    if keys:
+        existing = {
+            (entry.card_id, entry.statement_key): entry for entry in session.exec(
+                select(CashbackEntry)
+                .where(CashbackEntry.merchant_id == target_id)
+                .where(sa.tuple_(CashbackEntry.card_id, CashbackEntry.statement_key).in_(keys))
+            ).all()
+        }
+
+    removed = set()
+    for entry in entries:
+        other = existing.get((entry.card_id, entry.statement_key))
+        if other is not None:
+            survivor = dedup.merge_group(session, [other, entry])
+            removed.add(entry.id if survivor is other else other.id)
+    session.flush()  # deletes first, so the move below can't collide with them
+
+    moved = [entry.id for entry in entries if entry.id not in removed]
+    table = CashbackEntry.__table__
+    session.execute(sa.update(table).where(table.c.id.in_(moved)).values(merchant_id=target_id))
+    entry_feed.refresh_entries(session, moved)
+    changes.touch(session, moved)
+
+    card_ids = {entry.card_id for entry in entries}
+    best_cards.refresh_pairs(session, [(merchant_id, card_id) for card_id in card_ids for merchant_id in (source_id, target_id)])
+    return len(moved), len(removed)
+
+
+def merge_merchants(engine, source_id, target_id, chunk: int = APPLY_CHUNK) -> dict:
+    """Moves everything of source_id to target_id and deletes it; one transaction per chunk of entries"""
+    from app import bloom, dedup, feed_cache
+
+    moved = merged = 0
+    while True:
+        with Session(engine) as session:
+            entries = session.exec(
+                select(CashbackEntry).where(CashbackEntry.merchant_id == source_id).limit(chunk)
+            ).all()
+            if not entries:
+                break
+            chunk_moved, chunk_merged = _move_entries(session, entries, source_id, target_id)
+            session.commit()
+        moved, merged = moved + chunk_moved, merged + chunk_merged
+        feed_cache.invalidate("feed", f"merchant:{source_id}", f"merchant:{target_id}")
+
+    with Session(engine) as session:
+        merchants = Merchant.__table__
+        source = session.execute(
+            sa.select(merchants.c.canonical_name, merchants.c.category, merchants.c.default_mcc)
+            .where(merchants.c.id == source_id)
+        ).first()
+        aliases = MerchantAlias.__table__
+        session.execute(sa.update(aliases).where(aliases.c.merchant_id == source_id).values(merchant_id=target_id))
+        if source is not None:
+            alias_key = dedup.statement_key(source.canonical_name)
+            known = session.exec(
+                select(MerchantAlias.id)
+                .where(MerchantAlias.merchant_id == target_id)
+                .where(MerchantAlias.alias_key == alias_key)
+            ).first()
+            if known is None:
+                session.add(MerchantAlias(merchant_id=target_id, alias_text=source.canonical_name, alias_key=alias_key))
+                bloom.add("alias", source.canonical_name)
+            target = session.get(Merchant, target_id)
+            target.category = target.category or source.category
+            target.default_mcc = target.default_mcc or source.default_mcc
+            session.add(target)
+            best = MerchantBestCard.__table__
+            session.execute(sa.delete(best).where(best.c.merchant_id == source_id))
+            session.execute(sa.delete(merchants).where(merchants.c.id == source_id))
+        session.commit()
+    return {"entries_moved": moved, "entries_merged": merged}
+
+
+def _resolve(merchant_id, merged_into: dict):
+    seen = set()
+    while merchant_id in merged_into and merchant_id not in seen:
+        seen.add(merchant_id)
+        merchant_id = merged_into[merchant_id]
+    return merchant_id
+
+
+def apply(engine, chunk: int = APPLY_CHUNK, approve_above: float = None) -> dict:
+    proposals = MerchantMergeProposal.__table__
+    with Session(engine) as session:
+        if approve_above is not None:
+            session.execute(
+                sa.update(proposals)
+                .where(proposals.c.status == MergeStatus.pending.value)
+                .where(proposals.c.score >= approve_above)
+                .values(status=MergeStatus.approved.value, decided_at=ist_now())
+            )
+            session.commit()
+        approved = session.execute(
+            sa.select(proposals.c.id, proposals.c.source_merchant_id, proposals.c.target_merchant_id)
+            .where(proposals.c.status == MergeStatus.approved.value)
+            .order_by(proposals.c.score.desc())
+        ).all()
+        merged_into = dict(session.execute(
+            sa.select(proposals.c.source_merchant_id, proposals.c.target_merchant_id)
+            .where(proposals.c.status == MergeStatus.applied.value)
+        ).all())
+
+    started = time.perf_counter()
+    totals = {"proposals_applied": 0, "merchants_merged": 0, "entries_moved": 0, "entries_merged": 0}
+    for proposal in approved:
+        source_id = proposal.source_merchant_id
+        target_id = _resolve(proposal.target_merchant_id, merged_into)
+        if source_id not in merged_into and source_id != target_id:
+            result = merge_merchants(engine, source_id, target_id, chunk)
+            merged_into[source_id] = target_id
+            totals["merchants_merged"] += 1
+            totals["entries_moved"] += result["entries_moved"]
+            totals["entries_merged"] += result["entries_merged"]
+        # Already merged through another proposal: nothing left to do
+        with Session(engine) as session:
+            session.execute(
+                sa.update(proposals).where(proposals.c.id == proposal.id)
+                .values(status=MergeStatus.applied.value, applied_at=ist_now())
+            )
+            session.commit()
+        totals["proposals_applied"] += 1
+    totals["seconds"] = round(time.perf_counter() - started, 3)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find and merge near-duplicate merchants")
+    commands = parser.add_subparsers(dest="command", required=True)
+    propose_parser = commands.add_parser("propose", help="write merge proposals for review")
+    propose_parser.add_argument("--threshold", type=float, default=PROPOSE_THRESHOLD)
+    apply_parser = commands.add_parser("apply", help="merge approved proposals")
+    apply_parser.add_argument("--chunk", type=int, default=APPLY_CHUNK, help="entries per transaction")
+    apply_parser.add_argument("--approve-above", type=float, default=None,
+                              help="approve pending proposals scoring at least this first")
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    if args.command == "propose":
+        result = propose(engine, args.threshold)
+    else:
+        result = apply(engine, args.chunk, args.approve_above)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
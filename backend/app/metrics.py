@@ -0,0 +1,80 @@
+"""
+Tiny in-process metrics registry.
+
+Each uvicorn worker keeps its own counters/gauges/summaries; GET /metrics
+renders them in the Prometheus text format so a scraper can sum workers.
+"""
+import threading
+
+_lock = threading.Lock()
+_counters = {}   # (name, labels) -> float
+_gauges = {}     # (name, labels) -> float
+_summaries = {}  # (name, labels) -> [count, sum, max]
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels):
+    key = _key(name, labels)
+    with _lock:
+        summary = _summaries.get(key)
+        if summary is None:
+            _summaries[key] = [1, value, value]
+        else:
+            summary[0] += 1
+            summary[1] += value
+            if value > summary[2]:
+                summary[2] = value
+
+
+def get(name: str, **labels) -> float:
+    """Current value of a counter or gauge (0 if never set)"""
+    key = _key(name, labels)
+    with _lock:
+        return _counters.get(key, _gauges.get(key, 0))
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        summaries = {k: list(v) for k, v in _summaries.items()}
+
+    lines = []
+    for (name, labels), value in sorted(counters.items()):
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), value in sorted(gauges.items()):
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), (count, total, maximum) in sorted(summaries.items()):
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_max{_format_labels(labels)} {maximum}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Clears everything (used by the benchmark between runs)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
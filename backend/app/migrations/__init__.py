@@ -0,0 +1,164 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module (m0001_*.py, ...) with VERSION, DESCRIPTION and
+upgrade(conn), listed in MIGRATION_MODULES; the modules are only imported
+when an upgrade actually runs. A migration is self-contained: its tables,
+columns and backfills are written as they were at its version, never through
+the app's models or modules, which keep changing after it. The applied version lives in a single-row `schema_version`
+table, so a worker booting against an up-to-date database only runs one
+SELECT (check_schema). Upgrades run under a lock so that only one of the
+workers starting together applies anything:
+
+* Postgres: session-level pg_advisory_lock
+* SQLite: the whole upgrade runs in one BEGIN IMMEDIATE transaction, which
+  holds the database RESERVED lock until commit; the others wait up to
+  MIGRATION_LOCK_TIMEOUT_SECONDS (busy timeout) instead of failing
+
+The schema_version table itself is created under the lock, so workers
+booting together against an empty database do not race on it either.
+
+    python -m app.migrations status
+    python -m app.migrations upgrade
+"""
+import importlib
+import os
+import time
+
+import sqlalchemy as sa
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+MIGRATION_MODULES = [
+    "m0001_baseline",
+    "m0002_indexes",
+    "m0003_best_cards",
+    "m0004_entry_feed",
+    "m0005_change_feed",
+    "m0006_created_at_indexes",
+    "m0007_entry_statement_key",
+    "m0008_merchant_merge_proposals",
+    "m0009_idempotency_keys",
+    "m0010_trust_score",
+    "m0011_activity_buckets",
+    "m0012_reputation_index",
+    "m0013_alias_key",
+    "m0014_idempotency_headers",
+]
+LATEST_VERSION = int(MIGRATION_MODULES[-1][1:5])
+
+# Arbitrary constant shared by every worker
+ADVISORY_LOCK_KEY = 0x63626B01
+
+# SQLite: how long a booting worker waits for another one's upgrade
+MIGRATION_LOCK_TIMEOUT_SECONDS = float(os.environ.get("MIGRATION_LOCK_TIMEOUT_SECONDS", "300"))
+
+# Apply pending migrations on startup (otherwise refuse to start)
+AUTO_MIGRATE = os.environ.get("AUTO_MIGRATE", "true").lower() == "true"
+
+schema_version = sa.Table(
+    "schema_version",
+    SQLModel.metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("version", sa.Integer, nullable=False),
+    sa.Column("description", sa.String),
+    sa.Column("applied_at", sa.DateTime),
+)
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def load_migrations() -> list:
+    migrations = [importlib.import_module(f"app.migrations.{name}") for name in MIGRATION_MODULES]
+    for name, migration in zip(MIGRATION_MODULES, migrations):
+        assert migration.VERSION == int(name[1:5]), f"{name} declares VERSION {migration.VERSION}"
+    return migrations
+
+
+def current_version(conn) -> int:
+    """Single-row lookup; 0 if the database has never been migrated"""
+    try:
+        version = conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+    except sa.exc.DBAPIError:
+        # Table missing (a failed statement also aborts the Postgres transaction)
+        conn.rollback()
+        return 0
+    return version or 0
+
+
+def _ensure_version_table(conn):
+    """Call under the lock"""
+    schema_version.create(conn, checkfirst=True)
+    if conn.execute(text("SELECT 1 FROM schema_version WHERE id = 1")).first() is None:
+        conn.execute(schema_version.insert().values(id=1, version=0, description="empty"))
+
+
+def upgrade(engine, target: int = None) -> list:
+    """Applies pending migrations once, under the lock. Returns applied versions."""
+    target = target or LATEST_VERSION
+    applied = []
+    with engine.connect() as conn:
+        postgres = conn.dialect.name == "postgresql"
+
+        if postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            conn.commit()
+        else:
+            busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {int(MIGRATION_LOCK_TIMEOUT_SECONDS * 1000)}")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+        try:
+            _ensure_version_table(conn)
+            if postgres:
+                conn.commit()
+            # Read under the lock: another worker may have done the work already
+            version = current_version(conn)
+            for migration in load_migrations():
+                if migration.VERSION <= version or migration.VERSION > target:
+                    continue
+                start = time.perf_counter()
+                migration.upgrade(conn)
+                conn.execute(
+                    schema_version.update().where(schema_version.c.id == 1).values(
+                        version=migration.VERSION,
+                        description=migration.DESCRIPTION,
+                        applied_at=sa.func.current_timestamp(),
+                    )
+                )
+                if postgres:
+                    conn.commit()
+                applied.append(migration.VERSION)
+                print(f"Applied migration {migration.VERSION}: {migration.DESCRIPTION} "
+                      f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            if postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                conn.commit()
+            else:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+    return applied
+
+
+def check_schema(engine):
+    """
+    Startup check: one SELECT when the schema is current. Upgrades when
+    behind and AUTO_MIGRATE is on, otherwise raises SchemaOutOfDate.
+    """
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version >= LATEST_VERSION:
+        return version
+    if not AUTO_MIGRATE:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, code expects {LATEST_VERSION}. "
+            f"Run `python -m app.migrations upgrade`."
+        )
+    upgrade(engine)
+    return LATEST_VERSION
@@ -0,0 +1,26 @@
+import sys
+
+from app.database import engine
+from app.migrations import LATEST_VERSION, load_migrations, current_version, upgrade
+
+
+def main(argv):
+    command = argv[0] if argv else "status"
+    if command == "status":
+        with engine.connect() as conn:
+            version = current_version(conn)
+        print(f"Database version: {version} (latest: {LATEST_VERSION})")
+        for migration in load_migrations():
+            state = "applied" if migration.VERSION <= version else "pending"
+            print(f"  {migration.VERSION:>4}  {state:<8} {migration.DESCRIPTION}")
+    elif command == "upgrade":
+        target = int(argv[1]) if len(argv) > 1 else None
+        applied = upgrade(engine, target)
+        print(f"Applied: {applied}" if applied else "Already up to date")
+    else:
+        print("usage: python -m app.migrations [status|upgrade [version]]")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,49 @@
+"""
+Idempotent DDL helpers for migrations.
+
+Migrations never use the app's models or modules: each one spells out the
+tables, columns and SQL as they were at its version, so a later model change
+cannot break an older migration. Databases created before that (the baseline
+used to create tables from the then-current models) may already have later
+columns/indexes, so every step checks first.
+"""
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+def has_table(conn, table: str) -> bool:
+    return sa.inspect(conn).has_table(table)
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in sa.inspect(conn).get_columns(table))
+
+
+def create_table(conn, name: str, *columns, metadata: sa.MetaData = None, **kwargs) -> sa.Table:
+    """
+    Creates a table as the migration defines it, not as the current model
+    does, if it doesn't exist yet. index=True columns get the models' ix_*
+    index names. Tables with foreign keys to each other share a metadata.
+    """
+    table = sa.Table(name, metadata if metadata is not None else sa.MetaData(), *columns, **kwargs)
+    table.create(conn, checkfirst=True)
+    return table
+
+
+def add_column(conn, table: str, column: str, ddl: str):
+    """ddl is the column type/default clause, e.g. "INTEGER NOT NULL DEFAULT 0" """
+    if not has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index(conn, name: str, table: str, columns: str, unique: bool = False,
+                 where: str = None, postgres_using: str = None):
+    if postgres_using and conn.dialect.name != "postgresql":
+        return
+    sql = f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table}"
+    if postgres_using:
+        sql += f" USING {postgres_using}"
+    sql += f" ({columns})"
+    if where:
+        sql += f" WHERE {where}"
+    conn.execute(text(sql))
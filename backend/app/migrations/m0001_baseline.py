@@ -0,0 +1,179 @@
+"""
+Baseline: the V1 schema as it existed before versioned migrations.
+
+On an existing database this only fills the gaps the hand-applied scripts
+used to cover (alters.sql / fix_enums.sql enum conversion, the
+migrate_card_metadata.sql image_url column); on a fresh one it creates
+everything. The tables are spelled out as they were in V1; later columns
+come from later migrations.
+"""
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.migrations.helpers import create_table, add_column, has_table
+
+VERSION = 1
+DESCRIPTION = "Baseline V1 schema"
+
+# Postgres enum types (the tables use them with create_type=False)
+ENUM_TYPES = {
+    "entry_status": ("pending", "verified", "disputed", "rejected"),
+    "vote_type": ("up", "down"),
+    "suggestion_status": ("pending", "accepted", "rejected"),
+    "feedback_type": ("bug", "feature_request", "card_request", "other"),
+    "feedback_status": ("pending", "reviewed", "resolved"),
+}
+
+# Columns that were varchar before alters.sql
+ENUM_COLUMNS = [
+    ("cashback_entries", "status", "entry_status"),
+    ("rate_suggestions", "status", "suggestion_status"),
+    ("entry_votes", "vote_type", "vote_type"),
+    ("rate_suggestion_votes", "vote_type", "vote_type"),
+]
+
+
+def _enum(name: str) -> sa.Enum:
+    return sa.Enum(*ENUM_TYPES[name], name=name, create_type=False)
+
+
+def _id():
+    return sa.Column("id", sa.Uuid, primary_key=True)
+
+
+def _created_at():
+    return sa.Column("created_at", sa.DateTime, nullable=False)
+
+
+def _key(name: str, target: str, **kwargs):
+    return sa.Column(name, sa.Uuid, sa.ForeignKey(target), **kwargs)
+
+
+# name -> columns, in dependency order
+TABLES = {
+    "profiles": lambda: [
+        sa.Column("id", sa.Uuid, primary_key=True),  # references auth.users(id)
+        sa.Column("email", sa.String, nullable=False),
+        sa.Column("display_name", sa.String),
+        sa.Column("avatar_url", sa.String),
+        sa.Column("role", sa.String, nullable=False),
+        sa.Column("reputation_score", sa.Integer, nullable=False),
+        _created_at(),
+    ],
+    "cards": lambda: [
+        _id(),
+        sa.Column("slug", sa.String, nullable=False, unique=True, index=True),
+        sa.Column("name", sa.String, nullable=False),
+        sa.Column("issuer", sa.String, nullable=False),
+        sa.Column("network", sa.String, nullable=False),
+        sa.Column("description", sa.String),
+        sa.Column("image_url", sa.String),
+        sa.Column("max_cashback_rate", sa.Float, nullable=False),
+        sa.Column("active", sa.Boolean, nullable=False),
+        _created_at(),
+    ],
+    "merchants": lambda: [
+        _id(),
+        sa.Column("canonical_name", sa.String, nullable=False, index=True),
+        sa.Column("category", sa.String),
+        sa.Column("default_mcc", sa.String),
+        sa.Column("website", sa.String),
+        _created_at(),
+    ],
+    "merchant_aliases": lambda: [
+        _id(),
+        _key("merchant_id", "merchants.id", nullable=False, index=True),
+        sa.Column("alias_text", sa.String, nullable=False, index=True),
+        _created_at(),
+    ],
+    "cashback_entries": lambda: [
+        _id(),
+        _key("card_id", "cards.id", nullable=False, index=True),
+        _key("merchant_id", "merchants.id", nullable=False, index=True),
+        _key("contributor_id", "profiles.id", nullable=False, index=True),
+        sa.Column("statement_name", sa.String, nullable=False, index=True),
+        sa.Column("reported_cashback_rate", sa.Float, nullable=False),
+        sa.Column("mcc", sa.String),
+        sa.Column("notes", sa.String),
+        sa.Column("status", _enum("entry_status"), nullable=False),
+        sa.Column("transaction_date", sa.Date),
+        sa.Column("last_verified_at", sa.DateTime),
+        sa.Column("upvote_count", sa.Integer, nullable=False),
+        sa.Column("downvote_count", sa.Integer, nullable=False),
+        _created_at(),
+        sa.Column("updated_at", sa.DateTime, nullable=False),
+    ],
+    "entry_votes": lambda: [
+        _key("entry_id", "cashback_entries.id", primary_key=True),
+        _key("user_id", "profiles.id", primary_key=True),
+        sa.Column("vote_type", _enum("vote_type"), nullable=False),
+        _created_at(),
+    ],
+    "entry_comments": lambda: [
+        _id(),
+        _key("entry_id", "cashback_entries.id", nullable=False, index=True),
+        _key("author_id", "profiles.id", nullable=False, index=True),
+        sa.Column("content", sa.String, nullable=False),
+        sa.Column("is_deleted", sa.Boolean, nullable=False),
+        _created_at(),
+        sa.Column("updated_at", sa.DateTime),
+    ],
+    "rate_suggestions": lambda: [
+        _id(),
+        _key("entry_id", "cashback_entries.id", nullable=False, index=True),
+        _key("user_id", "profiles.id", nullable=False, index=True),
+        sa.Column("proposed_rate", sa.Float, nullable=False),
+        sa.Column("reason", sa.String),
+        sa.Column("status", _enum("suggestion_status"), nullable=False),
+        sa.Column("upvotes", sa.Integer, nullable=False),
+        sa.Column("downvotes", sa.Integer, nullable=False),
+        _created_at(),
+    ],
+    "rate_suggestion_votes": lambda: [
+        _key("suggestion_id", "rate_suggestions.id", primary_key=True),
+        _key("user_id", "profiles.id", primary_key=True),
+        sa.Column("vote_type", _enum("vote_type"), nullable=False),
+        _created_at(),
+    ],
+    "feedbacks": lambda: [
+        _id(),
+        _key("user_id", "profiles.id", index=True),
+        sa.Column("type", _enum("feedback_type"), nullable=False),
+        sa.Column("message", sa.String, nullable=False),
+        sa.Column("status", _enum("feedback_status"), nullable=False),
+        _created_at(),
+    ],
+}
+
+
+def upgrade(conn):
+    postgres = conn.dialect.name == "postgresql"
+    if postgres:
+        for name, labels in ENUM_TYPES.items():
+            values = ", ".join(f"'{label}'" for label in labels)
+            conn.execute(text(
+                f"DO $$ BEGIN CREATE TYPE {name} AS ENUM ({values}); "
+                f"EXCEPTION WHEN duplicate_object THEN null; END $$;"
+            ))
+
+    existing = [name for name in TABLES if has_table(conn, name)]
+    # One MetaData, so the foreign keys resolve
+    metadata = sa.MetaData()
+    for name, columns in TABLES.items():
+        create_table(conn, name, *columns(), metadata=metadata)
+
+    if postgres:
+        for table, column, enum_type in ENUM_COLUMNS:
+            if table not in existing:
+                continue
+            data_type = conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = :column"
+            ), {"table": table, "column": column}).scalar()
+            if data_type != "USER-DEFINED":
+                conn.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {enum_type} "
+                    f"USING {column}::{enum_type}"
+                ))
+
+    add_column(conn, "cards", "image_url", "TEXT")
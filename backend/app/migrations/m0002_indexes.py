@@ -0,0 +1,24 @@
+"""Performance indexes from add_indexes.sql (trigram ones are Postgres only)."""
+from sqlalchemy import text
+
+from app.migrations.helpers import create_index
+
+VERSION = 2
+DESCRIPTION = "Feed and search indexes"
+
+
+def upgrade(conn):
+    # card_id, merchant_id, alias_text, canonical_name and entry_comments.entry_id
+    # already have ix_* indexes from m0001 (index=True)
+    create_index(conn, "idx_cashback_entries_status", "cashback_entries", "status")
+    create_index(conn, "idx_cashback_entries_created_at", "cashback_entries", "created_at DESC")
+    create_index(conn, "idx_entry_comments_created_at", "entry_comments", "created_at DESC")
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        create_index(conn, "idx_merchants_canonical_name_trgm", "merchants",
+                     "canonical_name gin_trgm_ops", postgres_using="gin")
+        create_index(conn, "idx_merchant_aliases_alias_text_trgm", "merchant_aliases",
+                     "alias_text gin_trgm_ops", postgres_using="gin")
+        create_index(conn, "idx_cashback_entries_statement_name_trgm", "cashback_entries",
+                     "statement_name gin_trgm_ops", postgres_using="gin")
@@ -0,0 +1,98 @@
+"""merchant_best_cards index table, filled from the existing entries."""
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.migrations.helpers import create_table, create_index
+
+VERSION = 3
+DESCRIPTION = "Best card per merchant index"
+
+# Scoring as of this version (app/best_cards.py owns it from here on)
+HALF_LIFE_DAYS = 180
+MIN_FRESHNESS = 0.25
+STATUS_WEIGHT = {"verified": 1.0, "pending": 0.6, "disputed": 0.25}
+CHUNK = 1000
+
+
+def _confidence(row, now) -> float:
+    weight = STATUS_WEIGHT.get(row.status, 0.0)
+    if weight == 0.0:
+        return 0.0
+    votes = (row.upvote_count + 1) / (row.upvote_count + row.downvote_count + 2)
+    age_days = max((now - (row.last_verified_at or row.created_at)).total_seconds(), 0) / 86400
+    return weight * votes * max(0.5 ** (age_days / HALF_LIFE_DAYS), MIN_FRESHNESS)
+
+
+def _summarize(pair, rows, now):
+    best, best_key, verified, last_verified = None, None, 0, None
+    for row in rows:
+        if row.status == "verified":
+            verified += 1
+        if row.last_verified_at and (last_verified is None or row.last_verified_at > last_verified):
+            last_verified = row.last_verified_at
+        confidence = _confidence(row, now)
+        if confidence == 0.0:
+            continue
+        key = (confidence, row.reported_cashback_rate, row.created_at)
+        if best_key is None or key > best_key:
+            best, best_key = row, key
+    if best is None:
+        return None
+    return {
+        "merchant_id": pair[0], "card_id": pair[1], "best_entry_id": best.id,
+        "rate": best.reported_cashback_rate,
+        "confidence": round(best_key[0], 6),
+        "score": round(best.reported_cashback_rate * best_key[0], 6),
+        "entry_count": len(rows), "verified_count": verified,
+        "last_verified_at": last_verified, "updated_at": now,
+    }
+
+
+def upgrade(conn):
+    metadata = sa.MetaData()
+    # Stubs, so the foreign keys resolve
+    for name in ("merchants", "cards", "cashback_entries"):
+        sa.Table(name, metadata, sa.Column("id", sa.Uuid, primary_key=True))
+    table = create_table(
+        conn, "merchant_best_cards",
+        sa.Column("merchant_id", sa.Uuid, sa.ForeignKey("merchants.id"), primary_key=True),
+        sa.Column("card_id", sa.Uuid, sa.ForeignKey("cards.id"), primary_key=True),
+        sa.Column("best_entry_id", sa.Uuid, sa.ForeignKey("cashback_entries.id"), nullable=False),
+        sa.Column("rate", sa.Float, nullable=False),
+        sa.Column("confidence", sa.Float, nullable=False),
+        sa.Column("score", sa.Float, nullable=False),
+        sa.Column("entry_count", sa.Integer, nullable=False),
+        sa.Column("verified_count", sa.Integer, nullable=False),
+        sa.Column("last_verified_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime, nullable=False),
+        metadata=metadata,
+    )
+    # The primary key (merchant_id, card_id) serves the per-merchant lookup
+    create_index(conn, "idx_merchant_best_cards_card_id", "merchant_best_cards", "card_id")
+
+    entries = sa.table(
+        "cashback_entries",
+        sa.column("id", sa.Uuid), sa.column("merchant_id", sa.Uuid), sa.column("card_id", sa.Uuid),
+        sa.column("reported_cashback_rate", sa.Float), sa.column("status", sa.String),
+        sa.column("upvote_count", sa.Integer), sa.column("downvote_count", sa.Integer),
+        sa.column("last_verified_at", sa.DateTime), sa.column("created_at", sa.DateTime),
+    )
+    rows = conn.execute(sa.select(entries).order_by(entries.c.merchant_id, entries.c.card_id)).all()
+
+    # IST, as the app stores its timestamps
+    now = datetime.utcnow() + timedelta(hours=5, minutes=30)
+    conn.execute(text("DELETE FROM merchant_best_cards"))
+    batch, pair, pair_rows = [], None, []
+    for row in rows + [None]:
+        key = (row.merchant_id, row.card_id) if row is not None else None
+        if key != pair:
+            summary = _summarize(pair, pair_rows, now) if pair else None
+            if summary:
+                batch.append(summary)
+            if len(batch) >= CHUNK or (row is None and batch):
+                conn.execute(table.insert(), batch)
+                batch = []
+            pair, pair_rows = key, []
+        pair_rows.append(row)
@@ -0,0 +1,105 @@
+"""entry_feed read model, filled from the existing entries, plus Postgres sync triggers."""
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.migrations.helpers import create_table, create_index
+
+VERSION = 4
+DESCRIPTION = "Denormalized entry feed"
+
+# The columns as of this version; later ones (trust_score, m0010) fill their own
+ENTRY_COLUMNS = [
+    "card_id", "merchant_id", "contributor_id", "statement_name", "reported_cashback_rate",
+    "mcc", "notes", "status", "upvote_count", "downvote_count",
+    "created_at", "updated_at", "last_verified_at",
+]
+# source table -> (alias, entry_feed key column, {source column: entry_feed column})
+DIMENSIONS = {
+    "merchants": ("m", "merchant_id", {
+        "canonical_name": "merchant_name",
+        "category": "merchant_category",
+        "default_mcc": "merchant_default_mcc",
+    }),
+    "cards": ("c", "card_id", {
+        "slug": "card_slug",
+        "name": "card_name",
+        "issuer": "card_issuer",
+        "network": "card_network",
+        "max_cashback_rate": "card_max_cashback_rate",
+    }),
+    "profiles": ("p", "contributor_id", {
+        "display_name": "contributor_name",
+    }),
+}
+
+
+ENTRY_STATUS = sa.Enum("pending", "verified", "disputed", "rejected", name="entry_status", create_type=False)
+
+
+def upgrade(conn):
+    create_table(
+        conn, "entry_feed",
+        sa.Column("entry_id", sa.Uuid, primary_key=True),
+        sa.Column("card_id", sa.Uuid, nullable=False, index=True),
+        sa.Column("merchant_id", sa.Uuid, nullable=False, index=True),
+        sa.Column("contributor_id", sa.Uuid, nullable=False, index=True),
+        sa.Column("statement_name", sa.String, nullable=False),
+        sa.Column("reported_cashback_rate", sa.Float, nullable=False),
+        sa.Column("mcc", sa.String),
+        sa.Column("notes", sa.String),
+        sa.Column("status", ENTRY_STATUS, nullable=False),
+        sa.Column("upvote_count", sa.Integer, nullable=False),
+        sa.Column("downvote_count", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=False),
+        sa.Column("last_verified_at", sa.DateTime),
+        sa.Column("merchant_name", sa.String, nullable=False),
+        sa.Column("merchant_category", sa.String),
+        sa.Column("merchant_default_mcc", sa.String),
+        sa.Column("card_slug", sa.String, nullable=False),
+        sa.Column("card_name", sa.String, nullable=False),
+        sa.Column("card_issuer", sa.String, nullable=False),
+        sa.Column("card_network", sa.String, nullable=False),
+        sa.Column("card_max_cashback_rate", sa.Float, nullable=False),
+        sa.Column("contributor_name", sa.String),
+    )
+    create_index(conn, "idx_entry_feed_merchant_name", "entry_feed", "merchant_name")
+    create_index(conn, "idx_entry_feed_rate", "entry_feed", "reported_cashback_rate DESC, updated_at DESC")
+    create_index(conn, "idx_entry_feed_created_at", "entry_feed", "created_at DESC")
+
+    if conn.dialect.name == "postgresql":
+        create_index(conn, "idx_entry_feed_last_verified_at", "entry_feed", "last_verified_at DESC NULLS LAST")
+        create_index(conn, "idx_entry_feed_merchant_name_trgm", "entry_feed",
+                     "merchant_name gin_trgm_ops", postgres_using="gin")
+        create_index(conn, "idx_entry_feed_statement_name_trgm", "entry_feed",
+                     "statement_name gin_trgm_ops", postgres_using="gin")
+        # Merchant/card/profile edits (also the ones made in Supabase) reach the feed rows
+        for source, (_, key, mapping) in DIMENSIONS.items():
+            function = f"entry_feed_sync_{source}"
+            assignments = ", ".join(f"{feed} = NEW.{column}" for column, feed in mapping.items())
+            conn.execute(text(
+                f"CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$ BEGIN "
+                f"UPDATE entry_feed SET {assignments} WHERE {key} = NEW.id; RETURN NULL; "
+                f"END $$ LANGUAGE plpgsql"
+            ))
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {function} ON {source}"))
+            conn.execute(text(
+                f"CREATE TRIGGER {function} AFTER UPDATE OF {', '.join(mapping)} ON {source} "
+                f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+            ))
+    else:
+        create_index(conn, "idx_entry_feed_last_verified_at", "entry_feed", "last_verified_at DESC")
+
+    targets = ["entry_id"] + ENTRY_COLUMNS
+    sources = ["e.id"] + [f"e.{column}" for column in ENTRY_COLUMNS]
+    for _, (alias, _, mapping) in DIMENSIONS.items():
+        targets += mapping.values()
+        sources += [f"{alias}.{column}" for column in mapping]
+    conn.execute(text("DELETE FROM entry_feed"))
+    conn.execute(text(
+        f"INSERT INTO entry_feed ({', '.join(targets)}) SELECT {', '.join(sources)} "
+        f"FROM cashback_entries e "
+        f"JOIN merchants m ON m.id = e.merchant_id "
+        f"JOIN cards c ON c.id = e.card_id "
+        f"LEFT JOIN profiles p ON p.id = e.contributor_id"
+    ))
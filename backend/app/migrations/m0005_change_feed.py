@@ -0,0 +1,45 @@
+"""change_seq on cashback_entries (backfilled in updated_at order), the counter row and tombstones."""
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.migrations.helpers import create_table, create_index, add_column
+
+VERSION = 5
+DESCRIPTION = "Entry change feed"
+
+BATCH = 1000
+
+
+def upgrade(conn):
+    add_column(conn, "cashback_entries", "change_seq", "BIGINT")
+    create_table(
+        conn, "change_counters",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("value", sa.BigInteger, nullable=False),
+    )
+    create_table(
+        conn, "entry_tombstones",
+        sa.Column("entry_id", sa.Uuid, primary_key=True),
+        sa.Column("change_seq", sa.BigInteger, nullable=False, index=True),
+        sa.Column("deleted_at", sa.DateTime, nullable=False),
+    )
+
+    ids = conn.execute(text(
+        "SELECT id FROM cashback_entries WHERE change_seq IS NULL ORDER BY updated_at, id"
+    )).scalars().all()
+    start = conn.execute(text("SELECT COALESCE(MAX(change_seq), 0) FROM cashback_entries")).scalar()
+    update = text("UPDATE cashback_entries SET change_seq = :seq WHERE id = :id")
+    for offset in range(0, len(ids), BATCH):
+        conn.execute(update, [
+            {"seq": start + offset + i + 1, "id": entry_id}
+            for i, entry_id in enumerate(ids[offset:offset + BATCH])
+        ])
+    create_index(conn, "ix_cashback_entries_change_seq", "cashback_entries", "change_seq")
+
+    last = start + len(ids)
+    if conn.execute(text("SELECT 1 FROM change_counters WHERE name = 'cashback_entries'")).first() is None:
+        conn.execute(text("INSERT INTO change_counters (name, value) VALUES ('cashback_entries', :value)"), {"value": last})
+    else:
+        conn.execute(text(
+            "UPDATE change_counters SET value = :value WHERE name = 'cashback_entries' AND value < :value"
+        ), {"value": last})
@@ -0,0 +1,10 @@
+"""created_at indexes for the watermark syncs (typeahead index, Bloom filter)."""
+from app.migrations.helpers import create_index
+
+VERSION = 6
+DESCRIPTION = "Merchant/alias created_at indexes"
+
+
+def upgrade(conn):
+    create_index(conn, "idx_merchants_created_at", "merchants", "created_at")
+    create_index(conn, "idx_merchant_aliases_created_at", "merchant_aliases", "created_at")
@@ -0,0 +1,37 @@
+"""statement_key on cashback_entries (backfilled), unique per card and merchant once there are no duplicates."""
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.migrations.helpers import add_column, create_index
+
+VERSION = 7
+DESCRIPTION = "Entry statement key"
+
+UNIQUE_INDEX = "uq_cashback_entries_statement_key"
+CHUNK = 1000
+
+
+def statement_key(statement_name: str) -> str:
+    """The key as of this version: lowercased, whitespace collapsed"""
+    return " ".join(statement_name.lower().split())
+
+
+def upgrade(conn):
+    add_column(conn, "cashback_entries", "statement_key", "VARCHAR")
+    rows = conn.execute(text("SELECT id, statement_name FROM cashback_entries WHERE statement_key IS NULL")).all()
+    update = text("UPDATE cashback_entries SET statement_key = :key WHERE id = :id")
+    for start in range(0, len(rows), CHUNK):
+        conn.execute(update, [
+            {"id": row.id, "key": statement_key(row.statement_name)} for row in rows[start:start + CHUNK]
+        ])
+
+    duplicates = conn.execute(text(
+        "SELECT COUNT(*) FROM (SELECT 1 FROM cashback_entries WHERE statement_key IS NOT NULL "
+        "GROUP BY card_id, merchant_id, statement_key HAVING COUNT(*) > 1) AS groups"
+    )).scalar()
+    # Merging rewrites votes, comments and suggestions, too much for startup
+    if duplicates:
+        print(f"{duplicates} duplicate entry groups: run `python -m app.dedup` to merge them "
+              f"and create {UNIQUE_INDEX}")
+    else:
+        create_index(conn, UNIQUE_INDEX, "cashback_entries", "card_id, merchant_id, statement_key", unique=True)
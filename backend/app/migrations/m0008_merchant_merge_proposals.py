@@ -0,0 +1,26 @@
+"""Review queue for the merchant clustering job."""
+import sqlalchemy as sa
+
+from app.migrations.helpers import create_table, create_index
+
+VERSION = 8
+DESCRIPTION = "Merchant merge proposals"
+
+
+def upgrade(conn):
+    create_table(
+        conn, "merchant_merge_proposals",
+        sa.Column("id", sa.Uuid, primary_key=True),
+        sa.Column("source_merchant_id", sa.Uuid, nullable=False, index=True),
+        sa.Column("target_merchant_id", sa.Uuid, nullable=False, index=True),
+        sa.Column("source_name", sa.String, nullable=False),
+        sa.Column("target_name", sa.String, nullable=False),
+        sa.Column("score", sa.Float, nullable=False),
+        sa.Column("name_score", sa.Float, nullable=False),
+        sa.Column("signals", sa.String),
+        sa.Column("status", sa.String, nullable=False, index=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("decided_at", sa.DateTime),
+        sa.Column("applied_at", sa.DateTime),
+    )
+    create_index(conn, "idx_merchant_merge_proposals_status_score", "merchant_merge_proposals", "status, score")
@@ -0,0 +1,20 @@
+"""Stored responses for Idempotency-Key retries."""
+import sqlalchemy as sa
+
+from app.migrations.helpers import create_table
+
+VERSION = 9
+DESCRIPTION = "Idempotency keys"
+
+
+def upgrade(conn):
+    create_table(
+        conn, "idempotency_keys",
+        sa.Column("key", sa.String, primary_key=True),
+        sa.Column("fingerprint", sa.String, nullable=False),
+        sa.Column("status_code", sa.Integer),
+        sa.Column("content_type", sa.String),
+        sa.Column("body", sa.LargeBinary),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("expires_at", sa.DateTime, nullable=False, index=True),
+    )
@@ -0,0 +1,57 @@
+"""trust_score on cashback_entries and entry_feed (backfilled), indexed for sort=trusted."""
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.migrations.helpers import create_index, add_column
+
+VERSION = 10
+DESCRIPTION = "Entry trust score"
+
+# The score as of this version (app/trust.py owns it from here on)
+HALF_LIFE_DAYS = 90
+Z = 1.96
+CHUNK = 1000
+
+
+def _score(row, now) -> float:
+    if row.status == "rejected":
+        return 0.0
+    n = (row.upvote_count or 0) + (row.downvote_count or 0)
+    if n <= 0:
+        return 0.0
+    p = (row.upvote_count or 0) / n
+    wilson = (p + Z * Z / (2 * n) - Z * math.sqrt((p * (1 - p) + Z * Z / (4 * n)) / n)) / (1 + Z * Z / n)
+    if row.last_verified_at:
+        since = _datetime(row.last_verified_at)
+    elif row.transaction_date:
+        since = datetime.fromisoformat(str(row.transaction_date)[:10])
+    else:
+        since = _datetime(row.created_at)
+    age_days = max((now - since).total_seconds(), 0) / 86400
+    return round(wilson * 0.5 ** (age_days / HALF_LIFE_DAYS), 6)
+
+
+def _datetime(value) -> datetime:
+    # SQLite returns text through text() queries
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def upgrade(conn):
+    add_column(conn, "cashback_entries", "trust_score", "FLOAT NOT NULL DEFAULT 0")
+    add_column(conn, "entry_feed", "trust_score", "FLOAT NOT NULL DEFAULT 0")
+
+    # IST, as the app stores its timestamps
+    now = datetime.utcnow() + timedelta(hours=5, minutes=30)
+    rows = conn.execute(text(
+        "SELECT id, status, upvote_count, downvote_count, last_verified_at, transaction_date, created_at "
+        "FROM cashback_entries"
+    )).all()
+    scores = [{"id": row.id, "score": _score(row, now)} for row in rows]
+    scores = [item for item in scores if item["score"]]
+    for start in range(0, len(scores), CHUNK):
+        chunk = scores[start:start + CHUNK]
+        conn.execute(text("UPDATE cashback_entries SET trust_score = :score WHERE id = :id"), chunk)
+        conn.execute(text("UPDATE entry_feed SET trust_score = :score WHERE entry_id = :id"), chunk)
+    create_index(conn, "idx_entry_feed_trust_score", "entry_feed", "trust_score DESC, created_at DESC")
@@ -0,0 +1,55 @@
+"""Hourly activity buckets for trending, filled from the last week of votes and comments."""
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.migrations.helpers import create_table, create_index
+
+VERSION = 11
+DESCRIPTION = "Activity buckets"
+
+# The longest trending window as of this version, plus the current hour
+RETENTION = timedelta(days=7, hours=1)
+
+
+def _hour(value) -> datetime:
+    # SQLite returns text through text() queries
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def upgrade(conn):
+    table = create_table(
+        conn, "activity_buckets",
+        sa.Column("kind", sa.String, primary_key=True),
+        sa.Column("subject_id", sa.Uuid, primary_key=True),
+        sa.Column("hour", sa.DateTime, primary_key=True),
+        sa.Column("votes", sa.Integer, nullable=False),
+        sa.Column("comments", sa.Integer, nullable=False),
+    )
+    create_index(conn, "idx_activity_buckets_kind_hour", "activity_buckets", "kind, hour")
+    if conn.execute(sa.select(sa.func.count()).select_from(table)).scalar():
+        return
+
+    # IST, as the app stores its timestamps
+    since = _hour(datetime.utcnow() + timedelta(hours=5, minutes=30)) - RETENTION
+    entries = sa.table("cashback_entries", sa.column("id", sa.Uuid), sa.column("merchant_id", sa.Uuid))
+    buckets = {}
+    for source, column in (("entry_votes", "votes"), ("entry_comments", "comments")):
+        activity = sa.table(source, sa.column("entry_id", sa.Uuid), sa.column("created_at", sa.DateTime))
+        rows = conn.execute(
+            sa.select(activity.c.entry_id, entries.c.merchant_id, activity.c.created_at)
+            .join(entries, entries.c.id == activity.c.entry_id)
+            .where(activity.c.created_at >= since)
+        ).all()
+        for entry_id, merchant_id, created_at in rows:
+            hour = _hour(created_at)
+            for key in (("entry", entry_id, hour), ("merchant", merchant_id, hour)):
+                bucket = buckets.setdefault(key, {"votes": 0, "comments": 0})
+                bucket[column] += 1
+    if buckets:
+        conn.execute(table.insert(), [
+            {"kind": kind, "subject_id": subject_id, "hour": hour, **counts}
+            for (kind, subject_id, hour), counts in buckets.items()
+        ])
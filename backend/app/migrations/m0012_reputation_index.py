@@ -0,0 +1,9 @@
+"""Index on profiles.reputation_score for the leaderboard."""
+from app.migrations.helpers import create_index
+
+VERSION = 12
+DESCRIPTION = "Reputation index"
+
+
+def upgrade(conn):
+    create_index(conn, "idx_profiles_reputation_score", "profiles", "reputation_score DESC")
@@ -0,0 +1,25 @@
+"""alias_key on merchant_aliases (backfilled) and a lower(canonical_name) index, for create_entry's normalized lookups."""
+import sqlalchemy as sa
+
+from app.migrations.helpers import add_column, create_index
+
+VERSION = 13
+DESCRIPTION = "Alias key"
+
+
+def statement_key(text: str) -> str:
+    """The normalization as of this version (dedup.statement_key): lowercased, whitespace collapsed"""
+    return " ".join(text.lower().split())
+
+
+def upgrade(conn):
+    add_column(conn, "merchant_aliases", "alias_key", "VARCHAR")
+    table = sa.table("merchant_aliases", sa.column("id"), sa.column("alias_text"), sa.column("alias_key"))
+    rows = conn.execute(sa.select(table.c.id, table.c.alias_text).where(table.c.alias_key.is_(None))).all()
+    update = sa.update(table).where(table.c.id == sa.bindparam("alias_id")).values(alias_key=sa.bindparam("key"))
+    for start in range(0, len(rows), 1000):
+        conn.execute(update, [
+            {"alias_id": row.id, "key": statement_key(row.alias_text)} for row in rows[start:start + 1000]
+        ])
+    create_index(conn, "ix_merchant_aliases_alias_key", "merchant_aliases", "alias_key")
+    create_index(conn, "idx_merchants_canonical_name_lower", "merchants", "lower(canonical_name)")
@@ -0,0 +1,9 @@
+"""headers on idempotency_keys, so a replay carries the stored response's Location, Set-Cookie etc."""
+from app.migrations.helpers import add_column
+
+VERSION = 14
+DESCRIPTION = "Idempotency headers"
+
+
+def upgrade(conn):
+    add_column(conn, "idempotency_keys", "headers", "VARCHAR")
@@ -38,6 +38,12 @@ class FeedbackStatus(str, Enum):
     reviewed = "reviewed"
     resolved = "resolved"
 
+class MergeStatus(str, Enum):
+    pending = "pending"
+    approved = "approved"
+    rejected = "rejected"
+    applied = "applied"
+
 
 # ------------------------------
 # 1. PROFILES (Extends Supabase Auth)
@@ -109,6 +115,7 @@ class MerchantAlias(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     merchant_id: uuid.UUID = Field(foreign_key="merchants.id", index=True)
     alias_text: str = Field(index=True) # e.g. "STARBUCKS COFFEE #123"
+    alias_key: Optional[str] = Field(default=None, index=True) # dedup.statement_key(alias_text)
     created_at: datetime = Field(default_factory=ist_now)
 
     # Relationships
@@ -127,6 +134,8 @@ class CashbackEntry(SQLModel, table=True):
     contributor_id: uuid.UUID = Field(foreign_key="profiles.id", index=True)
     
     statement_name: str = Field(index=True) # The specific name on the statement
+    # Normalized statement_name; unique per card and merchant (see app/dedup.py)
+    statement_key: Optional[str] = None
     reported_cashback_rate: float = Field(default=0.0)
     mcc: Optional[str] = None
     notes: Optional[str] = None
@@ -140,9 +149,13 @@ class CashbackEntry(SQLModel, table=True):
     
     upvote_count: int = Field(default=0)
     downvote_count: int = Field(default=0)
+    # Wilson lower bound on the votes, decayed with age (see app/trust.py)
+    trust_score: float = Field(default=0.0)
     
     created_at: datetime = Field(default_factory=ist_now)
     updated_at: datetime = Field(default_factory=ist_now)
+    # Position in the change feed, set on every insert/update (see app/changes.py)
+    change_seq: Optional[int] = Field(default=None, sa_column=sa.Column(sa.BigInteger, index=True))
 
     # Relationships
     card: Card = Relationship(back_populates="entries")
@@ -254,3 +267,130 @@ class Feedback(SQLModel, table=True):
     # user: Optional[Profile] = Relationship(back_populates="feedbacks")
     # And add `feedbacks: List["Feedback"] = Relationship(back_populates="user")` to Profile.
     # For now, just recording the user_id (if logged in) is sufficient without reverse relation.
+
+
+# ------------------------------
+# 11. MERCHANT BEST CARDS (Derived, see app/best_cards.py)
+# ------------------------------
+class MerchantBestCard(SQLModel, table=True):
+    __tablename__ = "merchant_best_cards"
+
+    merchant_id: uuid.UUID = Field(foreign_key="merchants.id", primary_key=True)
+    card_id: uuid.UUID = Field(foreign_key="cards.id", primary_key=True)
+    best_entry_id: uuid.UUID = Field(foreign_key="cashback_entries.id")
+
+    rate: float # reported rate of the most trusted entry
+    confidence: float # 0..1 from status, votes and freshness
+    score: float # rate * confidence, the ranking key
+    entry_count: int = Field(default=0)
+    verified_count: int = Field(default=0)
+    last_verified_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=ist_now)
+
+
+# ------------------------------
+# 12. ENTRY FEED (Read model, see app/entry_feed.py)
+# ------------------------------
+class EntryFeed(SQLModel, table=True):
+    __tablename__ = "entry_feed"
+
+    # Same columns as cashback_entries (no foreign keys: rows follow entry writes in the same flush)...
+    entry_id: uuid.UUID = Field(primary_key=True)
+    card_id: uuid.UUID = Field(index=True)
+    merchant_id: uuid.UUID = Field(index=True)
+    contributor_id: uuid.UUID = Field(index=True)
+    statement_name: str
+    reported_cashback_rate: float = Field(default=0.0)
+    mcc: Optional[str] = None
+    notes: Optional[str] = None
+    status: EntryStatus = Field(
+        sa_column=sa.Column(sa.Enum(EntryStatus, name="entry_status", create_type=False), nullable=False)
+    )
+    upvote_count: int = Field(default=0)
+    downvote_count: int = Field(default=0)
+    created_at: datetime
+    updated_at: datetime
+    last_verified_at: Optional[datetime] = None
+    trust_score: float = Field(default=0.0)
+
+    # ...plus what the feed shows of the merchant, card and contributor
+    merchant_name: str
+    merchant_category: Optional[str] = None
+    merchant_default_mcc: Optional[str] = None
+    card_slug: str
+    card_name: str
+    card_issuer: str
+    card_network: str
+    card_max_cashback_rate: float = Field(default=0.0)
+    contributor_name: Optional[str] = None
+
+
+# ------------------------------
+# 13. CHANGE FEED (see app/changes.py)
+# ------------------------------
+class ChangeCounter(SQLModel, table=True):
+    __tablename__ = "change_counters"
+
+    name: str = Field(primary_key=True) # e.g. "cashback_entries"
+    value: int = Field(default=0, sa_column=sa.Column(sa.BigInteger, nullable=False, default=0))
+
+
+class EntryTombstone(SQLModel, table=True):
+    __tablename__ = "entry_tombstones"
+
+    entry_id: uuid.UUID = Field(primary_key=True) # the removed entry
+    change_seq: int = Field(sa_column=sa.Column(sa.BigInteger, nullable=False, index=True))
+    deleted_at: datetime = Field(default_factory=ist_now)
+
+
+# ------------------------------
+# 14. MERCHANT MERGE PROPOSALS (see app/merchant_clusters.py)
+# ------------------------------
+class MerchantMergeProposal(SQLModel, table=True):
+    __tablename__ = "merchant_merge_proposals"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # No foreign keys: applying a proposal deletes the source merchant
+    source_merchant_id: uuid.UUID = Field(index=True) # merged away
+    target_merchant_id: uuid.UUID = Field(index=True) # kept
+    source_name: str
+    target_name: str
+    score: float # name similarity adjusted by MCC/category agreement
+    name_score: float
+    signals: Optional[str] = None # e.g. "same_mcc,same_category"
+    status: str = Field(
+        default=MergeStatus.pending.value,
+        sa_column=sa.Column(sa.String, nullable=False, default=MergeStatus.pending.value, index=True)
+    ) # MergeStatus value
+    created_at: datetime = Field(default_factory=ist_now)
+    decided_at: Optional[datetime] = None
+    applied_at: Optional[datetime] = None
+
+
+# ------------------------------
+# 15. IDEMPOTENCY KEYS (see app/idempotency.py)
+# ------------------------------
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_keys"
+
+    key: str = Field(primary_key=True) # sha256 of caller + Idempotency-Key header
+    fingerprint: str # sha256 of method, path, query and body
+    status_code: Optional[int] = None # None while the first request is running
+    content_type: Optional[str] = None
+    headers: Optional[str] = None # JSON [[name, value], ...] of the response, content-length excluded
+    body: Optional[bytes] = Field(default=None, sa_column=sa.Column(sa.LargeBinary)) # zlib-compressed
+    created_at: datetime = Field(default_factory=ist_now)
+    expires_at: datetime = Field(index=True)
+
+
+# ------------------------------
+# 16. ACTIVITY BUCKETS (see app/trending.py)
+# ------------------------------
+class ActivityBucket(SQLModel, table=True):
+    __tablename__ = "activity_buckets"
+
+    kind: str = Field(primary_key=True) # "entry" | "merchant"
+    subject_id: uuid.UUID = Field(primary_key=True) # entry or merchant id (no foreign key: buckets outlive merges)
+    hour: datetime = Field(primary_key=True) # start of the hour (IST)
+    votes: int = Field(default=0)
+    comments: int = Field(default=0)
@@ -0,0 +1,201 @@
+"""
+Bulk moderation (the POST /admin/... moderation endpoints).
+
+Each operation selects the ids it applies to with one query, then updates
+them MODERATION_CHUNK at a time with UPDATE ... WHERE id IN (...), one
+transaction per chunk, and yields progress after each chunk. No ORM rows
+are loaded (merges excepted; they go through dedup.merge_group). Derived
+state follows in the same transaction:
+
+* entry_feed: the changed columns are updated in place
+* change feed: changes.touch()
+* trust_score: trust.refresh_entries()
+* merchant_best_cards: the affected (merchant, card) pairs are recomputed
+  once, after the last chunk (per chunk, a pair holding thousands of spam
+  entries would be re-read every time)
+* feed cache: the entries', cards' and merchants' tags are invalidated after commit
+
+Live (/live) events are not sent for bulk changes.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlmodel import Session, select
+
+from app import changes, entry_feed, trust  # noqa: F401 - register the hooks merges rely on
+from app.models import (
+    CashbackEntry, EntryFeed, EntryComment, RateSuggestion, EntryStatus, SuggestionStatus, ist_now,
+)
+
+MODERATION_CHUNK = int(os.environ.get("MODERATION_CHUNK", "1000"))
+MAX_MERGE_SOURCES = 100
+ENTRY_FILTERS = ("ids", "card_id", "merchant_id", "contributor_id", "current_status", "created_before", "created_after")
+
+_entries = CashbackEntry.__table__
+_feed = EntryFeed.__table__
+_comments = EntryComment.__table__
+_suggestions = RateSuggestion.__table__
+
+
+class InvalidRequest(ValueError):
+    pass
+
+
+def _chunks(ids: list):
+    for start in range(0, len(ids), MODERATION_CHUNK):
+        yield ids[start:start + MODERATION_CHUNK]
+
+
+def _uuid(value) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise InvalidRequest(f"Invalid id: {value}")
+
+
+def _datetime(value) -> datetime:
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise InvalidRequest(f"Invalid datetime: {value}")
+
+
+def parse_status(value) -> EntryStatus:
+    try:
+        return EntryStatus(value)
+    except ValueError:
+        raise InvalidRequest(f"Invalid status: {value}")
+
+
+def _invalidate(pairs, entry_ids):
+    from app import feed_cache
+
+    tags = {"feed", "sort:verified", "sort:trusted"}
+    for merchant_id, card_id in pairs:
+        tags.update((f"merchant:{merchant_id}", f"card:{card_id}"))
+    feed_cache.invalidate(*tags, *(f"entry:{entry_id}" for entry_id in entry_ids))
+
+
+def _pairs(session: Session, ids: list) -> list:
+    return [tuple(row) for row in session.connection().execute(
+        sa.select(_entries.c.merchant_id, _entries.c.card_id).where(_entries.c.id.in_(ids)).distinct()
+    ).all()]
+
+
+def _refresh_best_cards(engine, pairs):
+    from app import best_cards
+
+    pairs = list(pairs)
+    for start in range(0, len(pairs), MODERATION_CHUNK):
+        with Session(engine) as session:
+            best_cards.refresh_pairs(session, pairs[start:start + MODERATION_CHUNK])
+            session.commit()
+
+
+def entry_ids(session: Session, filters: dict) -> list:
+    """Ids of the entries matching every given filter; at least one is required"""
+    if not any(filters.get(name) for name in ENTRY_FILTERS):
+        raise InvalidRequest(f"Give at least one filter: {', '.join(ENTRY_FILTERS)}")
+    query = sa.select(_entries.c.id)
+    if filters.get("ids"):
+        query = query.where(_entries.c.id.in_([_uuid(value) for value in filters["ids"]]))
+    for name in ("card_id", "merchant_id", "contributor_id"):
+        if filters.get(name):
+            query = query.where(_entries.c[name] == _uuid(filters[name]))
+    if filters.get("current_status"):
+        query = query.where(_entries.c.status == parse_status(filters["current_status"]))
+    if filters.get("created_before"):
+        query = query.where(_entries.c.created_at < _datetime(filters["created_before"]))
+    if filters.get("created_after"):
+        query = query.where(_entries.c.created_at >= _datetime(filters["created_after"]))
+    return list(session.connection().execute(query).scalars())
+
+
+def set_entry_status(engine, ids: list, status):
+    status = parse_status(status)
+    done = 0
+    all_pairs = set()
+    for chunk in _chunks(ids):
+        now = ist_now()
+        values = {"status": status, "updated_at": now}
+        if status == EntryStatus.verified:
+            values["last_verified_at"] = now
+        with Session(engine) as session:
+            pairs = _pairs(session, chunk)
+            session.execute(sa.update(_entries).where(_entries.c.id.in_(chunk)).values(**values))
+            session.execute(sa.update(_feed).where(_feed.c.entry_id.in_(chunk)).values(**values))
+            changes.touch(session, chunk)
+            trust.refresh_entries(session, chunk)
+            session.commit()
+        all_pairs.update(pairs)
+        _invalidate(pairs, chunk)
+        done += len(chunk)
+        yield {"done": done, "total": len(ids)}
+    _refresh_best_cards(engine, all_pairs)
+
+
+def stale_suggestion_ids(session: Session, older_than_days: float) -> list:
+    cutoff = ist_now() - timedelta(days=older_than_days)
+    return list(session.connection().execute(
+        sa.select(_suggestions.c.id)
+        .where(_suggestions.c.status == SuggestionStatus.pending)
+        .where(_suggestions.c.created_at < cutoff)
+    ).scalars())
+
+
+def reject_suggestions(engine, ids: list):
+    done = 0
+    for chunk in _chunks(ids):
+        with Session(engine) as session:
+            session.execute(
+                sa.update(_suggestions)
+                .where(_suggestions.c.id.in_(chunk))
+                .where(_suggestions.c.status == SuggestionStatus.pending)
+                .values(status=SuggestionStatus.rejected)
+            )
+            session.commit()
+        done += len(chunk)
+        yield {"done": done, "total": len(ids)}
+
+
+def author_comment_ids(session: Session, author_id) -> list:
+    return list(session.connection().execute(
+        sa.select(_comments.c.id)
+        .where(_comments.c.author_id == _uuid(author_id))
+        .where(_comments.c.is_deleted == sa.false())
+    ).scalars())
+
+
+def soft_delete_comments(engine, ids: list):
+    done = 0
+    for chunk in _chunks(ids):
+        with Session(engine) as session:
+            session.execute(
+                sa.update(_comments).where(_comments.c.id.in_(chunk)).values(is_deleted=True, updated_at=ist_now())
+            )
+            session.commit()
+        done += len(chunk)
+        yield {"done": done, "total": len(ids)}
+
+
+def merge_entries(engine, target_id, source_ids: list) -> dict:
+    """Folds source entries (votes, comments, suggestions) into the target, in one transaction"""
+    from app import best_cards, dedup
+
+    target_id = _uuid(target_id)
+    source_ids = list({_uuid(value) for value in source_ids} - {target_id})
+    if not source_ids or len(source_ids) > MAX_MERGE_SOURCES:
+        raise InvalidRequest(f"Give 1 to {MAX_MERGE_SOURCES} source_ids other than the target")
+    with Session(engine) as session:
+        entries = session.exec(select(CashbackEntry).where(CashbackEntry.id.in_([target_id] + source_ids))).all()
+        target = next((entry for entry in entries if entry.id == target_id), None)
+        if target is None or len(entries) != len(source_ids) + 1:
+            raise InvalidRequest("Target or source entries not found")
+        pairs = list({(entry.merchant_id, entry.card_id) for entry in entries})
+        dedup.merge_group(session, entries, survivor=target)
+        best_cards.refresh_pairs(session, pairs)
+        session.commit()
+    _invalidate(pairs, [target_id] + source_ids)
+    return {"merged": len(source_ids), "target_id": str(target_id)}
@@ -0,0 +1,48 @@
+"""
+Read-only projections.
+
+Read endpoints only need a dozen scalar columns. Selecting whole models
+builds ORM instances, registers each one in the session identity map, and
+sets up attribute state and relationship loaders for it, and the handler
+then throws all of that away after serializing. Here, statements select
+table columns and run on the session's connection, so the result is plain
+named rows (row.statement_name, row[0]) and no ORM work happens per row.
+
+    rows = projections.fetch(session, sa.select(*projections.FEED).where(...))
+
+Writes, and reads that feed a write, keep using models.
+"""
+from app.models import (
+    EntryFeed, EntryComment, Profile, RateSuggestion, MerchantBestCard,
+)
+
+
+def columns(model, *names):
+    """Table columns of a model; selecting these yields named rows, not instances"""
+    table = model.__table__
+    return [table.c[name] for name in (names or table.c.keys())]
+
+
+def fetch(session, statement) -> list:
+    # The session's connection: same transaction and bind (primary/replica),
+    # without the ORM execution path
+    return session.connection().execute(statement).all()
+
+
+def fetch_one(session, statement):
+    return session.connection().execute(statement).first()
+
+
+# Shared column sets
+FEED = columns(EntryFeed)
+ACTIVITY = columns(EntryFeed, "entry_id", "merchant_name", "created_at", "reported_cashback_rate")
+PUBLIC_PROFILE = columns(Profile, "id", "display_name", "avatar_url", "reputation_score", "created_at")
+COMMENT = columns(EntryComment, "id", "entry_id", "author_id", "content", "created_at", "updated_at") + [
+    Profile.__table__.c.display_name.label("author_name"),
+    Profile.__table__.c.reputation_score.label("author_reputation"),
+    Profile.__table__.c.avatar_url.label("author_avatar_url"),
+]
+SUGGESTION = columns(
+    RateSuggestion, "id", "entry_id", "user_id", "proposed_rate", "reason", "upvotes", "downvotes", "created_at",
+) + [Profile.__table__.c.display_name.label("author_name")]
+BEST_CARD = columns(MerchantBestCard)
@@ -0,0 +1,134 @@
+"""
+Per-request SQL instrumentation.
+
+The cursor hooks registered on the engine in app/database.py feed every
+statement into the QueryStats object of the current request (a ContextVar
+set by the middleware in app/main.py). That gives us:
+
+* query count and total DB time per request (X-DB-* headers in DEBUG mode,
+  db_* series on /metrics)
+* an N+1 warning when the same statement shape repeats too often
+* optional query budgets per route (@query_budget), enforced in test mode
+"""
+import contextvars
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from app import metrics
+
+logger = logging.getLogger("app.sql")
+
+DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
+# Warn when one statement shape runs more than this many times in a request
+REPEAT_WARN_THRESHOLD = int(os.environ.get("SQL_REPEAT_WARN_THRESHOLD", "5"))
+# Test mode: a route going over its @query_budget fails with a 500
+ENFORCE_QUERY_BUDGETS = os.environ.get("SQL_ENFORCE_QUERY_BUDGETS", "false").lower() == "true"
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+# "IN (?, ?, ?)" and "IN (?)" should count as the same shape
+_PLACEHOLDER_LIST = re.compile(_PLACEHOLDER + r"(?:\s*,\s*" + _PLACEHOLDER + r")+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    __slots__ = ("path", "count", "total_time", "shapes", "warned")
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = {}
+        self.warned = set()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+
+        shape = statement_shape(statement)
+        repeats = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = repeats
+        if repeats > REPEAT_WARN_THRESHOLD and shape not in self.warned:
+            self.warned.add(shape)
+            metrics.inc("db_repeated_statement_warnings_total")
+            logger.warning(
+                "Possible N+1 on %s: statement repeated %d times: %s",
+                self.path or "<no request>", repeats, shape[:200]
+            )
+
+
+_current = contextvars.ContextVar("query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("?...", shape)
+
+
+def start(path: str = ""):
+    """Begins collecting stats for the current context. Returns (stats, token)."""
+    stats = QueryStats(path)
+    return stats, _current.set(stats)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+# SQLAlchemy engine event hooks (registered in app/database.py)
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    metrics.inc("db_queries_total")
+    metrics.observe("db_query_seconds", elapsed)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+# Query budgets
+def query_budget(max_queries: int):
+    """
+    Declares how many SQL statements a route may run per request.
+    Apply it directly above the def (below @router/@limiter) so the
+    attribute is carried over by functools.wraps.
+    """
+    def decorator(func):
+        func.query_budget = max_queries
+        return func
+    return decorator
+
+
+def check_budget(endpoint, stats: QueryStats):
+    """Returns an error message if the endpoint went over its budget, else None"""
+    budget = getattr(endpoint, "query_budget", None)
+    if budget is None or stats.count <= budget:
+        return None
+    metrics.inc("db_query_budget_exceeded_total", route=stats.path)
+    return f"{stats.path} ran {stats.count} queries (budget {budget})"
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """For scripts/tests: raises QueryBudgetExceeded if the block runs too many queries"""
+    stats, token = start("<assert_max_queries>")
+    try:
+        yield stats
+    finally:
+        stop(token)
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(f"Ran {stats.count} queries (budget {max_queries})")
@@ -1,20 +1,169 @@
-from fastapi import APIRouter
-from app.database import engine
-from sqlmodel import SQLModel
+import json
+import time
+import uuid
 
-# Explicitly import models so SQLModel registers them
-from app.models import Feedback
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select, col
+
+from app.database import engine, get_session
+from app.auth import get_current_admin_profile
+from app.models import Profile, MerchantMergeProposal, MergeStatus, ist_now
+from app import migrations, catalog, moderation
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.post("/migrate")
-def run_migrations():
+def run_migrations(admin: Profile = Depends(get_current_admin_profile)):
+    """
+    Applies pending schema migrations (same as `python -m app.migrations upgrade`).
+    Safe to run multiple times; concurrent runs wait on the migration lock.
+    """
+    applied = migrations.upgrade(engine)
+    return {"applied": applied, "version": migrations.LATEST_VERSION}
+
+
+@router.post("/cards/refresh")
+def refresh_card_catalog(
+    admin: Profile = Depends(get_current_admin_profile),
+    session: Session = Depends(get_session),
+):
+    """
+    Reloads this worker's card catalog. Other workers pick the change up
+    within CARD_CATALOG_TTL_SECONDS.
+    """
+    snapshot = catalog.refresh(session)
+    return {"version": snapshot.version, "cards": len(snapshot.cards), "etag": snapshot.etag}
+
+
+@router.get("/merchant-merges")
+def list_merchant_merges(
+    status: MergeStatus = MergeStatus.pending,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    admin: Profile = Depends(get_current_admin_profile),
+    session: Session = Depends(get_session),
+):
+    """Proposals from `python -m app.merchant_clusters propose`, best score first"""
+    return session.exec(
+        select(MerchantMergeProposal)
+        .where(MerchantMergeProposal.status == status)
+        .order_by(col(MerchantMergeProposal.score).desc())
+        .offset(offset)
+        .limit(limit)
+    ).all()
+
+
+@router.post("/merchant-merges/{proposal_id}")
+def decide_merchant_merge(
+    proposal_id: uuid.UUID,
+    data: dict,  # {"status": "approved" | "rejected"}
+    admin: Profile = Depends(get_current_admin_profile),
+    session: Session = Depends(get_session),
+):
+    """
+    Approves or rejects a proposal. Approved merges are carried out by
+    `python -m app.merchant_clusters apply`.
+    """
+    if data.get("status") not in (MergeStatus.approved.value, MergeStatus.rejected.value):
+        raise HTTPException(status_code=400, detail="status must be 'approved' or 'rejected'")
+    proposal = session.get(MerchantMergeProposal, proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    if proposal.status == MergeStatus.applied:
+        raise HTTPException(status_code=409, detail="Proposal already applied")
+
+    proposal.status = data["status"]
+    proposal.decided_at = ist_now()
+    session.add(proposal)
+    session.commit()
+    session.refresh(proposal)
+    return proposal
+
+
+def _run_bulk(request: Request, operation, ids: list, *args):
+    """
+    Runs a moderation operation over ids. With `Accept: application/x-ndjson`
+    each chunk's progress is streamed as a line; otherwise the final summary
+    is returned once everything is done.
+    """
+    started = time.perf_counter()
+
+    def progress():
+        yield {"done": 0, "total": len(ids)}
+        for step in operation(engine, ids, *args):
+            yield step
+        yield {"done": len(ids), "total": len(ids), "finished": True,
+               "seconds": round(time.perf_counter() - started, 3)}
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse((json.dumps(step) + "\n" for step in progress()), media_type="application/x-ndjson")
+    for step in progress():
+        pass
+    return step
+
+
+@router.post("/entries/status")
+def bulk_set_entry_status(
+    request: Request,
+    data: dict,  # {"status": "disputed", "ids": [...] and/or moderation.ENTRY_FILTERS}
+    admin: Profile = Depends(get_current_admin_profile),
+    session: Session = Depends(get_session),
+):
+    """Sets the status of every entry matching all the given filters"""
+    try:
+        status = moderation.parse_status(data.get("status"))
+        ids = moderation.entry_ids(session, data)
+    except moderation.InvalidRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session.close()
+    return _run_bulk(request, moderation.set_entry_status, ids, status)
+
+
+@router.post("/suggestions/reject-stale")
+def reject_stale_suggestions(
+    request: Request,
+    data: dict,  # {"older_than_days": 30}
+    admin: Profile = Depends(get_current_admin_profile),
+    session: Session = Depends(get_session),
+):
+    """Rejects every pending rate suggestion created more than older_than_days ago"""
+    days = data.get("older_than_days")
+    if not isinstance(days, (int, float)) or days < 0:
+        raise HTTPException(status_code=400, detail="older_than_days must be a non-negative number")
+    ids = moderation.stale_suggestion_ids(session, days)
+    session.close()
+    return _run_bulk(request, moderation.reject_suggestions, ids)
+
+
+@router.post("/comments/soft-delete")
+def soft_delete_author_comments(
+    request: Request,
+    data: dict,  # {"author_id": "..."}
+    admin: Profile = Depends(get_current_admin_profile),
+    session: Session = Depends(get_session),
+):
+    """Soft-deletes (is_deleted) every comment by the author; they disappear from comment lists"""
+    try:
+        ids = moderation.author_comment_ids(session, data.get("author_id"))
+    except moderation.InvalidRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session.close()
+    return _run_bulk(request, moderation.soft_delete_comments, ids)
+
+
+@router.post("/entries/merge")
+def merge_entries(
+    data: dict,  # {"target_id": "...", "source_ids": [...]}
+    admin: Profile = Depends(get_current_admin_profile),
+):
     """
-    Creates any missing tables in the database.
-    Safe to run multiple times (create_all ignores existing tables).
+    Merges the source entries into the target: votes (one per user),
+    comments and suggestions move to it, then the sources are deleted.
     """
+    if not isinstance(data.get("source_ids"), list):
+        raise HTTPException(status_code=400, detail="source_ids must be a list")
     try:
-        SQLModel.metadata.create_all(engine)
-        return {"message": "Database tables created successfully."}
-    except Exception as e:
-        return {"error": str(e)}
+        return moderation.merge_entries(engine, data.get("target_id"), data["source_ids"])
+    except moderation.InvalidRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
-from typing import List
+from fastapi import APIRouter, Depends, Request, Response
+from sqlmodel import Session
+from typing import Optional
 
 from app.database import get_session
-from app.models import Card
+from app import catalog
+from app.query_stats import query_budget
 
 router = APIRouter(
     prefix="/cards",
@@ -11,6 +12,11 @@ router = APIRouter(
 )
 
 @router.get("/")
-def read_cards(session: Session = Depends(get_session)):
-    cards = session.exec(select(Card)).all()
-    return cards
+@query_budget(1)
+def read_cards(request: Request, active: Optional[bool] = None, session: Session = Depends(get_session)):
+    """Served from the per-worker card catalog; only a cold or expired catalog queries the DB"""
+    snapshot = catalog.get_catalog(session)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.json_bytes(active), media_type="application/json", headers=headers)
@@ -2,11 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 from typing import List
 import uuid
+import sqlalchemy as sa
 from datetime import datetime
 
 from app.database import get_session
-from app.models import EntryComment, Profile
+from app.models import EntryComment, Profile, CashbackEntry
 from app.auth import get_current_profile
+from app.query_stats import query_budget
+from app import events, projections, trending
 
 router = APIRouter(
     prefix="/comments",
@@ -15,18 +18,18 @@ router = APIRouter(
 
 # Get comments for an entry
 @router.get("/entry/{entry_id}")
+@query_budget(2)
 def get_entry_comments(
     entry_id: uuid.UUID,
     session: Session = Depends(get_session)
 ):
-    from sqlalchemy.orm import selectinload
-    
-    comments = session.exec(
-        select(EntryComment)
-        .options(selectinload(EntryComment.author))
+    comments = projections.fetch(session,
+        sa.select(*projections.COMMENT)
+        .outerjoin(Profile, Profile.id == EntryComment.author_id)
         .where(EntryComment.entry_id == entry_id)
+        .where(EntryComment.is_deleted == False)
         .order_by(EntryComment.created_at.desc())
-    ).all()
+    )
     
     # Manual serialization
     response = []
@@ -39,12 +42,12 @@ def get_entry_comments(
             "updated_at": comment.updated_at.isoformat() if comment.updated_at else None,
         }
         
-        if comment.author:
+        if comment.author_reputation is not None: # outer join: None when the author row is missing
             comment_dict["author"] = {
-                "id": str(comment.author.id),
-                "display_name": comment.author.display_name,
-                "reputation_score": comment.author.reputation_score,
-                "avatar_url": comment.author.avatar_url
+                "id": str(comment.author_id),
+                "display_name": comment.author_name,
+                "reputation_score": comment.author_reputation,
+                "avatar_url": comment.author_avatar_url
             }
         
         response.append(comment_dict)
@@ -63,6 +66,9 @@ def create_comment(
     
     if not entry_id or not content:
         raise HTTPException(status_code=400, detail="Entry ID and content are required")
+    merchant_id = session.exec(select(CashbackEntry.merchant_id).where(CashbackEntry.id == uuid.UUID(entry_id))).first()
+    if merchant_id is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
     
     new_comment = EntryComment(
         entry_id=uuid.UUID(entry_id),
@@ -71,6 +77,7 @@ def create_comment(
     )
     
     session.add(new_comment)
+    trending.record(session, new_comment.entry_id, merchant_id, comments=1)
     
     # Update user's reputation score for commenting
     # Award 10 points for adding a comment
@@ -104,4 +111,5 @@ def create_comment(
             "avatar_url": refreshed_comment.author.avatar_url
         }
     
+    events.publish({"type": "comment", "entry_id": response["entry_id"], "comment": response})
     return response
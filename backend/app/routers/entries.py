@@ -1,227 +1,281 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from sqlmodel import Session, select, col, func
 from typing import List, Optional
 import uuid
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
 
 from app.database import get_session
+from app import catalog, best_cards, suggest, feed_cache, events, compact, projections, changes, bloom, dedup, trending
+from app import entry_feed, trust # noqa: F401 - register the hooks that keep entry_feed and trust_score in sync
+from app.single_flight import Group
 
-from app.models import CashbackEntry, Merchant, Card, Profile, MerchantAlias, EntryVote, RateSuggestion, RateSuggestionVote, VoteType, EntryStatus, SuggestionStatus, ist_now
+from app.models import CashbackEntry, EntryFeed, Merchant, Card, Profile, MerchantAlias, EntryVote, RateSuggestion, RateSuggestionVote, VoteType, EntryStatus, SuggestionStatus, ist_now
 from app.auth import get_optional_user, get_current_user, get_current_profile, get_optional_profile
 from app.limiter import limiter
+from app.query_stats import query_budget
+from app.routers.votes import apply_vote, _entry_event
 
 router = APIRouter(
     prefix="/entries",
     tags=["entries"],
 )
 
-# Reading entries (The main feed)
-@router.get("/", response_model=None)
-@limiter.limit("60/minute") # Global read limit
-def read_entries(
-    request: Request,
-    card_id: Optional[uuid.UUID] = None,
-    merchant_id: Optional[uuid.UUID] = None,
-    search: Optional[str] = None,
-    sort: Optional[str] = "merchant",
-    offset: int = 0,
-    limit: int = Query(default=20, le=100),
-    session: Session = Depends(get_session),
-    profile: Optional[Profile] = Depends(get_optional_profile)
-):
-    from sqlalchemy.orm import selectinload
-    
-    # Use selectinload to eagerly load relationships
-    query = select(CashbackEntry).options(
-        selectinload(CashbackEntry.merchant),
-        selectinload(CashbackEntry.card),
-        selectinload(CashbackEntry.contributor)
-    )
-    
-    # Joins for searching
+# Identical concurrent reads share one query (see app/single_flight.py)
+_feed_flights = Group("read_entries")
+_entry_flights = Group("read_entry")
+
+def _query_feed(session, card_id, merchant_id, search, sort, offset, limit):
+    # A single scan of the entry_feed read model (see app/entry_feed.py), no joins
+    query = sa.select(*projections.FEED)
+
     if search:
-        # Use a subquery to find matching IDs to avoid duplicates from joins
-        # This fixes the "SELECT DISTINCT + ORDER BY" error in Postgres
-        sub_query = select(CashbackEntry.id).join(Merchant).outerjoin(MerchantAlias).where(
-            (col(Merchant.canonical_name).ilike(f"%{search}%")) |
-            (col(CashbackEntry.statement_name).ilike(f"%{search}%")) |
-            (col(MerchantAlias.alias_text).ilike(f"%{search}%"))
+        pattern = f"%{search}%"
+        alias_merchants = select(MerchantAlias.merchant_id).where(col(MerchantAlias.alias_text).ilike(pattern))
+        query = query.where(
+            (col(EntryFeed.merchant_name).ilike(pattern)) |
+            (col(EntryFeed.statement_name).ilike(pattern)) |
+            (col(EntryFeed.merchant_id).in_(alias_merchants))
         )
-        query = query.where(CashbackEntry.id.in_(sub_query))
-        
-        # Ensure Merchant is joined for sorting if needed, but safe 1:1 join
-        if sort == "merchant":
-             query = query.join(Merchant)
-    else:
-        # If no search, we still need to join Merchant for sorting by merchant name
-        if sort == "merchant":
-             query = query.join(Merchant)
     
     if card_id:
-        query = query.where(CashbackEntry.card_id == card_id)
+        query = query.where(EntryFeed.card_id == card_id)
         
     if merchant_id:
-        query = query.where(CashbackEntry.merchant_id == merchant_id)
+        query = query.where(EntryFeed.merchant_id == merchant_id)
         
     # Sorting Logic
     if sort == "cashback-high":
-        query = query.order_by(col(CashbackEntry.reported_cashback_rate).desc(), col(CashbackEntry.updated_at).desc())
+        query = query.order_by(col(EntryFeed.reported_cashback_rate).desc(), col(EntryFeed.updated_at).desc())
     elif sort == "cashback-low":
-        query = query.order_by(col(CashbackEntry.reported_cashback_rate).asc(), col(CashbackEntry.updated_at).desc())
+        query = query.order_by(col(EntryFeed.reported_cashback_rate).asc(), col(EntryFeed.updated_at).desc())
     elif sort == "verified":
         # Sort by last_verified_at desc (nulls last)
-        query = query.order_by(col(CashbackEntry.last_verified_at).desc().nulls_last())
+        query = query.order_by(col(EntryFeed.last_verified_at).desc().nulls_last())
     elif sort == "newest":
-        query = query.order_by(col(CashbackEntry.created_at).desc())
+        query = query.order_by(col(EntryFeed.created_at).desc())
+    elif sort == "trusted":
+        # Precomputed (see app/trust.py)
+        query = query.order_by(col(EntryFeed.trust_score).desc(), col(EntryFeed.created_at).desc())
     else: # default "merchant"
-        # Sort by Merchant Name
-        # Note: We ensured Merchant is joined above if search is empty
-        query = query.order_by(col(Merchant.canonical_name).asc())
+        query = query.order_by(col(EntryFeed.merchant_name).asc())
 
-    entries = session.exec(query.offset(offset).limit(limit)).all()
-    
+    return projections.fetch(session, query.offset(offset).limit(limit))
 
 
-    
-    # Fetch user votes if logged in
+def _feed_row(row) -> dict:
+    """row: an entry_feed row (projections.FEED)"""
+    # Anonymous feed item; this is what the feed cache stores
+    return {
+        "id": str(row.entry_id),
+        "card_id": str(row.card_id),
+        "merchant_id": str(row.merchant_id),
+        "contributor_id": str(row.contributor_id),
+        "statement_name": row.statement_name,
+        "reported_cashback_rate": row.reported_cashback_rate,
+        "mcc": row.mcc,
+        "notes": row.notes,
+        "status": row.status,
+        "upvote_count": row.upvote_count,
+        "downvote_count": row.downvote_count,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+
+        "last_verified_at": row.last_verified_at.isoformat() if row.last_verified_at else None,
+        "user_vote": None, # per-user, filled in by read_entries (never cached)
+
+        "merchant": {
+            "id": str(row.merchant_id),
+            "canonical_name": row.merchant_name,
+            "category": row.merchant_category,
+            "default_mcc": row.merchant_default_mcc
+        },
+        "card": {
+            "id": str(row.card_id),
+            "slug": row.card_slug,
+            "name": row.card_name,
+            "issuer": row.card_issuer,
+            "network": row.card_network,
+            "max_cashback_rate": row.card_max_cashback_rate
+        },
+        "contributor": {
+            "id": str(row.contributor_id),
+            "display_name": row.contributor_name
+        },
+    }
+
+
+# Reading entries (The main feed)
+@router.get("/", response_model=None)
+@limiter.limit("60/minute") # Global read limit
+@query_budget(3) # feed scan + profile + user votes
+def read_entries(
+    request: Request,
+    card_id: Optional[uuid.UUID] = None,
+    merchant_id: Optional[uuid.UUID] = None,
+    search: Optional[str] = None,
+    sort: Optional[str] = "merchant",
+    offset: int = 0,
+    limit: int = Query(default=20, le=100),
+    response_format: Optional[str] = Query(default=None, alias="format", pattern="^(json|compact)$"),
+    response: Response = None,
+    session: Session = Depends(get_session),
+    profile: Optional[Profile] = Depends(get_optional_profile)
+):
+    """`?format=compact` (or Accept: application/vnd.cback.compact+json) returns the columnar form, see app/compact.py"""
+    cache_key = feed_cache.page_key(card_id, merchant_id, search, sort, offset, limit)
+    rows = feed_cache.lookup(cache_key)
+    if rows is None:
+        token = feed_cache.begin()
+
+        def load_page():
+            page = [_feed_row(entry) for entry in _query_feed(session, card_id, merchant_id, search, sort, offset, limit)]
+            tags = feed_cache.page_tags(card_id, merchant_id, sort, [row["id"] for row in page])
+            feed_cache.store(cache_key, page, tags, token)
+            return page
+
+        # The token is part of the key: a request arriving after a write never joins an older flight
+        rows = _feed_flights.do((cache_key, token), load_page)
+
+    # Fetch user votes if logged in (overlaid on the shared rows)
     user_votes_map = {}
-    if profile and entries:
-        entry_ids = [e.id for e in entries]
-        votes = session.exec(
-            select(EntryVote)
+    if profile and rows:
+        votes = projections.fetch(session,
+            sa.select(EntryVote.entry_id, EntryVote.vote_type)
             .where(EntryVote.user_id == profile.id)
-            .where(EntryVote.entry_id.in_(entry_ids))
-        ).all()
-        user_votes_map = {v.entry_id: v.vote_type for v in votes}
-    
-    # Manual serialization to include relationships
-    response = []
-    for entry in entries:
-        entry_dict = {
-            "id": str(entry.id),
-            "card_id": str(entry.card_id),
-            "merchant_id": str(entry.merchant_id),
-            "contributor_id": str(entry.contributor_id),
-            "statement_name": entry.statement_name,
-            "reported_cashback_rate": entry.reported_cashback_rate,
-            "mcc": entry.mcc,
-            "notes": entry.notes,
-            "status": entry.status,
-            "upvote_count": entry.upvote_count,
-            "downvote_count": entry.downvote_count,
-            "created_at": entry.created_at.isoformat() if entry.created_at else None,
-            "updated_at": entry.updated_at.isoformat() if entry.updated_at else None,
-
-            "last_verified_at": entry.last_verified_at.isoformat() if entry.last_verified_at else None,
-            "user_vote": user_votes_map.get(entry.id) # "up", "down", or None
-        }
-        
-        # Add relationships
-        if entry.merchant:
-            entry_dict["merchant"] = {
-                "id": str(entry.merchant.id),
-                "canonical_name": entry.merchant.canonical_name,
-                "category": entry.merchant.category,
-                "default_mcc": entry.merchant.default_mcc
-            }
-        
-        if entry.card:
-            entry_dict["card"] = {
-                "id": str(entry.card.id),
-                "slug": entry.card.slug,
-                "name": entry.card.name,
-                "issuer": entry.card.issuer,
-                "network": entry.card.network,
-                "max_cashback_rate": entry.card.max_cashback_rate
-            }
-        
-        if entry.contributor:
-            entry_dict["contributor"] = {
-                "id": str(entry.contributor.id),
-                "display_name": entry.contributor.display_name
-            }
-        
-        response.append(entry_dict)
-    
-    return response
+            .where(EntryVote.entry_id.in_([uuid.UUID(row["id"]) for row in rows]))
+        )
+        user_votes_map = {str(entry_id): vote_type for entry_id, vote_type in votes}
+
+    rows = [dict(row, user_vote=user_votes_map.get(row["id"])) for row in rows]
+    if compact.wants_compact(request, response_format):
+        return JSONResponse(compact.encode(rows), media_type=compact.MEDIA_TYPE, headers={"Vary": "Accept"})
+    response.headers["Vary"] = "Accept"
+    return rows
+
+# Delta sync for client-side mirrors (MUST be before /{entry_id})
+@router.get("/changes", response_model=None)
+@limiter.limit("60/minute")
+@query_budget(3) # changed ids + tombstones + feed rows
+def read_changes(
+    request: Request,
+    since: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=changes.MAX_LIMIT),
+    session: Session = Depends(get_session),
+):
+    """
+    Entries created or updated and entries removed after the `since` token, oldest first.
+    Start without `since`, store `next`, and call again while `has_more` is true.
+    """
+    try:
+        since_seq = changes.parse_token(since)
+    except changes.InvalidToken:
+        raise HTTPException(status_code=400, detail="Invalid since token")
+    return changes.read(session, since_seq, limit, _feed_row)
+
+# Trending (MUST be before /{entry_id})
+@router.get("/trending", response_model=None)
+@limiter.limit("60/minute")
+@query_budget(5) # entry ranking, feed rows, merchant ranking, names, purge (once per refresh)
+def read_trending(
+    request: Request,
+    window: str = Query(default="24h", pattern="^(24h|7d)$"),
+    limit: int = Query(default=20, ge=1, le=trending.TRENDING_TOP_K),
+    session: Session = Depends(get_session),
+):
+    """
+    Entries and merchants with the most votes and comments in the window.
+    Served from a list each worker recomputes every TRENDING_REFRESH_SECONDS.
+    """
+    snapshot = trending.top(session, window, _feed_row)
+    return {
+        "window": window,
+        "generated_at": snapshot.generated_at.isoformat(),
+        "entries": snapshot.entries[:limit],
+        "merchants": snapshot.merchants[:limit],
+    }
 
 # Get single entry by ID (MUST be before POST endpoint)
 @router.get("/{entry_id}", response_model=None)
+@query_budget(3) # entry_feed row + profile + user vote
 def read_entry(
     entry_id: uuid.UUID,
     session: Session = Depends(get_session),
     profile: Optional[Profile] = Depends(get_optional_profile)
 ):
-    from sqlalchemy.orm import selectinload
-    
-    entry = session.exec(
-        select(CashbackEntry)
-        .options(
-            selectinload(CashbackEntry.merchant),
-            selectinload(CashbackEntry.card),
-            selectinload(CashbackEntry.contributor)
-        )
-        .where(CashbackEntry.id == entry_id)
-    ).first()
-    
-    if not entry:
-        raise HTTPException(status_code=404, detail="Entry not found")
-    
-    # Manual serialization
-    response = {
-        "id": str(entry.id),
-        "card_id": str(entry.card_id),
-        "merchant_id": str(entry.merchant_id),
-        "contributor_id": str(entry.contributor_id),
-        "statement_name": entry.statement_name,
-        "reported_cashback_rate": entry.reported_cashback_rate,
-        "mcc": entry.mcc,
-        "notes": entry.notes,
-        "status": entry.status,
-        "upvote_count": entry.upvote_count,
-        "downvote_count": entry.downvote_count,
-        "created_at": entry.created_at.isoformat() if entry.created_at else None,
-        "updated_at": entry.updated_at.isoformat() if entry.updated_at else None,
-        "last_verified_at": entry.last_verified_at.isoformat() if entry.last_verified_at else None,
-
-        "user_vote": None
-    }
+    response = _entry_flights.do((entry_id, feed_cache.begin()), lambda: _load_entry(session, entry_id))
 
     if profile:
-        vote = session.exec(
-            select(EntryVote)
+        vote_type = session.connection().execute(
+            sa.select(EntryVote.vote_type)
             .where(EntryVote.entry_id == entry_id)
             .where(EntryVote.user_id == profile.id)
-        ).first()
-        if vote:
-            response["user_vote"] = vote.vote_type
-    
-    if entry.merchant:
-        response["merchant"] = {
-            "id": str(entry.merchant.id),
-            "canonical_name": entry.merchant.canonical_name,
-            "category": entry.merchant.category,
-            "default_mcc": entry.merchant.default_mcc
-        }
-    
-    if entry.card:
-        response["card"] = {
-            "id": str(entry.card.id),
-            "slug": entry.card.slug,
-            "name": entry.card.name,
-            "issuer": entry.card.issuer,
-            "network": entry.card.network,
-            "max_cashback_rate": entry.card.max_cashback_rate
-        }
-    
-    if entry.contributor:
-        response["contributor"] = {
-            "id": str(entry.contributor.id),
-            "display_name": entry.contributor.display_name
-        }
+        ).scalar()
+        if vote_type:
+            response = dict(response, user_vote=vote_type)
     
     return response
 
+def _load_entry(session, entry_id):
+    """Entry detail without user_vote; shared between coalesced requests"""
+    row = projections.fetch_one(session, sa.select(*projections.FEED).where(EntryFeed.entry_id == entry_id))
+    if not row:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return _feed_row(row)
+
 # Creating an entry (User Contribution)
+def _confirm_entry(session, entry: CashbackEntry, profile: Profile, rate: float) -> dict:
+    """
+    A resubmission of an existing entry. At the same rate it is an upvote (or,
+    from someone already vouching for it, re-verifies a verified entry); at
+    another rate it is a rate suggestion.
+    """
+    confirmation = None
+    status_before = entry.status
+    if rate != entry.reported_cashback_rate:
+        pending = session.exec(
+            select(RateSuggestion)
+            .where(RateSuggestion.entry_id == entry.id)
+            .where(RateSuggestion.user_id == profile.id)
+            .where(RateSuggestion.status == SuggestionStatus.pending)
+        ).first()
+        if not pending:
+            session.add(RateSuggestion(
+                entry_id=entry.id,
+                user_id=profile.id,
+                proposed_rate=rate,
+                reason="Submitted as a new entry",
+                status=SuggestionStatus.pending
+            ))
+            confirmation = "suggestion"
+    else:
+        vote = session.exec(
+            select(EntryVote.vote_type)
+            .where(EntryVote.entry_id == entry.id)
+            .where(EntryVote.user_id == profile.id)
+        ).first()
+        if entry.contributor_id != profile.id and vote != VoteType.up:
+            apply_vote(session, entry, profile.id, VoteType.up)
+            trending.record(session, entry.id, entry.merchant_id, votes=1)
+            confirmation = "upvote"
+        elif entry.status == EntryStatus.verified:
+            entry.last_verified_at = ist_now()
+            session.add(entry)
+            confirmation = "verified"
+        if confirmation:
+            best_cards.refresh_entry(session, entry)
+    session.commit()
+
+    if confirmation in ("upvote", "verified"):
+        verified_changed = confirmation == "verified" or entry.status != status_before
+        feed_cache.invalidate(f"entry:{entry.id}", "sort:trusted", *(["sort:verified"] if verified_changed else []))
+        session.refresh(entry)
+        events.publish(_entry_event(entry))
+    row = projections.fetch_one(session, sa.select(*projections.FEED).where(EntryFeed.entry_id == entry.id))
+    return dict(_feed_row(row), duplicate=True, confirmation=confirmation)
+
+
 @router.post("/", response_model=None)
 @limiter.limit("5/minute")
 def create_entry(
@@ -242,10 +296,11 @@ def create_entry(
     if not statement_name:
         raise HTTPException(status_code=400, detail="Statement name is required")
 
-    # 1. Resolve Card
+    # 1. Resolve Card (from the in-memory catalog, no query)
+    cards = catalog.get_catalog(session)
     card = None
     if card_id:
-        card = session.get(Card, card_id)
+        card = cards.get(card_id)
     
     # Fallback: if frontend sends 'source_sheet' or card name, try to find card.
     if not card and "source_sheet" in entry_data:
@@ -259,16 +314,23 @@ def create_entry(
         }
         slug = slug_map.get(sheet)
         if slug:
-            card = session.exec(select(Card).where(Card.slug == slug)).first()
+            card = cards.get_by_slug(slug)
 
     if not card:
         raise HTTPException(status_code=400, detail="Invalid Card")
 
     # 2. Merchant Matching Logic
-    # Step A: Check for Alias match
-    alias = session.exec(select(MerchantAlias).where(MerchantAlias.alias_text == statement_name)).first()
+    # Step A: Check for Alias match, case and spacing ignored (skipped when the Bloom filter rules it out)
+    alias = None
+    if bloom.might_exist("alias", statement_name):
+        alias = session.exec(
+            select(MerchantAlias).where(MerchantAlias.alias_key == dedup.statement_key(statement_name))
+        ).first()
+        if not alias:
+            bloom.false_positive("alias")
     
     merchant = None
+    indexed_alias = None
     if alias:
         merchant = alias.merchant
     else:
@@ -288,8 +350,14 @@ def create_entry(
         if not re.match(r"^[a-zA-Z0-9\s\-\&\.\']+$", merchant_name):
              raise HTTPException(status_code=400, detail="Merchant name contains invalid characters. Only letters, numbers, spaces, and &-.' are allowed.")
 
-        # Check if canonical merchant exists with this name (exact match)
-        merchant = session.exec(select(Merchant).where(Merchant.canonical_name == merchant_name)).first()
+        # Check if canonical merchant exists with this name (case-insensitive)
+        merchant = None
+        if bloom.might_exist("merchant", merchant_name):
+            merchant = session.exec(
+                select(Merchant).where(func.lower(Merchant.canonical_name) == merchant_name.lower())
+            ).first()
+            if not merchant:
+                bloom.false_positive("merchant")
         
         if not merchant:
             merchant = Merchant(
@@ -299,84 +367,63 @@ def create_entry(
             )
             session.add(merchant)
             session.flush() # Get ID
+            bloom.add("merchant", merchant_name)
         
         # Create Alias
         new_alias = MerchantAlias(
             merchant_id=merchant.id,
-            alias_text=statement_name
+            alias_text=statement_name,
+            alias_key=dedup.statement_key(statement_name)
         )
         session.add(new_alias)
+        bloom.add("alias", statement_name)
+        indexed_alias = (merchant.id, merchant.canonical_name, merchant.category, statement_name)
     
-    # 3. Create Entry
+    rate = float(str(entry_data.get("cashback_rate", "0")).replace("%", ""))
+
+    # 3. Same card, merchant and statement name already entered? Confirm it instead
+    existing = dedup.find_existing(session, card.id, merchant.id, statement_name)
+    if existing:
+        return _confirm_entry(session, existing, profile, rate)
+
+    # 4. Create Entry
     new_entry = CashbackEntry(
         card_id=card.id,
         merchant_id=merchant.id,
         contributor_id=profile.id,
         statement_name=statement_name,
-        reported_cashback_rate=float(str(entry_data.get("cashback_rate", "0")).replace("%", "")),
+        statement_key=dedup.statement_key(statement_name),
+        reported_cashback_rate=rate,
         mcc=entry_data.get("mcc"),
         notes=entry_data.get("comments"),
         status=EntryStatus.pending
     )
     
-    session.add(new_entry)
+    session.flush()  # the merchant/alias rows must survive a rolled-back savepoint
+    try:
+        with session.begin_nested():
+            session.add(new_entry)
+    except IntegrityError:
+        # A concurrent request inserted the same key first
+        existing = dedup.find_existing(session, card.id, merchant.id, statement_name)
+        if not existing:
+            raise
+        return _confirm_entry(session, existing, profile, rate)
     
     # Update user's reputation score for contributing
     # Award 50 points for adding a new entry
     profile.reputation_score += 50
     session.add(profile)
-    
+
+    best_cards.refresh_pairs(session, [(merchant.id, card.id)])
     session.commit()
     session.refresh(new_entry)
+    feed_cache.invalidate("feed", f"card:{card.id}", f"merchant:{merchant.id}")
+    if indexed_alias:
+        suggest.note_alias(*indexed_alias)
     
-    # Reload with relationships for the response
-    from sqlalchemy.orm import selectinload
-    refreshed_entry = session.exec(
-        select(CashbackEntry)
-        .options(
-            selectinload(CashbackEntry.merchant),
-            selectinload(CashbackEntry.card),
-            selectinload(CashbackEntry.contributor)
-        )
-        .where(CashbackEntry.id == new_entry.id)
-    ).first()
-    
-    # Manual serialization
-    response = {
-        "id": str(refreshed_entry.id),
-        "card_id": str(refreshed_entry.card_id),
-        "merchant_id": str(refreshed_entry.merchant_id),
-        "contributor_id": str(refreshed_entry.contributor_id),
-        "statement_name": refreshed_entry.statement_name,
-        "reported_cashback_rate": refreshed_entry.reported_cashback_rate,
-        "mcc": refreshed_entry.mcc,
-        "notes": refreshed_entry.notes,
-        "status": refreshed_entry.status,
-        "created_at": refreshed_entry.created_at.isoformat(),
-        "updated_at": refreshed_entry.updated_at.isoformat(),
-    }
-    
-    if refreshed_entry.merchant:
-        response["merchant"] = {
-            "id": str(refreshed_entry.merchant.id),
-            "canonical_name": refreshed_entry.merchant.canonical_name,
-            "category": refreshed_entry.merchant.category
-        }
-    
-    if refreshed_entry.card:
-        response["card"] = {
-            "id": str(refreshed_entry.card.id),
-            "name": refreshed_entry.card.name,
-            "slug": refreshed_entry.card.slug
-        }
-    
-    if refreshed_entry.contributor:
-        response["contributor"] = {
-            "id": str(refreshed_entry.contributor.id),
-            "display_name": refreshed_entry.contributor.display_name
-        }
-    
-    return response
+    # The entry_feed row was written in the same transaction
+    return _feed_row(projections.fetch_one(session, sa.select(*projections.FEED).where(EntryFeed.entry_id == new_entry.id)))
 
 
 # ------------------------------
@@ -384,40 +431,35 @@ def create_entry(
 # ------------------------------
 
 @router.get("/{entry_id}/suggestions", response_model=None)
+@query_budget(4)
 def get_rate_suggestions(
     entry_id: uuid.UUID,
     session: Session = Depends(get_session),
     profile: Optional[Profile] = Depends(get_optional_profile)
 ):
     """List pending suggestions for an entry"""
-    suggestions = session.exec(
-        select(RateSuggestion)
+    suggestions = projections.fetch(session,
+        sa.select(*projections.SUGGESTION)
+        .outerjoin(Profile, Profile.id == RateSuggestion.user_id)
         .where(RateSuggestion.entry_id == entry_id)
         .where(RateSuggestion.status == "pending")
         .order_by(col(RateSuggestion.upvotes).desc())
-    ).all()
+    )
     
     # Get user votes on these suggestions
     user_votes_map = {}
     if profile and suggestions:
         s_ids = [s.id for s in suggestions]
-        votes = session.exec(
-            select(RateSuggestionVote)
+        votes = projections.fetch(session,
+            sa.select(RateSuggestionVote.suggestion_id, RateSuggestionVote.vote_type)
             .where(RateSuggestionVote.user_id == profile.id)
             .where(RateSuggestionVote.suggestion_id.in_(s_ids))
-        ).all()
+        )
         user_votes_map = {v.suggestion_id: v.vote_type for v in votes}
 
     response = []
     for s in suggestions:
-        # Load author manully if needed or rely on selectinload if we add it to query
-        # Ideally we eager load author
-        # Let's do a quick fetch for author display name if not loaded. 
-        # But better to use options(selectinload(RateSuggestion.author)) above.
-        
-        # Re-query with eager load to be safe/clean or just lazy load (performance hit but ok for v1)
-        # Actually, let's just lazy load since N is small (pending suggestions usually few)
-        author_name = s.author.display_name if s.author else "Anonymous"
+        author_name = s.author_name or "Anonymous"
         
         response.append({
             "id": str(s.id),
@@ -528,6 +570,19 @@ def create_rate_suggestion(
     }
 
 
+def _suggestion_event(suggestion: RateSuggestion, accepted: bool) -> dict:
+    return {
+        "type": "suggestion",
+        "entry_id": str(suggestion.entry_id),
+        "suggestion_id": str(suggestion.id),
+        "proposed_rate": suggestion.proposed_rate,
+        "upvotes": suggestion.upvotes,
+        "downvotes": suggestion.downvotes,
+        "status": suggestion.status,
+        "accepted": accepted,
+    }
+
+
 @router.post("/suggestions/{suggestion_id}/vote", response_model=None)
 def vote_rate_suggestion(
     suggestion_id: uuid.UUID,
@@ -569,6 +624,7 @@ def vote_rate_suggestion(
             session.delete(existing_vote)
             session.add(suggestion)
             session.commit()
+            events.publish(_suggestion_event(suggestion, accepted=False))
             
             score = suggestion.upvotes - suggestion.downvotes
             return {
@@ -606,6 +662,7 @@ def vote_rate_suggestion(
     
     # 4. Check logic: e.g. threshold +5
     is_accepted = False
+    entry_event = None
     if suggestion.upvotes - suggestion.downvotes >= 5:
         # ACCEPT
         is_accepted = True
@@ -625,8 +682,27 @@ def vote_rate_suggestion(
                 author.reputation_score += 20 # Bonus for accepted edit
                 session.add(author)
 
+            best_cards.refresh_entry(session, entry)
+            entry_event = {
+                "type": "entry",
+                "entry_id": str(entry.id),
+                "card_id": str(entry.card_id),
+                "upvotes": entry.upvote_count,
+                "downvotes": entry.downvote_count,
+                "status": entry.status,
+                "reported_cashback_rate": entry.reported_cashback_rate,
+                "last_verified_at": entry.last_verified_at.isoformat(),
+            }
+
     session.add(suggestion)
     session.commit()
+    if is_accepted:
+        # New rate and last_verified_at: the entry and four orderings change
+        feed_cache.invalidate(f"entry:{suggestion.entry_id}", "sort:cashback-high", "sort:cashback-low",
+                              "sort:verified", "sort:trusted")
+    events.publish(_suggestion_event(suggestion, accepted=is_accepted))
+    if entry_event:
+        events.publish(entry_event)
     
     return {
         "upvotes": suggestion.upvotes,
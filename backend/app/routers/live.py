@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import json
+import uuid
+
+from app import events
+
+router = APIRouter(
+    prefix="/live",
+    tags=["live"],
+)
+
+HEARTBEAT_SECONDS = 15
+
+async def _stream(request: Request, topics):
+    try:
+        # Make sure this worker is listening to the broker. The first call may
+        # connect to Redis, so it runs off the event loop
+        await run_in_threadpool(events.get_broker)
+    except Exception:
+        events.logger.exception("Live event broker unavailable")
+        raise HTTPException(status_code=503, detail="Live updates unavailable, fall back to polling")
+    try:
+        subscription = events.bus.subscribe(topics)
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="Too many live connections, fall back to polling")
+
+    async def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(HEARTBEAT_SECONDS)
+                if not batch:
+                    yield ": ping\n\n"
+                for event in batch:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            events.bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Server-Sent Events; use with EventSource. Event types: entry, comment, suggestion, resync (refetch)
+@router.get("/entries/{entry_id}")
+async def live_entry(entry_id: uuid.UUID, request: Request):
+    return await _stream(request, [f"entry:{entry_id}"])
+
+@router.get("/cards/{card_id}")
+async def live_card(card_id: uuid.UUID, request: Request):
+    """Vote/status/rate changes for every entry of a card (comments are per entry only)"""
+    return await _stream(request, [f"card:{card_id}"])
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlmodel import Session
+from typing import List, Optional
+import json
+
+from app.database import engine, get_session
+from app.limiter import limiter
+from app.query_stats import query_budget
+from app.statement_match import match_lines
+
+router = APIRouter(
+    prefix="/match",
+    tags=["match"],
+)
+
+MAX_LINES = 1000
+STREAM_CHUNK = 100
+
+
+class StatementMatch(BaseModel):
+    lines: Optional[List[str]] = None
+    text: Optional[str] = None # one line per row, used when lines is missing
+    cards_per_line: int = Field(5, ge=1, le=20)
+    active_only: bool = True
+
+
+@router.post("/statement", response_model=None)
+@limiter.limit("20/minute")
+@query_budget(6) # alias IN + 2 fuzzy candidate queries + merchants + rates (+ card catalog when cold)
+def match_statement(
+    request: Request,
+    data: StatementMatch,
+    session: Session = Depends(get_session),
+):
+    """
+    Matches statement lines to merchants and their best cards.
+    Send `Accept: application/x-ndjson` to get one JSON object per line as
+    each chunk of lines is resolved.
+    """
+    lines = data.lines
+    if lines is None and data.text is not None:
+        lines = data.text.splitlines()
+    if lines is None:
+        raise HTTPException(status_code=400, detail="Provide 'lines' (list of strings) or 'text'")
+    if len(lines) > MAX_LINES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LINES} lines per request")
+    cards_per_line = data.cards_per_line
+    active_only = data.active_only
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        def stream():
+            # Own session: the request's one is closed once the response starts
+            with Session(engine) as stream_session:
+                for start in range(0, len(lines), STREAM_CHUNK):
+                    chunk = match_lines(stream_session, lines[start:start + STREAM_CHUNK], cards_per_line, active_only)
+                    for result in chunk:
+                        result["line_no"] += start
+                        yield json.dumps(result) + "\n"
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    results = match_lines(session, lines, cards_per_line, active_only)
+    return {
+        "matched": sum(1 for r in results if r["merchant"]),
+        "total": len(results),
+        "results": results,
+    }
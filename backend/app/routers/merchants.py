@@ -1,58 +1,68 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlmodel import Session, select, col
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, col
+import uuid
+import sqlalchemy as sa
 
 from app.database import get_session
-from app.models import Merchant
-from app.auth import get_current_user, get_current_admin_user, get_optional_user
+from app.models import MerchantBestCard
+from app import catalog, suggest, projections
+from app.query_stats import query_budget
 
 router = APIRouter(
     prefix="/merchants",
     tags=["merchants"],
 )
 
-@router.get("/", response_model=List[Merchant])
-def read_merchants(
-    offset: int = 0,
-    limit: int = Query(default=20, le=100),
-    search: Optional[str] = None,
-    source_sheet: Optional[str] = None,
+@router.get("/suggest", response_model=None)
+@query_budget(3) # only when this worker builds its index (first call)
+def suggest_merchants(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, le=suggest.SUGGEST_TOP_K),
     session: Session = Depends(get_session),
-    user: Optional[dict] = Depends(get_optional_user) # Optional Auth
 ):
-    query = select(Merchant)
-    if search:
-        query = query.where(col(Merchant.name).contains(search))
-    if source_sheet:
-        query = query.where(Merchant.source_sheet == source_sheet)
-    
-    merchants = session.exec(query.offset(offset).limit(limit)).all()
-    return merchants
+    """Typeahead over merchant names and statement aliases, served from memory (see app/suggest.py)"""
+    return suggest.get_index(session).search(q, limit)
 
-@router.post("/", response_model=Merchant)
-def create_merchant(
-    merchant: Merchant,
+
+@router.get("/{merchant_id}/best-cards", response_model=None)
+@query_budget(2) # index read (+ card catalog load when cold)
+def get_best_cards(
+    merchant_id: uuid.UUID,
+    limit: int = Query(default=10, le=50),
+    active_only: bool = True,
     session: Session = Depends(get_session),
-    user: dict = Depends(get_current_user) # Allow any authenticated user
 ):
-    # Auto-fill contributor if not provided or override it to ensure truth
-    # user dict comes from jwt payload.
-    # Supabase JWT usually has 'email' or 'user_metadata'
-    email = user.get("email", "Unknown")
-    user_metadata = user.get("user_metadata", {})
-    name = user_metadata.get("name") or user_metadata.get("full_name") or email.split("@")[0]
-    
-    merchant.contributor = name
-    
-    session.add(merchant)
-    session.commit()
-    session.refresh(merchant)
-    print(f"DEBUG: Created merchant {merchant.name} (Source: {merchant.source_sheet}) with ID {merchant.id}")
-    return merchant
+    """Cards ranked by trusted cashback rate at this merchant (see app/best_cards.py)"""
+    rows = projections.fetch(session,
+        sa.select(*projections.BEST_CARD)
+        .where(MerchantBestCard.merchant_id == merchant_id)
+        .order_by(col(MerchantBestCard.score).desc())
+    )
+    cards = catalog.get_catalog(session)
+
+    response = []
+    for row in rows:
+        card = cards.get(row.card_id)
+        if card is None or (active_only and not card.active):
+            continue
+        response.append({
+            "card": {
+                "id": str(card.id),
+                "slug": card.slug,
+                "name": card.name,
+                "issuer": card.issuer,
+                "network": card.network,
+                "image_url": card.image_url,
+            },
+            "rate": row.rate,
+            "confidence": row.confidence,
+            "score": row.score,
+            "entry_id": str(row.best_entry_id),
+            "entry_count": row.entry_count,
+            "verified_count": row.verified_count,
+            "last_verified_at": row.last_verified_at.isoformat() if row.last_verified_at else None,
+        })
+        if len(response) >= limit:
+            break
 
-@router.get("/{merchant_id}", response_model=Merchant)
-def read_merchant(merchant_id: int, session: Session = Depends(get_session)):
-    merchant = session.get(Merchant, merchant_id)
-    if not merchant:
-        raise HTTPException(status_code=404, detail="Merchant not found")
-    return merchant
+    return {"merchant_id": str(merchant_id), "cards": response}
@@ -1,20 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select, func
-from typing import List
+from typing import List, Optional
 import uuid
+import sqlalchemy as sa
 from datetime import datetime
 
 from app.database import get_session
-from app.models import Profile, CashbackEntry, RateSuggestion, SuggestionStatus
-from app.auth import get_current_profile
-from sqlalchemy.orm import selectinload
+from app.models import Profile, CashbackEntry, EntryFeed, RateSuggestion, SuggestionStatus
+from app.auth import get_current_profile, get_optional_profile
+from app import projections, leaderboard, catalog
+from app.query_stats import query_budget
 
 router = APIRouter(
     prefix="/profile",
     tags=["profile"],
 )
 
+def _recent_activity(session: Session, profile_id: uuid.UUID) -> list:
+    """Last 5 entries from the entry_feed read model (merchant name inlined, no joins)"""
+    rows = projections.fetch(session,
+        sa.select(*projections.ACTIVITY)
+        .where(EntryFeed.contributor_id == profile_id)
+        .order_by(EntryFeed.created_at.desc())
+        .limit(5)
+    )
+    return [
+        {
+            "id": str(row.entry_id),
+            "type": "added",  # For now, all are "added" entries
+            "merchant": row.merchant_name or "Unknown",
+            "date": row.created_at.isoformat(),
+            "cashback_rate": row.reported_cashback_rate,
+        }
+        for row in rows
+    ]
+
 @router.get("/me")
+@query_budget(6)
 def get_my_profile(
     profile: Profile = Depends(get_current_profile),
     session: Session = Depends(get_session)
@@ -37,27 +59,7 @@ def get_my_profile(
     ).one()
     
     # 3. Get recent activity (last 5 entries)
-    recent_entries = session.exec(
-        select(CashbackEntry)
-        .options(
-            selectinload(CashbackEntry.merchant),
-            selectinload(CashbackEntry.card)
-        )
-        .where(CashbackEntry.contributor_id == profile.id)
-        .order_by(CashbackEntry.created_at.desc())
-        .limit(5)
-    ).all()
-    
-    # Serialize recent activity
-    activity = []
-    for entry in recent_entries:
-        activity.append({
-            "id": str(entry.id),
-            "type": "added",  # For now, all are "added" entries
-            "merchant": entry.merchant.canonical_name if entry.merchant else "Unknown",
-            "date": entry.created_at.isoformat(),
-            "cashback_rate": entry.reported_cashback_rate,
-        })
+    activity = _recent_activity(session, profile.id)
     
     # Build response
     response = {
@@ -79,7 +81,35 @@ def get_my_profile(
     
     return response
 
+# MUST be before /{user_id}
+@router.get("/leaderboard")
+@query_budget(5) # profile + list (when expired) + histogram or card contributor checks
+def get_leaderboard(
+    card_id: Optional[uuid.UUID] = None,
+    limit: int = Query(default=20, ge=1, le=leaderboard.LEADERBOARD_TOP_K),
+    profile: Optional[Profile] = Depends(get_optional_profile),
+    session: Session = Depends(get_session)
+):
+    """
+    Top contributors by reputation, overall or among a card's contributors.
+    Signed in, `me` has the caller's rank (null on a card they have no entries on).
+    """
+    if card_id is not None and catalog.get_catalog(session).get(card_id) is None:
+        raise HTTPException(status_code=404, detail="Card not found")
+
+    leaders = leaderboard.board(session, card_id).ranked(limit)
+    me = None
+    if profile:
+        if card_id is None:
+            rank = leaderboard.global_rank(session, profile.reputation_score)
+        else:
+            rank = leaderboard.card_rank(session, card_id, profile.id, profile.reputation_score)
+        me = {"id": str(profile.id), "rank": rank, "reputation_score": profile.reputation_score}
+
+    return {"card_id": str(card_id) if card_id else None, "leaders": leaders, "me": me}
+
 @router.get("/{user_id}")
+@query_budget(6)
 def get_public_profile(
     user_id: uuid.UUID,
     session: Session = Depends(get_session)
@@ -87,7 +117,7 @@ def get_public_profile(
     """
     Get public profile of a user (no sensitive info)
     """
-    profile = session.get(Profile, user_id)
+    profile = projections.fetch_one(session, sa.select(*projections.PUBLIC_PROFILE).where(Profile.id == user_id))
     if not profile:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -105,28 +135,8 @@ def get_public_profile(
     ).one()
     
     # 3. Get recent activity (last 5 entries)
-    recent_entries = session.exec(
-        select(CashbackEntry)
-        .options(
-            selectinload(CashbackEntry.merchant),
-            selectinload(CashbackEntry.card)
-        )
-        .where(CashbackEntry.contributor_id == profile.id)
-        .order_by(CashbackEntry.created_at.desc())
-        .limit(5)
-    ).all()
+    activity = _recent_activity(session, profile.id)
     
-    # Serialize recent activity
-    activity = []
-    for entry in recent_entries:
-        activity.append({
-            "id": str(entry.id),
-            "type": "added",
-            "merchant": entry.merchant.canonical_name if entry.merchant else "Unknown",
-            "date": entry.created_at.isoformat(),
-            "cashback_rate": entry.reported_cashback_rate,
-        })
-
     return {
         "id": str(profile.id),
         "display_name": profile.display_name,
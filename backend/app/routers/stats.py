@@ -6,12 +6,16 @@ from pydantic import BaseModel
 
 from app.database import get_session
 from app.models import Card, Merchant, CashbackEntry, Profile
+from app.query_stats import query_budget
+from app.single_flight import Group
 
 router = APIRouter(
     prefix="/stats",
     tags=["stats"],
 )
 
+_dashboard_flights = Group("dashboard")
+
 class DashboardStats(BaseModel):
     total_cards: int
     total_merchants: int
@@ -19,7 +23,12 @@ class DashboardStats(BaseModel):
     last_updated: Optional[datetime]
 
 @router.get("/dashboard", response_model=DashboardStats)
+@query_budget(4)
 def get_dashboard_stats(session: Session = Depends(get_session)):
+    # Four aggregate scans; concurrent callers share one run
+    return _dashboard_flights.do("dashboard", lambda: _load_dashboard_stats(session))
+
+def _load_dashboard_stats(session: Session) -> DashboardStats:
     # 1. Total Cards
     total_cards = session.exec(select(func.count(Card.id))).one()
     
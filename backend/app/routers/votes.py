@@ -4,42 +4,57 @@ import uuid
 from datetime import datetime
 
 from app.database import get_session
-from app.database import get_session
+from app import best_cards, feed_cache, events, trending
 from app.models import EntryVote, CashbackEntry, Profile, VoteType, EntryStatus
-from app.auth import get_current_profile
+from app.auth import get_current_profile, get_current_admin_profile
 
 router = APIRouter(
     prefix="/votes",
     tags=["votes"],
 )
 
-@router.post("/entries/{entry_id}", response_model=None)
-def vote_entry(
-    entry_id: uuid.UUID,
-    vote_data: dict,  # {"vote_type": "up" | "down"}
-    session: Session = Depends(get_session),
-    profile: Profile = Depends(get_current_profile)
-):
-    vote_type = vote_data.get("vote_type")
-    # Basic validation (Pydantic would handle this if we used a model)
-    try:
-        vote_type_enum = VoteType(vote_type)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid vote type. Must be 'up' or 'down'")
+def _entry_event(entry: CashbackEntry) -> dict:
+    """Live update for /live subscribers (see app/events.py)"""
+    return {
+        "type": "entry",
+        "entry_id": str(entry.id),
+        "card_id": str(entry.card_id),
+        "upvotes": entry.upvote_count,
+        "downvotes": entry.downvote_count,
+        "status": entry.status,
+        "reported_cashback_rate": entry.reported_cashback_rate,
+        "last_verified_at": entry.last_verified_at.isoformat() if entry.last_verified_at else None,
+    }
 
-    # 1. Get the entry
-    entry = session.get(CashbackEntry, entry_id)
-    if not entry:
-        raise HTTPException(status_code=404, detail="Entry not found")
+def update_status(entry: CashbackEntry):
+    """Applies the vote-count rules to entry.status"""
+    # Auto-Verification Logic
+    # Rule: If upvotes >= 5 AND downvotes == 0, mark as verified
+    if entry.upvote_count >= 5 and entry.downvote_count == 0:
+        if entry.status != EntryStatus.verified:
+            entry.status = EntryStatus.verified
+            entry.last_verified_at = datetime.utcnow()
+            # Optional: Award extra reputation to contributor for getting verified?
+            
+            # Additional Rule: If verified but gets downvoted, maybe revert to disputed?
+    elif entry.status == EntryStatus.verified and entry.downvote_count > 0:
+        # If a verified entry gets a downvote, mark as disputed
+        entry.status = EntryStatus.disputed
+        # We don't clear last_verified_at so we know it WAS verified at some point
 
-    # 2. Check if user already voted
+def apply_vote(session: Session, entry: CashbackEntry, user_id: uuid.UUID, vote_type_enum: VoteType):
+    """
+    Adds, switches or toggles off a user's vote and applies the verification
+    rules. The caller commits. Returns the user's vote afterwards (or None).
+    """
+    # Check if user already voted
     existing_vote = session.exec(
         select(EntryVote)
-        .where(EntryVote.entry_id == entry_id)
-        .where(EntryVote.user_id == profile.id)
+        .where(EntryVote.entry_id == entry.id)
+        .where(EntryVote.user_id == user_id)
     ).first()
 
-    user_vote_status = vote_type
+    user_vote_status = vote_type_enum.value
 
     if existing_vote:
         # Update existing vote
@@ -66,8 +81,8 @@ def vote_entry(
     else:
         # New vote
         new_vote = EntryVote(
-            entry_id=entry_id,
-            user_id=profile.id,
+            entry_id=entry.id,
+            user_id=user_id,
             vote_type=vote_type_enum
         )
         session.add(new_vote)
@@ -77,23 +92,41 @@ def vote_entry(
         else:
             entry.downvote_count += 1
 
-    # 3. Auto-Verification Logic
-    # Rule: If upvotes >= 5 AND downvotes == 0, mark as verified
-    if entry.upvote_count >= 5 and entry.downvote_count == 0:
-        if entry.status != EntryStatus.verified:
-            entry.status = EntryStatus.verified
-            entry.last_verified_at = datetime.utcnow()
-            # Optional: Award extra reputation to contributor for getting verified?
-            
-            # Additional Rule: If verified but gets downvoted, maybe revert to disputed?
-    elif entry.status == EntryStatus.verified and entry.downvote_count > 0:
-        # If a verified entry gets a downvote, mark as disputed
-        entry.status = EntryStatus.disputed
-        # We don't clear last_verified_at so we know it WAS verified at some point
+    update_status(entry)
+    return user_vote_status
+
+@router.post("/entries/{entry_id}", response_model=None)
+def vote_entry(
+    entry_id: uuid.UUID,
+    vote_data: dict,  # {"vote_type": "up" | "down"}
+    session: Session = Depends(get_session),
+    profile: Profile = Depends(get_current_profile)
+):
+    vote_type = vote_data.get("vote_type")
+    # Basic validation (Pydantic would handle this if we used a model)
+    try:
+        vote_type_enum = VoteType(vote_type)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid vote type. Must be 'up' or 'down'")
+
+    # 1. Get the entry
+    entry = session.get(CashbackEntry, entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    # 2. Record the vote
+    status_before = entry.status
+    user_vote_status = apply_vote(session, entry, profile.id, vote_type_enum)
+    if user_vote_status is not None:  # withdrawing a vote is not activity
+        trending.record(session, entry.id, entry.merchant_id, votes=1)
 
     session.add(entry)
+    best_cards.refresh_entry(session, entry)
+    status_changed = entry.status != status_before
     session.commit()
+    feed_cache.invalidate(f"entry:{entry_id}", "sort:trusted", *(["sort:verified"] if status_changed else []))
     session.refresh(entry)
+    events.publish(_entry_event(entry))
 
     return {
         "message": "Vote recorded",
@@ -109,6 +142,7 @@ def vote_entry(
 def admin_set_votes(
     entry_id: uuid.UUID,
     data: dict,  # {"upvotes": 5, "downvotes": 0, "status": "verified"}
+    admin: Profile = Depends(get_current_admin_profile),
     session: Session = Depends(get_session),
 ):
     entry = session.get(CashbackEntry, entry_id)
@@ -127,8 +161,11 @@ def admin_set_votes(
             entry.last_verified_at = None
     
     session.add(entry)
+    best_cards.refresh_entry(session, entry)
     session.commit()
+    feed_cache.invalidate(f"entry:{entry_id}", "sort:verified", "sort:trusted")
     session.refresh(entry)
+    events.publish(_entry_event(entry))
     
     return {
         "message": "Entry updated",
@@ -0,0 +1,78 @@
+"""
+Single-flight request coalescing.
+
+When many identical reads arrive together (a cache entry just expired, a
+shared link is opened by everyone at once), only the first caller for a key
+runs the query; concurrent callers with the same key block until it finishes
+and get the same result, or the same exception. Handlers are sync and run in
+the threadpool, so waiting is a plain threading.Event.
+
+Results are shared between requests: callers must not mutate them.
+
+    group = Group("read_entry")
+    response = group.do(key, lambda: load(session, entry_id))
+
+Metrics: single_flight_executions_total (ran), single_flight_shared_total
+(DB executions saved), single_flight_timeouts_total.
+"""
+import os
+import threading
+
+from app import metrics
+
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.environ.get("SINGLE_FLIGHT_TIMEOUT_SECONDS", "10"))
+
+
+class SingleFlightTimeout(TimeoutError):
+    pass
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class Group:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, timeout: float = None):
+        if not SINGLE_FLIGHT_ENABLED:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as exc:
+                call.error = exc
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+                metrics.inc("single_flight_executions_total", group=self.name)
+
+        if not call.done.wait(SINGLE_FLIGHT_TIMEOUT_SECONDS if timeout is None else timeout):
+            metrics.inc("single_flight_timeouts_total", group=self.name)
+            raise SingleFlightTimeout(f"{self.name}: timed out waiting for an identical request")
+        metrics.inc("single_flight_shared_total", group=self.name)
+        if call.error is not None:
+            raise call.error
+        return call.result
@@ -0,0 +1,182 @@
+"""
+Statement line -> merchant matching, in bulk.
+
+A batch of lines is resolved with a fixed number of queries, not one per line:
+
+1. alias: MerchantAlias.alias_key IN (lines the Bloom filter can't rule out),
+   case and spacing ignored like create_entry (dedup.statement_key)
+2. fuzzy fallback for the rest: one query for merchants/aliases that contain
+   any of the lines' leading words (trigram-indexed on Postgres), then
+   candidates are scored in Python against the normalized line. At most
+   MAX_FUZZY_TERMS words go into that query, every line's first word before
+   any line's second, so a large batch can't build an unbounded OR of
+   ILIKEs; lines whose words didn't fit stay unmatched
+3. rates: merchant_best_cards for all matched merchants
+
+Card details come from the in-memory catalog.
+"""
+import difflib
+import re
+
+from sqlmodel import Session, select, col, or_
+
+from app import catalog, bloom, dedup
+from app.models import Merchant, MerchantAlias, MerchantBestCard
+
+FUZZY_THRESHOLD = 0.75
+MAX_HEAD_TOKENS = 2
+MAX_FUZZY_TERMS = 50
+
+# Payment processor prefixes ("PPSL* AGODA") and location/company suffixes
+_PROCESSOR_PREFIX = re.compile(r"^[A-Z0-9 ]{2,12}\*\s*")
+_NON_ALNUM = re.compile(r"[^A-Z0-9]+")
+NOISE_TOKENS = {
+    "PVT", "PRIVATE", "LTD", "LIMITED", "PTE", "INC", "LLP", "CO", "COMPANY", "CORP",
+    "INDIA", "IN", "WWW", "COM", "ONLINE", "PAYMENTS", "PAYMENT",
+}
+LOCATION_TOKENS = {
+    "HAR", "HR", "MH", "KA", "DL", "TN", "TS", "AP", "UP", "WB", "GJ", "RJ", "KL", "SG", "US", "GB",
+    "GURGAON", "GURUGRAM", "MUMBAI", "BANGALORE", "BENGALURU", "DELHI", "NEW", "NOIDA", "PUNE",
+    "HYDERABAD", "CHENNAI", "KOLKATA", "AHMEDABAD", "JAIPUR", "SINGAPORE",
+}
+
+
+def clean(line: str) -> str:
+    return " ".join(line.split())
+
+
+def normalize(text: str) -> str:
+    """'PPSL* Agoda Company PTE Gurgaon HAR' -> 'AGODA'"""
+    text = _PROCESSOR_PREFIX.sub("", text.upper().strip())
+    tokens = _NON_ALNUM.sub(" ", text).split()
+    while tokens and (tokens[-1] in LOCATION_TOKENS or tokens[-1].isdigit()):
+        tokens.pop()
+    tokens = [t for t in tokens if t not in NOISE_TOKENS]
+    return " ".join(tokens)
+
+
+def similarity(line_key: str, candidate_key: str) -> float:
+    if not line_key or not candidate_key:
+        return 0.0
+    if line_key == candidate_key:
+        return 1.0
+    # "AGODA HOTELS" vs "AGODA": the merchant name leads the statement line
+    if line_key.startswith(candidate_key + " ") or candidate_key.startswith(line_key + " "):
+        shorter, longer = sorted((len(line_key), len(candidate_key)))
+        return 0.9 + 0.1 * shorter / longer
+    return difflib.SequenceMatcher(None, line_key, candidate_key).ratio()
+
+
+def _head_tokens(key: str):
+    return [t for t in key.split() if len(t) >= 3][:MAX_HEAD_TOKENS]
+
+
+def _fuzzy_candidates(session: Session, keys):
+    """(merchant_id, normalized name) pairs for merchants sharing a leading word with any key"""
+    heads = [_head_tokens(key) for key in sorted(keys)]
+    terms = []
+    for position in range(MAX_HEAD_TOKENS):
+        for tokens in heads:
+            if position < len(tokens) and tokens[position] not in terms:
+                terms.append(tokens[position])
+    terms = terms[:MAX_FUZZY_TERMS]
+    if not terms:
+        return []
+    names = session.exec(
+        select(Merchant.id, Merchant.canonical_name)
+        .where(or_(*[col(Merchant.canonical_name).ilike(f"%{t}%") for t in terms]))
+    ).all()
+    aliases = session.exec(
+        select(MerchantAlias.merchant_id, MerchantAlias.alias_text)
+        .where(or_(*[col(MerchantAlias.alias_text).ilike(f"%{t}%") for t in terms]))
+    ).all()
+    return {(merchant_id, normalize(text)) for merchant_id, text in list(names) + list(aliases)}
+
+
+def _best_fuzzy(key, by_token):
+    """Scores only candidates sharing the line's first usable word (falls back to the next one)"""
+    best_id, best_score = None, 0.0
+    for token in _head_tokens(key):
+        for merchant_id, name in by_token.get(token, ()):
+            score = similarity(key, name)
+            if score > best_score:
+                best_id, best_score = merchant_id, score
+        if best_id is not None:
+            break
+    return best_id, best_score
+
+
+def match_lines(session: Session, lines, cards_per_line: int = 5, active_only: bool = True):
+    """One result dict per input line, in order"""
+    cleaned = [clean(line) for line in lines]
+    matches = {}  # cleaned line -> (merchant_id, how, similarity)
+
+    # 1. Alias, case and spacing ignored (the key create_entry stores)
+    distinct = sorted({line for line in cleaned if line})
+    keys = {line: dedup.statement_key(line) for line in distinct if bloom.might_exist("alias", line)}
+    if keys:
+        by_key = {}
+        for merchant_id, alias_key in session.exec(
+            select(MerchantAlias.merchant_id, MerchantAlias.alias_key)
+            .where(col(MerchantAlias.alias_key).in_(set(keys.values())))
+        ).all():
+            by_key.setdefault(alias_key, merchant_id)
+        for line, key in keys.items():
+            if key in by_key:
+                matches[line] = (by_key[key], "alias", 1.0)
+
+    # 2. Fuzzy fallback on normalized text
+    unmatched = {line: normalize(line) for line in distinct if line not in matches}
+    if unmatched:
+        by_token = {}
+        for merchant_id, name in _fuzzy_candidates(session, set(unmatched.values())):
+            for token in set(name.split()):
+                by_token.setdefault(token, []).append((merchant_id, name))
+        for line, key in unmatched.items():
+            best_id, best_score = _best_fuzzy(key, by_token)
+            if best_id is not None and best_score >= FUZZY_THRESHOLD:
+                matches[line] = (best_id, "exact" if best_score == 1.0 else "fuzzy", round(best_score, 3))
+
+    # 3. Merchant details + per-card rates for everything matched
+    merchant_ids = {m[0] for m in matches.values()}
+    merchants, rates = {}, {}
+    if merchant_ids:
+        merchants = {
+            m.id: m for m in session.exec(select(Merchant).where(col(Merchant.id).in_(merchant_ids))).all()
+        }
+        for row in session.exec(
+            select(MerchantBestCard)
+            .where(col(MerchantBestCard.merchant_id).in_(merchant_ids))
+            .order_by(col(MerchantBestCard.score).desc())
+        ).all():
+            rates.setdefault(row.merchant_id, []).append(row)
+    cards = catalog.get_catalog(session)
+
+    results = []
+    for line_no, (raw, line) in enumerate(zip(lines, cleaned)):
+        result = {"line_no": line_no, "line": raw, "merchant": None, "match": None,
+                  "similarity": 0.0, "cards": []}
+        found = matches.get(line)
+        merchant = merchants.get(found[0]) if found else None
+        if merchant:
+            result["merchant"] = {
+                "id": str(merchant.id),
+                "canonical_name": merchant.canonical_name,
+                "category": merchant.category,
+            }
+            result["match"], result["similarity"] = found[1], found[2]
+            for row in rates.get(merchant.id, []):
+                card = cards.get(row.card_id)
+                if card is None or (active_only and not card.active):
+                    continue
+                result["cards"].append({
+                    "card_id": str(card.id),
+                    "slug": card.slug,
+                    "name": card.name,
+                    "rate": row.rate,
+                    "confidence": row.confidence,
+                })
+                if len(result["cards"]) >= cards_per_line:
+                    break
+        results.append(result)
+    return results
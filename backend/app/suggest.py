@@ -0,0 +1,255 @@
+"""
+Merchant typeahead index.
+
+A per-worker radix trie over normalized merchant names (and each later word
+in them, so "cafe" finds "Bired Cafe") and statement aliases. Every node
+keeps the top SUGGEST_TOP_K merchants of its subtree by popularity (entry
+count plus a share of upvotes), so a lookup is a walk down at most len(q)
+characters followed by a slice, with no database access.
+
+* built on first use (three queries)
+* a daemon thread adds merchants/aliases created since the last sync every
+  SUGGEST_REFRESH_SECONDS, and rebuilds from scratch (fresh counts, deletes)
+  every SUGGEST_REBUILD_SECONDS
+* create_entry adds its new merchant/alias immediately in its own worker
+
+Readers never take a lock: nodes are only ever extended, edges are split by
+swapping in a fully built node, and top lists are replaced, not mutated.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+
+from sqlmodel import Session, select, func, col
+
+from app import metrics
+from app.models import Merchant, MerchantAlias, CashbackEntry
+from app.statement_match import normalize
+
+SUGGEST_TOP_K = 20
+SUGGEST_REFRESH_SECONDS = float(os.environ.get("SUGGEST_REFRESH_SECONDS", "30"))
+SUGGEST_REBUILD_SECONDS = float(os.environ.get("SUGGEST_REBUILD_SECONDS", "3600"))
+UPVOTE_WEIGHT = 0.2
+MAX_WORD_STARTS = 3
+# Rows committed slightly after their created_at are picked up by re-reading this window
+SYNC_OVERLAP = timedelta(minutes=2)
+
+logger = logging.getLogger("app.suggest")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def suggest_key(text: str) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", text.lower()).split())
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}  # first char -> (edge label, child)
+        self.top = ()       # ((score, merchant_id), ...) best first
+
+
+class SuggestIndex:
+    def __init__(self):
+        self.root = _Node()
+        self.merchants = {}  # merchant_id -> {"name", "category", "entry_count", "score"}
+        self.indexed = set()  # (merchant_id, key) already inserted
+        self.keys = 0
+        self.watermark = None
+        self.write_lock = threading.Lock()  # the refresher and create_entry both write
+
+    def _offer(self, node, merchant_id, score):
+        top = [item for item in node.top if item[1] != merchant_id]
+        top.append((score, merchant_id))
+        top.sort(key=lambda item: -item[0])
+        node.top = tuple(top[:SUGGEST_TOP_K])
+
+    def insert(self, key: str, merchant_id, score: float):
+        if not key or (merchant_id, key) in self.indexed:
+            return
+        self.indexed.add((merchant_id, key))
+        self.keys += 1
+
+        node, i = self.root, 0
+        self._offer(node, merchant_id, score)
+        while i < len(key):
+            edge = node.children.get(key[i])
+            if edge is None:
+                leaf = _Node()
+                leaf.top = ((score, merchant_id),)
+                node.children[key[i]] = (key[i:], leaf)
+                return
+            label, child = edge
+            common = 0
+            while common < len(label) and i + common < len(key) and label[common] == key[i + common]:
+                common += 1
+            if common < len(label):
+                # Split the edge; the new middle node is complete before it is linked
+                middle = _Node()
+                middle.children = {label[common]: (label[common:], child)}
+                middle.top = child.top
+                node.children[key[i]] = (label[:common], middle)
+                child = middle
+            i += common
+            node = child
+            self._offer(node, merchant_id, score)
+
+    def add_merchant(self, merchant_id, name: str, category=None, entry_count: int = 0, upvotes: int = 0):
+        with self.write_lock:
+            self._add_merchant(merchant_id, name, category, entry_count, upvotes)
+
+    def _add_merchant(self, merchant_id, name, category, entry_count, upvotes):
+        info = self.merchants.get(merchant_id)
+        if info is None:
+            info = {"name": name, "category": category, "entry_count": entry_count,
+                    "score": entry_count + UPVOTE_WEIGHT * upvotes}
+            self.merchants[merchant_id] = info
+        key = suggest_key(name)
+        words = key.split()
+        self.insert(key, merchant_id, info["score"])
+        for start in range(1, min(len(words), MAX_WORD_STARTS)):
+            self.insert(" ".join(words[start:]), merchant_id, info["score"])
+
+    def add_alias(self, merchant_id, alias_text: str):
+        info = self.merchants.get(merchant_id)
+        if info is not None:
+            with self.write_lock:
+                self.insert(suggest_key(normalize(alias_text)), merchant_id, info["score"])
+
+    def search(self, query: str, limit: int = 10):
+        prefix = suggest_key(query)
+        if not prefix:
+            return []
+        node, i = self.root, 0
+        while i < len(prefix):
+            edge = node.children.get(prefix[i])
+            if edge is None:
+                return []
+            label, child = edge
+            rest = prefix[i:]
+            if rest.startswith(label):
+                i += len(label)
+                node = child
+            elif label.startswith(rest):
+                node = child
+                break
+            else:
+                return []
+        results = []
+        for score, merchant_id in node.top[:limit]:
+            info = self.merchants[merchant_id]
+            results.append({
+                "id": str(merchant_id),
+                "canonical_name": info["name"],
+                "category": info["category"],
+                "entry_count": info["entry_count"],
+            })
+        return results
+
+
+def _popularity(session: Session, merchant_ids=None):
+    query = select(
+        CashbackEntry.merchant_id,
+        func.count(CashbackEntry.id),
+        func.coalesce(func.sum(CashbackEntry.upvote_count), 0),
+    ).group_by(CashbackEntry.merchant_id)
+    if merchant_ids is not None:
+        query = query.where(col(CashbackEntry.merchant_id).in_(merchant_ids))
+    return {merchant_id: (count, upvotes) for merchant_id, count, upvotes in session.exec(query).all()}
+
+
+def build(session: Session) -> SuggestIndex:
+    started = time.perf_counter()
+    index = SuggestIndex()
+    counts = _popularity(session)
+    merchants = session.exec(
+        select(Merchant.id, Merchant.canonical_name, Merchant.category, Merchant.created_at)
+    ).all()
+    # Most popular first, so top lists fill with their final members early
+    merchants.sort(key=lambda m: -(counts.get(m[0], (0, 0))[0]))
+    watermark = None
+    for merchant_id, name, category, created_at in merchants:
+        count, upvotes = counts.get(merchant_id, (0, 0))
+        index.add_merchant(merchant_id, name, category, count, upvotes)
+        watermark = max(watermark, created_at) if watermark else created_at
+    for merchant_id, alias_text, created_at in session.exec(
+        select(MerchantAlias.merchant_id, MerchantAlias.alias_text, MerchantAlias.created_at)
+    ).all():
+        index.add_alias(merchant_id, alias_text)
+        watermark = max(watermark, created_at) if watermark else created_at
+    index.watermark = watermark
+
+    metrics.inc("suggest_index_builds_total")
+    metrics.set_gauge("suggest_index_keys", index.keys)
+    metrics.observe("suggest_index_build_seconds", time.perf_counter() - started)
+    return index
+
+
+def sync(session: Session, index: SuggestIndex):
+    """Adds merchants and aliases created since the index watermark"""
+    since = index.watermark - SYNC_OVERLAP if index.watermark else None
+    merchant_query = select(Merchant.id, Merchant.canonical_name, Merchant.category, Merchant.created_at)
+    alias_query = select(MerchantAlias.merchant_id, MerchantAlias.alias_text, MerchantAlias.created_at)
+    if since is not None:
+        merchant_query = merchant_query.where(Merchant.created_at > since)
+        alias_query = alias_query.where(MerchantAlias.created_at > since)
+
+    new_merchants = [m for m in session.exec(merchant_query).all() if m[0] not in index.merchants]
+    counts = _popularity(session, [m[0] for m in new_merchants]) if new_merchants else {}
+    watermark = index.watermark
+    for merchant_id, name, category, created_at in new_merchants:
+        count, upvotes = counts.get(merchant_id, (0, 0))
+        index.add_merchant(merchant_id, name, category, count, upvotes)
+        watermark = max(watermark, created_at) if watermark else created_at
+    for merchant_id, alias_text, created_at in session.exec(alias_query).all():
+        index.add_alias(merchant_id, alias_text)
+        watermark = max(watermark, created_at) if watermark else created_at
+    index.watermark = watermark
+    metrics.set_gauge("suggest_index_keys", index.keys)
+
+
+_lock = threading.Lock()
+_index = None
+_refresher = None
+
+
+def _refresh_loop():
+    from app.database import engine
+
+    global _index
+    last_build = time.monotonic()
+    while True:
+        time.sleep(SUGGEST_REFRESH_SECONDS)
+        try:
+            with Session(engine) as session:
+                if time.monotonic() - last_build > SUGGEST_REBUILD_SECONDS:
+                    _index = build(session)
+                    last_build = time.monotonic()
+                else:
+                    sync(session, _index)
+        except Exception:
+            logger.exception("Suggest index refresh failed")
+
+
+def get_index(session: Session) -> SuggestIndex:
+    global _index, _refresher
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = build(session)
+            if _refresher is None:
+                _refresher = threading.Thread(target=_refresh_loop, name="suggest-refresh", daemon=True)
+                _refresher.start()
+    return _index
+
+
+def note_alias(merchant_id, name: str, category, alias_text: str):
+    """Called after create_entry commits; no-op until the index is built"""
+    index = _index
+    if index is not None:
+        index.add_merchant(merchant_id, name, category, entry_count=1)
+        index.add_alias(merchant_id, alias_text)
@@ -0,0 +1,142 @@
+"""
+Trending entries and merchants (GET /entries/trending).
+
+Votes and comments are counted as they happen into `activity_buckets`, one
+row per (entry or merchant, hour), in the writing transaction (an upsert
+that adds to the current hour's row). A window's ranking sums the buckets in
+that window:
+
+    score = votes + COMMENT_WEIGHT * comments
+
+so it reads at most one row per active subject per hour instead of scanning
+entry_votes. Each worker keeps the top TRENDING_TOP_K of each window, with
+the feed rows and merchant names resolved, and recomputes them every
+TRENDING_REFRESH_SECONDS. One request recomputes while the others keep
+serving the previous list. Buckets older than the longest window are deleted
+every TRENDING_PURGE_SECONDS.
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlmodel import Session
+
+from app import metrics
+from app.models import ActivityBucket, EntryFeed, Merchant, ist_now
+
+TRENDING_REFRESH_SECONDS = float(os.environ.get("TRENDING_REFRESH_SECONDS", "60"))
+TRENDING_TOP_K = int(os.environ.get("TRENDING_TOP_K", "100"))
+TRENDING_PURGE_SECONDS = float(os.environ.get("TRENDING_PURGE_SECONDS", "3600"))
+COMMENT_WEIGHT = 2
+WINDOWS = {"24h": timedelta(hours=24), "7d": timedelta(days=7)}
+RETENTION = max(WINDOWS.values()) + timedelta(hours=1)
+
+_table = ActivityBucket.__table__
+_lock = threading.Lock()
+_snapshots = {}  # window -> Snapshot
+_last_purge = 0.0
+
+
+class Snapshot:
+    def __init__(self, window: str, entries: list, merchants: list):
+        self.window = window
+        self.entries = entries
+        self.merchants = merchants
+        self.generated_at = ist_now()
+        self.loaded_at = time.monotonic()
+
+
+def hour_of(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record(session: Session, entry_id, merchant_id, votes: int = 0, comments: int = 0):
+    """Counts activity on an entry (and its merchant) in the current hour; the caller commits"""
+    from app.database import upsert
+
+    hour = hour_of(ist_now())
+    upsert(session, _table, [
+        {"kind": "entry", "subject_id": entry_id, "hour": hour, "votes": votes, "comments": comments},
+        {"kind": "merchant", "subject_id": merchant_id, "hour": hour, "votes": votes, "comments": comments},
+    ], index_elements=["kind", "subject_id", "hour"], update_columns=[], increment_columns=["votes", "comments"])
+
+
+def _ranked(session: Session, kind: str, since) -> list:
+    votes = sa.func.sum(_table.c.votes)
+    comments = sa.func.sum(_table.c.comments)
+    score = votes + COMMENT_WEIGHT * comments
+    return session.connection().execute(
+        sa.select(_table.c.subject_id, votes.label("votes"), comments.label("comments"), score.label("score"))
+        .where(_table.c.kind == kind)
+        .where(_table.c.hour >= since)
+        .group_by(_table.c.subject_id)
+        .order_by(score.desc(), sa.func.max(_table.c.hour).desc())
+        .limit(TRENDING_TOP_K)
+    ).all()
+
+
+def _activity(row) -> dict:
+    return {"votes": row.votes, "comments": row.comments, "score": row.score}
+
+
+def compute(session: Session, window: str, serialize) -> Snapshot:
+    """serialize: turns an entry_feed row into the feed item"""
+    from app import projections
+
+    started = time.perf_counter()
+    # The current hour counts as the window's last bucket
+    since = hour_of(ist_now()) - WINDOWS[window] + timedelta(hours=1)
+
+    ranked = _ranked(session, "entry", since)
+    rows = {
+        row.entry_id: row for row in projections.fetch(session,
+            sa.select(*projections.FEED).where(EntryFeed.entry_id.in_([r.subject_id for r in ranked]))
+        )
+    } if ranked else {}
+    entries = [
+        dict(serialize(rows[r.subject_id]), activity=_activity(r)) for r in ranked if r.subject_id in rows
+    ]
+
+    ranked = _ranked(session, "merchant", since)
+    names = dict(session.connection().execute(
+        sa.select(Merchant.id, Merchant.canonical_name).where(Merchant.id.in_([r.subject_id for r in ranked]))
+    ).all()) if ranked else {}
+    merchants = [
+        {"id": str(r.subject_id), "canonical_name": names[r.subject_id], "activity": _activity(r)}
+        for r in ranked if r.subject_id in names
+    ]
+
+    metrics.observe("trending_refresh_seconds", time.perf_counter() - started, window=window)
+    return Snapshot(window, entries, merchants)
+
+
+def _purge():
+    global _last_purge
+    if time.monotonic() - _last_purge < TRENDING_PURGE_SECONDS:
+        return
+    _last_purge = time.monotonic()
+    from app.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(sa.delete(_table).where(_table.c.hour < hour_of(ist_now()) - RETENTION))
+
+
+def top(session: Session, window: str, serialize) -> Snapshot:
+    """The window's current list, recomputed if older than TRENDING_REFRESH_SECONDS"""
+    snapshot = _snapshots.get(window)
+    if snapshot is not None and time.monotonic() - snapshot.loaded_at < TRENDING_REFRESH_SECONDS:
+        return snapshot
+    # Without a list yet, wait for whoever is computing one; otherwise serve the old one meanwhile
+    if not _lock.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        current = _snapshots.get(window)
+        if current is not snapshot and current is not None:
+            return current
+        _snapshots[window] = snapshot = compute(session, window, serialize)
+        _purge()
+        return snapshot
+    finally:
+        _lock.release()
@@ -0,0 +1,163 @@
+"""
+Entry trust score, the key of the feed's `sort=trusted`.
+
+    trust_score = wilson_lower_bound(up, down) * 0.5 ** (age_days / TRUST_HALF_LIFE_DAYS)
+
+* Wilson: the lower bound of the 95% confidence interval of the upvote
+  share, so 3/3 ranks below 40/42 and an unvoted entry scores 0
+* age: days since last_verified_at, else since transaction_date, else
+  since created_at (a report of an old transaction starts out aged)
+* rejected entries score 0
+
+The score is stored on cashback_entries and entry_feed. A before_flush hook
+recomputes it whenever an entry's votes, status or dates change through the
+ORM (votes, confirmations, accepted suggestions, merges), so the sort is a
+plain index scan. Core writers call refresh_entries(). Decay only moves with
+time, so the scores are recomputed periodically (e.g. a nightly cron);
+only rows whose score moved are written, and stamped for the change feed:
+
+    python -m app.trust [--chunk 1000]
+
+The job runs outside the API workers, so it can only expire their cached
+sort=trusted pages through a shared feed cache (FEED_CACHE_REDIS_URL).
+With the per-worker cache, decayed scores show up within
+FEED_CACHE_TTL_SECONDS.
+"""
+import argparse
+import math
+import os
+import time
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+
+from app.models import CashbackEntry, EntryFeed, EntryStatus, ist_now
+
+TRUST_HALF_LIFE_DAYS = float(os.environ.get("TRUST_HALF_LIFE_DAYS", "90"))
+Z = 1.96  # 95% confidence
+CHUNK = 1000
+# Decay job: smaller moves are not written
+TOLERANCE = 1e-4
+
+INPUT_COLUMNS = ("upvote_count", "downvote_count", "status", "last_verified_at", "transaction_date", "created_at")
+
+_entries = CashbackEntry.__table__
+_feed = EntryFeed.__table__
+
+
+def wilson_lower_bound(upvotes: int, downvotes: int) -> float:
+    n = upvotes + downvotes
+    if n <= 0:
+        return 0.0
+    p = upvotes / n
+    return (p + Z * Z / (2 * n) - Z * math.sqrt((p * (1 - p) + Z * Z / (4 * n)) / n)) / (1 + Z * Z / n)
+
+
+def score(upvotes, downvotes, status, last_verified_at, transaction_date, created_at, now) -> float:
+    if status == EntryStatus.rejected:
+        return 0.0
+    if last_verified_at:
+        since = last_verified_at
+    elif transaction_date:
+        since = datetime.combine(transaction_date, datetime.min.time())
+    else:
+        since = created_at
+    age_days = max((now - since).total_seconds(), 0) / 86400 if since else 0
+    return round(wilson_lower_bound(upvotes or 0, downvotes or 0) * 0.5 ** (age_days / TRUST_HALF_LIFE_DAYS), 6)
+
+
+def _row_score(row, now) -> float:
+    return score(*(getattr(row, name) for name in INPUT_COLUMNS), now)
+
+
+def _write(connection, scores: dict):
+    """scores: {entry_id: trust_score}, written to both tables"""
+    if not scores:
+        return
+    params = [{"target_id": entry_id, "score": value} for entry_id, value in scores.items()]
+    connection.execute(
+        sa.update(_entries).where(_entries.c.id == sa.bindparam("target_id")).values(trust_score=sa.bindparam("score")),
+        params,
+    )
+    connection.execute(
+        sa.update(_feed).where(_feed.c.entry_id == sa.bindparam("target_id")).values(trust_score=sa.bindparam("score")),
+        params,
+    )
+
+
+def refresh_entries(connection, entry_ids):
+    """Recomputes entries changed by Core statements; connection is a Session or Connection"""
+    entry_ids = list(set(entry_ids))
+    now = ist_now()
+    for start in range(0, len(entry_ids), CHUNK):
+        rows = connection.execute(
+            sa.select(_entries.c.id, *(_entries.c[name] for name in INPUT_COLUMNS))
+            .where(_entries.c.id.in_(entry_ids[start:start + CHUNK]))
+        ).all()
+        _write(connection, {row.id: _row_score(row, now) for row in rows})
+
+
+def decay(engine, chunk: int = CHUNK) -> dict:
+    """Recomputes every score, one transaction per chunk (keyset on id)"""
+    from app import changes, feed_cache
+
+    now = ist_now()
+    scanned = updated = 0
+    last_id = None
+    columns = [_entries.c.id, _entries.c.trust_score] + [_entries.c[name] for name in INPUT_COLUMNS]
+    while True:
+        query = sa.select(*columns).order_by(_entries.c.id).limit(chunk)
+        if last_id is not None:
+            query = query.where(_entries.c.id > last_id)
+        with Session(engine) as session:
+            rows = session.connection().execute(query).all()
+            if not rows:
+                break
+            scores = {}
+            for row in rows:
+                value = _row_score(row, now)
+                if row.trust_score is None or abs(value - row.trust_score) > TOLERANCE:
+                    scores[row.id] = value
+            _write(session.connection(), scores)
+            changes.touch(session, list(scores))
+            session.commit()
+        scanned += len(rows)
+        updated += len(scores)
+        last_id = rows[-1].id
+    if updated and feed_cache.backend.name == "redis":
+        feed_cache.invalidate("sort:trusted")
+    return {"scanned": scanned, "updated": updated}
+
+
+def _before_flush(session, flush_context, instances):
+    now = None
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, CashbackEntry):
+            continue
+        if obj not in session.new:
+            state = sa.inspect(obj)
+            if not any(state.attrs[name].history.has_changes() for name in INPUT_COLUMNS):
+                continue
+        now = now or ist_now()
+        obj.trust_score = score(
+            obj.upvote_count, obj.downvote_count, obj.status, obj.last_verified_at,
+            obj.transaction_date, obj.created_at or now, now,
+        )
+
+
+event.listen(OrmSession, "before_flush", _before_flush)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute entry trust scores")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="entries per transaction")
+    args = parser.parse_args()
+
+    from app.database import engine
+
+    started = time.perf_counter()
+    result = decay(engine, args.chunk)
+    print(f"{result} in {time.perf_counter() - started:.1f}s")
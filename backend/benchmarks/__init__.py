@@ -0,0 +1 @@
+"""Benchmark suite: synthetic dataset + endpoint runner (see run.py)."""
@@ -0,0 +1,54 @@
+"""
+Diffs two benchmark result files.
+
+    python -m benchmarks.compare before.json after.json [--threshold 15]
+
+Exits with status 1 if any case's p95 regressed by more than the threshold
+(percent) or now runs more queries.
+"""
+import argparse
+import json
+import sys
+
+
+def _pct(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Allowed p95 regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.before) as f:
+        before = json.load(f)["results"]
+    with open(args.after) as f:
+        after = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'case':<70} {'p50':>16} {'p95':>16} {'queries':>9}")
+    for name in sorted(set(before) | set(after)):
+        if name not in before or name not in after:
+            print(f"{name:<70} {'(only in ' + ('after' if name in after else 'before') + ')':>16}")
+            continue
+        b, a = before[name], after[name]
+        p50 = _pct(b["p50_ms"], a["p50_ms"])
+        p95 = _pct(b["p95_ms"], a["p95_ms"])
+        queries = f"{b['queries_max']}->{a['queries_max']}"
+        print(f"{name:<70} {a['p50_ms']:>8.2f} ({p50:+5.0f}%) {a['p95_ms']:>8.2f} ({p95:+5.0f}%) {queries:>9}")
+        if p95 > args.threshold or (a["queries_max"] or 0) > (b["queries_max"] or 0):
+            regressions.append(name)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for name in regressions:
+            print(f"  {name}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Deterministic synthetic dataset for benchmarks.
+
+Same seed + scale => byte-identical rows, so runs on different commits are
+comparable. Rows are bulk inserted with Core executemany in chunks.
+
+Volumes at scale=1.0:
+    12 cards, 2k profiles, 5k merchants (1-6 aliases each, skewed),
+    40k entries (merchant popularity is Zipf-like), ~100k votes (heavy tail),
+    20k comments, 5k rate suggestions
+"""
+import itertools
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlmodel import SQLModel, Session
+
+from app import dedup, trust
+from app.models import (
+    Card, Profile, Merchant, MerchantAlias, CashbackEntry, EntryVote,
+    EntryComment, RateSuggestion, EntryStatus, VoteType, SuggestionStatus,
+)
+
+BASE_TIME = datetime(2025, 1, 1)
+CHUNK_SIZE = 5000
+
+ISSUERS = ["SBI", "HDFC", "ICICI", "Axis", "Kotak", "AMEX"]
+NETWORKS = ["Visa", "Mastercard", "RuPay", "Amex"]
+CATEGORIES = ["Dining", "Travel", "Shopping", "Groceries", "Fuel", "Utilities", "Entertainment", "Health"]
+SYLLABLES = ["ag", "o", "da", "swi", "ggy", "zo", "ma", "to", "fli", "pk", "art", "my", "ntra",
+             "bi", "g", "bas", "ket", "uber", "ola", "red", "bus", "nyk", "aa", "croma", "tata"]
+SUFFIXES = ["", "", " Foods", " Travels", " Retail", " Pvt Ltd", " Online", " Mart", " Cafe"]
+PROCESSORS = ["", "", "PPSL* ", "RAZ*", "PAYU* ", "CCA*"]
+CITIES = ["GURGAON HAR", "MUMBAI IN", "BANGALORE KA", "DELHI DL", "PUNE MH", "SINGAPORE SG"]
+RATES = [0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0]
+
+# Search terms the runner uses: one common word and one rare merchant
+COMMON_SEARCH = "foods"
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _heavy_tail(rng, alpha, cap):
+    """Pareto-distributed small integers: mostly 0-1, occasionally large"""
+    return min(int(rng.paretovariate(alpha)) - 1, cap)
+
+
+def _merchant_name(rng, i):
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    return f"{word}{rng.choice(SUFFIXES)} {i}"
+
+
+def prepare_schema(engine):
+    """Drops all tables and migrates from scratch (the target DB is benchmark-only)"""
+    from app import migrations
+
+    SQLModel.metadata.drop_all(engine)
+    migrations.upgrade(engine)
+
+
+def _insert(conn, model, rows):
+    table = model.__table__
+    for start in range(0, len(rows), CHUNK_SIZE):
+        conn.execute(table.insert(), rows[start:start + CHUNK_SIZE])
+
+
+def generate(engine, scale: float = 1.0, seed: int = 42) -> dict:
+    """Loads the dataset into `engine`. Returns row counts per table."""
+    rng = random.Random(seed)
+    n_cards = 12
+    n_profiles = max(int(2000 * scale), 20)
+    n_merchants = max(int(5000 * scale), 50)
+    n_entries = max(int(40000 * scale), 200)
+    n_comments = int(20000 * scale)
+    n_suggestions = int(5000 * scale)
+
+    cards = []
+    for i in range(n_cards):
+        issuer = ISSUERS[i % len(ISSUERS)]
+        cards.append({
+            "id": _uuid(rng), "slug": f"{issuer.lower()}-card-{i}", "name": f"{issuer} Card {i}",
+            "issuer": issuer, "network": NETWORKS[i % len(NETWORKS)],
+            "description": f"Up to {RATES[i % len(RATES)]}% cashback",
+            "image_url": None, "max_cashback_rate": RATES[i % len(RATES)],
+            "active": i < n_cards - 2, "created_at": BASE_TIME,
+        })
+
+    profiles = []
+    for i in range(n_profiles):
+        profiles.append({
+            "id": _uuid(rng), "email": f"user{i}@bench.local", "display_name": f"user{i}",
+            "avatar_url": None, "role": "admin" if i == 0 else "user",
+            "reputation_score": _heavy_tail(rng, 0.8, 100000),
+            "created_at": BASE_TIME + timedelta(minutes=i),
+        })
+
+    merchants, aliases, merchant_aliases = [], [], []
+    for i in range(n_merchants):
+        name = _merchant_name(rng, i)
+        merchant_id = _uuid(rng)
+        merchants.append({
+            "id": merchant_id, "canonical_name": name, "category": rng.choice(CATEGORIES),
+            "default_mcc": str(rng.randint(4000, 7999)), "website": None,
+            "created_at": BASE_TIME + timedelta(minutes=i),
+        })
+        texts = []
+        for _ in range(1 + min(_heavy_tail(rng, 1.5, 5), 5)):
+            alias_text = f"{rng.choice(PROCESSORS)}{name.upper()} {rng.choice(CITIES)}"
+            texts.append(alias_text)
+            aliases.append({
+                "id": _uuid(rng), "merchant_id": merchant_id, "alias_text": alias_text,
+                "alias_key": dedup.statement_key(alias_text),
+                "created_at": BASE_TIME + timedelta(minutes=i),
+            })
+        merchant_aliases.append(texts)
+
+    # Zipf-like merchant popularity, card popularity skewed too
+    merchant_cum = list(itertools.accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(n_merchants)))
+    card_cum = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(n_cards)))
+    merchant_range, card_range = range(n_merchants), range(n_cards)
+    span_minutes = 365 * 24 * 60
+
+    entries, votes = [], []
+    statement_counts = {}
+    for i in range(n_entries):
+        m_idx = rng.choices(merchant_range, cum_weights=merchant_cum)[0]
+        c_idx = rng.choices(card_range, cum_weights=card_cum)[0]
+        created_at = BASE_TIME + timedelta(minutes=rng.randrange(span_minutes))
+        entry_id = _uuid(rng)
+
+        up = _heavy_tail(rng, 1.1, n_profiles // 2)
+        down = _heavy_tail(rng, 2.5, 10)
+        voters = rng.sample(range(n_profiles), min(up + down, n_profiles))
+        up = min(up, len(voters))
+        down = len(voters) - up
+        for pos, p_idx in enumerate(voters):
+            votes.append({
+                "entry_id": entry_id, "user_id": profiles[p_idx]["id"],
+                "vote_type": VoteType.up if pos < up else VoteType.down,
+                "created_at": created_at + timedelta(minutes=pos + 1),
+            })
+
+        if up >= 5 and down == 0:
+            status = EntryStatus.verified
+        elif down > up and down >= 3:
+            status = EntryStatus.disputed
+        elif rng.random() < 0.02:
+            status = EntryStatus.rejected
+        else:
+            status = EntryStatus.pending
+
+        contributor_id = profiles[rng.randrange(n_profiles)]["id"]
+        statement_name = rng.choice(merchant_aliases[m_idx])
+        # (card, merchant, statement name) is unique; repeats become other branches of the store
+        seen = statement_counts.get((c_idx, statement_name), 0)
+        statement_counts[(c_idx, statement_name)] = seen + 1
+        if seen:
+            statement_name = f"{statement_name} #{seen + 1}"
+        last_verified_at = created_at + timedelta(days=1) if status == EntryStatus.verified else None
+        entries.append({
+            "id": entry_id, "card_id": cards[c_idx]["id"], "merchant_id": merchants[m_idx]["id"],
+            "contributor_id": contributor_id,
+            "statement_name": statement_name, "statement_key": dedup.statement_key(statement_name),
+            "reported_cashback_rate": rng.choice(RATES), "mcc": merchants[m_idx]["default_mcc"],
+            "notes": None, "status": status, "transaction_date": created_at.date(),
+            "last_verified_at": last_verified_at, "upvote_count": up, "downvote_count": down,
+            "trust_score": trust.score(up, down, status, last_verified_at, created_at.date(), created_at, BASE_TIME),
+            "created_at": created_at, "updated_at": created_at,
+        })
+
+    comments = []
+    for i in range(n_comments):
+        entry = entries[min(int(rng.expovariate(1.0 / (n_entries / 10))), n_entries - 1)]
+        comments.append({
+            "id": _uuid(rng), "entry_id": entry["id"],
+            "author_id": profiles[rng.randrange(n_profiles)]["id"],
+            "content": f"Got {rng.choice(RATES)}% on this last month", "is_deleted": False,
+            "created_at": entry["created_at"] + timedelta(hours=rng.randint(1, 500)), "updated_at": None,
+        })
+
+    suggestions = []
+    for i in range(n_suggestions):
+        entry = entries[rng.randrange(n_entries)]
+        suggestions.append({
+            "id": _uuid(rng), "entry_id": entry["id"],
+            "user_id": profiles[rng.randrange(n_profiles)]["id"],
+            "proposed_rate": rng.choice(RATES), "reason": "Statement shows a different rate",
+            "status": rng.choices(list(SuggestionStatus), weights=[8, 1, 1])[0],
+            "upvotes": _heavy_tail(rng, 1.5, 4), "downvotes": 0,
+            "created_at": entry["created_at"] + timedelta(days=rng.randint(1, 30)),
+        })
+
+    with engine.begin() as conn:
+        _insert(conn, Card, cards)
+        _insert(conn, Profile, profiles)
+        _insert(conn, Merchant, merchants)
+        _insert(conn, MerchantAlias, aliases)
+        _insert(conn, CashbackEntry, entries)
+        _insert(conn, EntryVote, votes)
+        _insert(conn, EntryComment, comments)
+        _insert(conn, RateSuggestion, suggestions)
+
+    # Derived tables are normally maintained by the write paths
+    from app import best_cards, entry_feed
+    with Session(engine) as session:
+        best_pairs = best_cards.rebuild(session)
+        feed_rows = entry_feed.rebuild(session)
+        session.commit()
+
+    return {
+        "cards": len(cards), "profiles": len(profiles), "merchants": len(merchants),
+        "merchant_aliases": len(aliases), "cashback_entries": len(entries),
+        "entry_votes": len(votes), "entry_comments": len(comments),
+        "rate_suggestions": len(suggestions), "merchant_best_cards": best_pairs,
+        "entry_feed": feed_rows,
+    }
@@ -0,0 +1,358 @@
+"""
+Mixed-traffic load generator with SLO checks.
+
+Starts `uvicorn app.main:app --workers N` against the benchmark dataset (or
+targets --url) and replays a scenario:
+
+* closed loop: `concurrency` virtual users, each sends its next request when
+  the previous one finishes (+ think time)
+* open loop: Poisson arrivals at `rate` req/s regardless of how the server
+  keeps up; latency is measured from the scheduled send time so queueing
+  delay is not hidden (no coordinated omission)
+
+Reports throughput, latency percentiles, error and 429 rates per interval
+and per operation, then checks the scenario's SLOs (exit status 1 on fail).
+
+    cd backend
+    python -m benchmarks.loadgen --workers 4 --duration 60
+    python -m benchmarks.loadgen --scenario my_scenario.json --out load.json
+    python -m benchmarks.loadgen --url http://localhost:8000 --reuse
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.run import BENCH_SECRET, SORTS, make_token, percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Real traffic: ~85% feed/detail reads, 10% votes, the rest writes
+DEFAULT_SCENARIO = {
+    "name": "production-mix",
+    "mode": "closed",            # "closed" or "open"
+    "concurrency": 32,           # closed loop virtual users
+    "think_time_ms": 0,
+    "rate": 100,                 # open loop arrivals per second
+    "max_in_flight": 1000,       # open loop safety valve
+    "duration_s": 30,
+    "warmup_s": 3,
+    "interval_s": 5,
+    "auth_read_fraction": 0.3,   # share of reads sent with a token (writes always are)
+    "mix": {
+        "feed": 60, "detail": 25, "vote": 10,
+        "comment": 2, "suggestion": 2, "create_entry": 1,
+    },
+    "slo": {
+        "p95_ms": {"feed": 300, "detail": 200, "*": 500},
+        "p99_ms": {"*": 1500},
+        "max_error_rate": 0.01,
+        "max_429_rate": 0.05,
+        "min_throughput_rps": 20,
+    },
+}
+
+WRITE_OPS = {"vote", "comment", "suggestion", "create_entry"}
+
+
+def load_scenario(path):
+    scenario = json.loads(json.dumps(DEFAULT_SCENARIO))
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(scenario.get(key), dict):
+                scenario[key].update(value)
+            else:
+                scenario[key] = value
+    return scenario
+
+
+class Traffic:
+    """Builds requests for each operation from the sampled dataset ids"""
+
+    def __init__(self, ids, tokens, scenario, seed):
+        self.ids = ids
+        self.tokens = tokens
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        self.ops = list(scenario["mix"])
+        self.weights = [scenario["mix"][op] for op in self.ops]
+        self.counter = 0
+
+    def next_request(self):
+        rng = self.rng
+        op = rng.choices(self.ops, weights=self.weights)[0]
+        authed = op in WRITE_OPS or rng.random() < self.scenario["auth_read_fraction"]
+        headers = {"Authorization": f"Bearer {rng.choice(self.tokens)}"} if authed else {}
+        entry_id = rng.choice(self.ids["entries"])
+        body = None
+
+        if op == "feed":
+            params = [f"sort={rng.choice(SORTS)}"]
+            roll = rng.random()
+            if roll < 0.3:
+                params.append(f"card_id={self.ids['card_id']}")
+            elif roll < 0.4:
+                params.append(f"search={self.ids['rare_search']}")
+            if rng.random() < 0.2:
+                params.append(f"offset={rng.choice([20, 40, 60])}")
+            method, path = "GET", "/entries/?" + "&".join(params)
+        elif op == "detail":
+            method, path = "GET", f"/entries/{entry_id}"
+        elif op == "vote":
+            method, path = "POST", f"/votes/entries/{entry_id}"
+            body = {"vote_type": rng.choice(["up", "up", "up", "down"])}
+        elif op == "comment":
+            method, path = "POST", "/comments/"
+            body = {"entry_id": str(entry_id), "content": "Load test comment"}
+        elif op == "suggestion":
+            method, path = "POST", f"/entries/{entry_id}/suggestions"
+            body = {"proposed_rate": rng.choice([1, 2, 3, 5]), "reason": "load test"}
+        else:
+            self.counter += 1
+            method, path = "POST", "/entries/"
+            body = {
+                "statement_name": f"LOADGEN STORE {rng.randrange(10**9)} {self.counter}",
+                "card_id": str(self.ids["card_id"]),
+                "cashback_rate": rng.choice([1, 2, 5]),
+            }
+        return op, method, path, headers, body
+
+
+class Recorder:
+    def __init__(self, interval_s):
+        self.interval_s = interval_s
+        self.started = None
+        self.samples = []  # (t_offset, op, status, latency_ms)
+
+    def record(self, sent_at, op, status, latency_ms):
+        self.samples.append((sent_at - self.started, op, status, latency_ms))
+
+    @staticmethod
+    def _stats(samples, seconds):
+        latencies = sorted(s[3] for s in samples)
+        n = len(samples)
+        errors = sum(1 for s in samples if s[2] is None or s[2] >= 500)
+        throttled = sum(1 for s in samples if s[2] == 429)
+        return {
+            "requests": n,
+            "throughput_rps": round(n / seconds, 2) if seconds else None,
+            "p50_ms": round(percentile(latencies, 50), 2) if n else None,
+            "p95_ms": round(percentile(latencies, 95), 2) if n else None,
+            "p99_ms": round(percentile(latencies, 99), 2) if n else None,
+            "error_rate": round(errors / n, 4) if n else 0.0,
+            "rate_429": round(throttled / n, 4) if n else 0.0,
+            "client_error_rate": round(
+                sum(1 for s in samples if s[2] and 400 <= s[2] < 500 and s[2] != 429) / n, 4
+            ) if n else 0.0,
+        }
+
+    def report(self, warmup_s, duration_s):
+        measured = [s for s in self.samples if warmup_s <= s[0] < warmup_s + duration_s]
+        by_op = defaultdict(list)
+        by_interval = defaultdict(list)
+        for sample in measured:
+            by_op[sample[1]].append(sample)
+            by_interval[int((sample[0] - warmup_s) // self.interval_s)].append(sample)
+
+        timeline = []
+        for index in sorted(by_interval):
+            stats = self._stats(by_interval[index], self.interval_s)
+            stats["t_s"] = index * self.interval_s
+            timeline.append(stats)
+
+        return {
+            "overall": self._stats(measured, duration_s),
+            "operations": {op: self._stats(s, duration_s) for op, s in sorted(by_op.items())},
+            "timeline": timeline,
+        }
+
+
+def check_slos(report, slo):
+    failures = []
+    overall = report["overall"]
+    for op, stats in report["operations"].items():
+        for key in ("p95_ms", "p99_ms"):
+            limits = slo.get(key, {})
+            limit = limits.get(op, limits.get("*"))
+            if limit is not None and stats[key] is not None and stats[key] > limit:
+                failures.append(f"{op} {key} {stats[key]} > {limit}")
+    if overall["error_rate"] > slo.get("max_error_rate", 1):
+        failures.append(f"error rate {overall['error_rate']} > {slo['max_error_rate']}")
+    if overall["rate_429"] > slo.get("max_429_rate", 1):
+        failures.append(f"429 rate {overall['rate_429']} > {slo['max_429_rate']}")
+    if (overall["throughput_rps"] or 0) < slo.get("min_throughput_rps", 0):
+        failures.append(f"throughput {overall['throughput_rps']} < {slo['min_throughput_rps']}")
+    return failures
+
+
+async def _send(client, recorder, request, sent_at):
+    op, method, path, headers, body = request
+    try:
+        response = await client.request(method, path, headers=headers, json=body)
+        status = response.status_code
+    except Exception:
+        status = None
+    recorder.record(sent_at, op, status, (time.perf_counter() - sent_at) * 1000)
+
+
+async def run_closed(client, traffic, recorder, scenario, total_s):
+    deadline = recorder.started + total_s
+    think = scenario["think_time_ms"] / 1000
+
+    async def user():
+        while time.perf_counter() < deadline:
+            await _send(client, recorder, traffic.next_request(), time.perf_counter())
+            if think:
+                await asyncio.sleep(think)
+
+    await asyncio.gather(*(user() for _ in range(scenario["concurrency"])))
+
+
+async def run_open(client, traffic, recorder, scenario, total_s):
+    rng = random.Random(1)
+    in_flight = set()
+    next_at = recorder.started
+    deadline = recorder.started + total_s
+    while next_at < deadline:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) < scenario["max_in_flight"]:
+            task = asyncio.create_task(_send(client, recorder, traffic.next_request(), next_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        else:
+            recorder.record(next_at, "dropped", None, 0.0)
+        next_at += rng.expovariate(scenario["rate"])
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+async def drive(base_url, traffic, scenario):
+    import httpx
+
+    recorder = Recorder(scenario["interval_s"])
+    total_s = scenario["warmup_s"] + scenario["duration_s"]
+    limits = httpx.Limits(max_connections=scenario.get("max_in_flight", 1000))
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        recorder.started = time.perf_counter()
+        if scenario["mode"] == "open":
+            await run_open(client, traffic, recorder, scenario, total_s)
+        else:
+            await run_closed(client, traffic, recorder, scenario, total_s)
+    return recorder.report(scenario["warmup_s"], scenario["duration_s"])
+
+
+def start_server(port, workers, env):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    import httpx
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become ready within 60s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mixed-traffic load generator with SLO checks")
+    parser.add_argument("--scenario", default=None, help="JSON file overriding DEFAULT_SCENARIO keys")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db")
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--reuse", action="store_true", help="Skip loading the dataset")
+    parser.add_argument("--url", default=None, help="Target an already running server instead")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=["closed", "open"], default=None)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("--rate-limits", action="store_true", help="Keep slowapi limits on (expect 429s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    scenario = load_scenario(args.scenario)
+    if args.mode:
+        scenario["mode"] = args.mode
+    if args.duration:
+        scenario["duration_s"] = args.duration
+
+    database_url = args.database_url
+    if database_url.startswith("sqlite:///./"):
+        # uvicorn runs from backend/, make the file path independent of our cwd
+        database_url = "sqlite:///" + os.path.abspath(database_url[len("sqlite:///"):])
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SUPABASE_JWT_SECRET"] = BENCH_SECRET
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if args.rate_limits else "false"
+
+    from app.database import engine
+    from benchmarks import dataset
+    from benchmarks.run import sample_ids
+
+    if not args.reuse:
+        dataset.prepare_schema(engine)
+        print(f"Loaded dataset: {dataset.generate(engine, scale=args.scale, seed=args.seed)}", file=sys.stderr)
+    ids = sample_ids(engine)
+    engine.dispose()
+    tokens = [make_token(user_id, email) for user_id, email in ids["profiles"]]
+    traffic = Traffic(ids, tokens, scenario, args.seed)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = start_server(args.port, args.workers, dict(os.environ))
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        report = asyncio.run(drive(base_url, traffic, scenario))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    failures = check_slos(report, scenario["slo"])
+    result = {
+        "scenario": scenario,
+        "workers": None if args.url else args.workers,
+        "dialect": engine.dialect.name,
+        "report": report,
+        "slo_passed": not failures,
+        "slo_failures": failures,
+    }
+
+    overall = report["overall"]
+    print(f"\n{scenario['name']} ({scenario['mode']} loop, {scenario['duration_s']}s)", file=sys.stderr)
+    print(f"{'op':<14}{'req':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>8}{'429':>8}", file=sys.stderr)
+    for op, stats in list(report["operations"].items()) + [("overall", overall)]:
+        print(f"{op:<14}{stats['requests']:>8}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}"
+              f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['error_rate']:>8}{stats['rate_429']:>8}",
+              file=sys.stderr)
+    print("SLO: PASS" if not failures else "SLO: FAIL\n  " + "\n  ".join(failures), file=sys.stderr)
+
+    output = json.dumps(result, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+ORM instances vs Core projections for one feed page.
+
+Loads and serializes the same 100-row pages three ways, outside HTTP so only
+the data access path differs:
+
+* orm_relationships: CashbackEntry + selectinload(merchant, card, contributor),
+  the feed before the entry_feed read model
+* orm_read_model: select(EntryFeed) model instances
+* core_projection: entry_feed table columns as named rows (app/projections.py),
+  what the routers use now
+
+For each it reports CPU time (process_time) and, in a separate pass, the
+tracemalloc peak per page, plus the savings of core_projection over the other two.
+
+    cd backend
+    python -m benchmarks.projection --database-url sqlite:///./benchmark.db [--pages 50]
+
+benchmarks/run.py includes the same numbers under "projection" in its output.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+SORTS = ["merchant", "cashback-high", "verified", "newest"]
+
+
+def _orm_relationships(session, sort, offset, limit):
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import select, col
+    from app.models import CashbackEntry, Merchant
+
+    query = select(CashbackEntry).options(
+        selectinload(CashbackEntry.merchant),
+        selectinload(CashbackEntry.card),
+        selectinload(CashbackEntry.contributor),
+    )
+    if sort == "cashback-high":
+        query = query.order_by(col(CashbackEntry.reported_cashback_rate).desc(), col(CashbackEntry.updated_at).desc())
+    elif sort == "verified":
+        query = query.order_by(col(CashbackEntry.last_verified_at).desc().nulls_last())
+    elif sort == "newest":
+        query = query.order_by(col(CashbackEntry.created_at).desc())
+    else:
+        query = query.join(Merchant).order_by(col(Merchant.canonical_name).asc())
+
+    page = []
+    for entry in session.exec(query.offset(offset).limit(limit)).all():
+        page.append({
+            "id": str(entry.id), "statement_name": entry.statement_name,
+            "reported_cashback_rate": entry.reported_cashback_rate, "status": entry.status,
+            "upvote_count": entry.upvote_count, "downvote_count": entry.downvote_count,
+            "created_at": entry.created_at.isoformat(),
+            "merchant": {"id": str(entry.merchant.id), "canonical_name": entry.merchant.canonical_name},
+            "card": {"id": str(entry.card.id), "slug": entry.card.slug, "name": entry.card.name},
+            "contributor": {"id": str(entry.contributor.id), "display_name": entry.contributor.display_name},
+        })
+    return page
+
+
+def _ordered(query, model, sort):
+    from sqlmodel import col
+
+    if sort == "cashback-high":
+        return query.order_by(col(model.reported_cashback_rate).desc(), col(model.updated_at).desc())
+    if sort == "verified":
+        return query.order_by(col(model.last_verified_at).desc().nulls_last())
+    if sort == "newest":
+        return query.order_by(col(model.created_at).desc())
+    return query.order_by(col(model.merchant_name).asc())
+
+
+def _orm_read_model(session, sort, offset, limit):
+    from sqlmodel import select
+    from app.models import EntryFeed
+    from app.routers.entries import _feed_row
+
+    query = _ordered(select(EntryFeed), EntryFeed, sort)
+    return [_feed_row(row) for row in session.exec(query.offset(offset).limit(limit)).all()]
+
+
+def _core_projection(session, sort, offset, limit):
+    import sqlalchemy as sa
+    from app import projections
+    from app.models import EntryFeed
+    from app.routers.entries import _feed_row
+
+    query = _ordered(sa.select(*projections.FEED), EntryFeed, sort)
+    return [_feed_row(row) for row in projections.fetch(session, query.offset(offset).limit(limit))]
+
+
+PATHS = {
+    "orm_relationships": _orm_relationships,
+    "orm_read_model": _orm_read_model,
+    "core_projection": _core_projection,
+}
+
+
+def _measure_path(engine, fn, pages, limit):
+    from sqlmodel import Session
+
+    cpu_ms, peak_kb = [], []
+    # Separate passes: tracemalloc slows allocation-heavy code disproportionately
+    for traced in (False, True):
+        for i in range(pages):
+            sort = SORTS[i % len(SORTS)]
+            offset = (i // len(SORTS)) * limit
+            # A fresh session per page, like a request
+            with Session(engine) as session:
+                session.connection()  # checkout is not part of the comparison
+                if traced:
+                    tracemalloc.start()
+                    fn(session, sort, offset, limit)
+                    peak_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+                    tracemalloc.stop()
+                else:
+                    started = time.process_time()
+                    fn(session, sort, offset, limit)
+                    cpu_ms.append((time.process_time() - started) * 1000)
+    return {
+        "cpu_ms_p50": round(statistics.median(cpu_ms), 3),
+        "cpu_ms_mean": round(statistics.mean(cpu_ms), 3),
+        "peak_kb_p50": round(statistics.median(peak_kb), 1),
+    }
+
+
+def measure(engine, pages=40, limit=100):
+    """Per-page CPU and peak allocations for each path; warms each path up first"""
+    results = {}
+    for name, fn in PATHS.items():
+        _measure_path(engine, fn, len(SORTS), limit)
+        results[name] = _measure_path(engine, fn, pages, limit)
+
+    core = results["core_projection"]
+    for name in ("orm_relationships", "orm_read_model"):
+        other = results[name]
+        core[f"cpu_saved_vs_{name}_pct"] = round(100 * (1 - core["cpu_ms_p50"] / other["cpu_ms_p50"]), 1)
+        core[f"memory_saved_vs_{name}_pct"] = round(100 * (1 - core["peak_kb_p50"] / other["peak_kb_p50"]), 1)
+    return {"page_size": limit, "pages": pages, "paths": results}
+
+
+def main(argv=None):
+    import os
+
+    parser = argparse.ArgumentParser(description="Compare ORM and Core projection read paths")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app.database import engine
+
+    print(json.dumps(measure(engine, args.pages, args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Endpoint benchmark runner.
+
+Loads the synthetic dataset (benchmarks/dataset.py) into SQLite or a local
+Postgres, then drives the routers through the in-process ASGI client and
+writes p50/p95/p99 latency + query counts per case as JSON.
+
+    cd backend
+    python -m benchmarks.run --scale 0.25 --out bench.json
+    python -m benchmarks.run --database-url postgresql://localhost/cback_bench --out pg.json
+    python -m benchmarks.compare before.json after.json
+
+WARNING: the target database is dropped and recreated unless --reuse is given.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_SECRET = "cback-benchmark-secret-0123456789abcdef"
+SORTS = ["merchant", "cashback-high", "cashback-low", "verified", "newest", "trusted"]
+
+
+def percentile(sorted_values, pct):
+    """Linear interpolation between closest ranks (sorted input)"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies_ms, query_counts, db_ms, statuses):
+    latencies_ms = sorted(latencies_ms)
+    query_counts = sorted(query_counts)
+    db_ms = sorted(db_ms)
+    return {
+        "n": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "queries_p50": percentile(query_counts, 50) if query_counts else None,
+        "queries_max": query_counts[-1] if query_counts else None,
+        "db_ms_p50": round(percentile(db_ms, 50), 3) if db_ms else None,
+        "statuses": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+    }
+
+
+def make_token(user_id, email):
+    import jwt
+    return jwt.encode(
+        {"sub": str(user_id), "email": email, "aud": "authenticated", "role": "authenticated",
+         "exp": int(time.time()) + 24 * 3600},
+        BENCH_SECRET, algorithm="HS256",
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def sample_ids(engine):
+    """Picks the ids/terms the cases run against (deterministic ORDER BYs)"""
+    from sqlmodel import Session, select, func
+    from app.models import Card, Merchant, CashbackEntry, Profile
+
+    with Session(engine) as session:
+        cards = session.exec(select(Card.id).order_by(Card.slug)).all()
+        n_entries = func.count(CashbackEntry.id)
+        top_merchant = session.exec(
+            select(CashbackEntry.merchant_id, n_entries)
+            .group_by(CashbackEntry.merchant_id)
+            .order_by(n_entries.desc(), CashbackEntry.merchant_id)
+            .limit(1)
+        ).first()[0]
+        top_merchant_card = session.exec(
+            select(CashbackEntry.card_id).where(CashbackEntry.merchant_id == top_merchant)
+            .order_by(CashbackEntry.id).limit(1)
+        ).first()
+        rare_name = session.exec(
+            select(Merchant.canonical_name).order_by(Merchant.canonical_name.desc()).limit(1)
+        ).first()
+        entries = session.exec(select(CashbackEntry.id).order_by(CashbackEntry.id).limit(200)).all()
+        contributors = session.exec(
+            select(CashbackEntry.contributor_id, n_entries)
+            .group_by(CashbackEntry.contributor_id)
+            .order_by(n_entries.desc(), CashbackEntry.contributor_id)
+            .limit(20)
+        ).all()
+        profiles = session.exec(
+            select(Profile).where(Profile.id.in_([c[0] for c in contributors]))
+        ).all()
+
+    return {
+        "card_id": cards[0],
+        "merchant_id": top_merchant,
+        "merchant_card_id": top_merchant_card,
+        "rare_search": rare_name.split(" ")[0],
+        "entries": entries,
+        "profiles": [(p.id, p.email) for p in profiles],
+    }
+
+
+def build_cases(ids):
+    """(name, method, path, auth_user_index or None, json body) tuples"""
+    from benchmarks.dataset import COMMON_SEARCH
+
+    cases = []
+    searches = {"none": None, "common": COMMON_SEARCH, "rare": ids["rare_search"]}
+    filters = {
+        "all": {},
+        "card": {"card_id": ids["card_id"]},
+        "merchant": {"merchant_id": ids["merchant_id"]},
+        "card+merchant": {"card_id": ids["merchant_card_id"], "merchant_id": ids["merchant_id"]},
+    }
+    for sort in SORTS:
+        for search_name, search in searches.items():
+            for filter_name, params in filters.items():
+                query = dict(params, sort=sort)
+                if search:
+                    query["search"] = search
+                qs = "&".join(f"{k}={v}" for k, v in query.items())
+                cases.append((f"read_entries[sort={sort},search={search_name},filter={filter_name}]",
+                              "GET", f"/entries/?{qs}", None, None))
+    cases.append(("read_entries[limit=100]", "GET", "/entries/?limit=100", None, None))
+    cases.append(("read_entries[limit=100,auth]", "GET", "/entries/?limit=100", 0, None))
+    cases.append(("read_entries[offset=2000]", "GET", "/entries/?offset=2000", None, None))
+
+    entry_id = ids["entries"][0]
+    cases.append(("read_entry", "GET", f"/entries/{entry_id}", None, None))
+    cases.append(("read_entry[auth]", "GET", f"/entries/{entry_id}", 0, None))
+    cases.append(("get_rate_suggestions", "GET", f"/entries/{entry_id}/suggestions", None, None))
+    cases.append(("get_entry_comments", "GET", f"/comments/entry/{entry_id}", None, None))
+    cases.append(("read_cards", "GET", "/cards/", None, None))
+    cases.append(("get_dashboard_stats", "GET", "/stats/dashboard", None, None))
+    cases.append(("get_public_profile", "GET", f"/profile/{ids['profiles'][0][0]}", None, None))
+    cases.append(("get_my_profile", "GET", "/profile/me", 0, None))
+    return cases
+
+
+def run_case(client, case, iterations, warmup, tokens):
+    name, method, path, user, body = case
+    headers = {"Authorization": f"Bearer {tokens[user]}"} if user is not None else {}
+    latencies, queries, db_ms, statuses = [], [], [], []
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        response = client.request(method, path, headers=headers, json=body)
+        elapsed = (time.perf_counter() - start) * 1000
+        if i < warmup:
+            continue
+        latencies.append(elapsed)
+        statuses.append(response.status_code)
+        if "x-db-query-count" in response.headers:
+            queries.append(int(response.headers["x-db-query-count"]))
+            db_ms.append(float(response.headers["x-db-time-ms"]))
+    return summarize(latencies, queries, db_ms, statuses)
+
+
+def selected(case_name, pattern) -> bool:
+    """--filter: the case name contains the pattern (no pattern: every case)"""
+    return not pattern or pattern in case_name
+
+
+VOTE_CASE = "vote_entry"
+
+
+def run_votes(client, ids, iterations, tokens):
+    """vote_entry: (user, entry) pairs are spread out so most calls are new votes, not toggles"""
+    rng = random.Random(7)
+    latencies, queries, db_ms, statuses = [], [], [], []
+    for i in range(iterations):
+        user = i % len(tokens)
+        entry_id = ids["entries"][rng.randrange(len(ids["entries"]))]
+        start = time.perf_counter()
+        response = client.post(
+            f"/votes/entries/{entry_id}", json={"vote_type": rng.choice(["up", "down"])},
+            headers={"Authorization": f"Bearer {tokens[user]}"},
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses.append(response.status_code)
+        if "x-db-query-count" in response.headers:
+            queries.append(int(response.headers["x-db-query-count"]))
+            db_ms.append(float(response.headers["x-db-time-ms"]))
+    return summarize(latencies, queries, db_ms, statuses)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the endpoint benchmark suite")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db")
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this")
+    parser.add_argument("--reuse", action="store_true", help="Skip loading; reuse the existing dataset")
+    parser.add_argument("--out", default=None, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--skip-startup", action="store_true", help="Don't profile worker startup")
+    parser.add_argument("--skip-projection", action="store_true", help="Don't compare ORM and Core read paths")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url.startswith("sqlite:///./"):
+        # Startup profiling runs uvicorn from backend/
+        database_url = "sqlite:///" + os.path.abspath(database_url[len("sqlite:///"):])
+
+    # The app reads its config at import time
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["DEBUG"] = "true"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["SUPABASE_JWT_SECRET"] = BENCH_SECRET
+
+    from fastapi.testclient import TestClient
+    from app.database import engine
+    from app.main import app
+    from benchmarks import dataset
+
+    counts = None
+    load_seconds = None
+    if not args.reuse:
+        start = time.perf_counter()
+        dataset.prepare_schema(engine)
+        counts = dataset.generate(engine, scale=args.scale, seed=args.seed)
+        load_seconds = round(time.perf_counter() - start, 2)
+        print(f"Loaded dataset in {load_seconds}s: {counts}", file=sys.stderr)
+
+    ids = sample_ids(engine)
+    tokens = [make_token(user_id, email) for user_id, email in ids["profiles"]]
+
+    results = {}
+    with TestClient(app) as client:
+        for case in build_cases(ids):
+            if not selected(case[0], args.filter):
+                continue
+            results[case[0]] = run_case(client, case, args.iterations, args.warmup, tokens)
+            print(f"{case[0]}: p50={results[case[0]]['p50_ms']}ms", file=sys.stderr)
+        if selected(VOTE_CASE, args.filter):
+            results[VOTE_CASE] = run_votes(client, ids, args.iterations, tokens)
+
+    projection = None
+    if not args.skip_projection:
+        from benchmarks import projection as projection_bench
+        projection = projection_bench.measure(engine)
+        core = projection["paths"]["core_projection"]
+        print(f"projection: {core['cpu_saved_vs_orm_read_model_pct']}% CPU, "
+              f"{core['memory_saved_vs_orm_read_model_pct']}% memory saved per 100-row page", file=sys.stderr)
+
+    startup = None
+    if not args.skip_startup:
+        from benchmarks import startup as startup_profile
+        startup = startup_profile.measure(database_url)
+        print(f"startup: ready in {startup['time_to_first_request_ms']}ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "dialect": engine.dialect.name,
+            "scale": args.scale,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "dataset": counts,
+            "load_seconds": load_seconds,
+        },
+        "startup": startup,
+        "projection": projection,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
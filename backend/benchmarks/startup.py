@@ -0,0 +1,130 @@
+"""
+Startup profiling.
+
+* import profile: `python -X importtime -c "import app.main"`, aggregated by
+  top-level package and by app module
+* time to first request: spawn `uvicorn app.main:app`, poll GET / until it
+  answers, then time the first DB-backed request (GET /cards/)
+
+    cd backend
+    python -m benchmarks.startup --database-url sqlite:///./benchmark.db [--runs 5]
+
+benchmarks/run.py includes the same numbers under "startup" in its output.
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _env(database_url):
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_profile(database_url, top=15):
+    """Returns total import time of app.main and the heaviest packages/modules (ms)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=_env(database_url), capture_output=True, text=True, check=True,
+    )
+    by_package = defaultdict(int)
+    app_modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match[1]), int(match[2]), match[3], match[4]
+        by_package[module.split(".")[0]] += self_us
+        if module.startswith("app"):
+            app_modules[module] = cumulative_us
+        if module == "app.main":
+            total_us = cumulative_us
+
+    packages = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+    modules = sorted(app_modules.items(), key=lambda item: -item[1])[:top]
+    return {
+        "import_app_main_ms": round(total_us / 1000, 1),
+        "packages_self_ms": {name: round(us / 1000, 1) for name, us in packages},
+        "app_modules_cumulative_ms": {name: round(us / 1000, 1) for name, us in modules},
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(database_url, timeout=60):
+    """Spawn -> first 200 on GET / , plus latency of the first GET /cards/ (ms)"""
+    import httpx
+
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=_env(database_url), cwd=BACKEND_DIR,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"uvicorn not ready after {timeout}s")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        ready_ms = (time.perf_counter() - started) * 1000
+
+        first_start = time.perf_counter()
+        httpx.get(f"http://127.0.0.1:{port}/cards/", timeout=10)
+        first_db_ms = (time.perf_counter() - first_start) * 1000
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return ready_ms, first_db_ms
+
+
+def measure(database_url, runs=3):
+    profile = import_profile(database_url)
+    ready, first_db = [], []
+    for _ in range(runs):
+        ready_ms, first_db_ms = time_to_first_request(database_url)
+        ready.append(ready_ms)
+        first_db.append(first_db_ms)
+    profile["time_to_first_request_ms"] = round(statistics.median(ready), 1)
+    profile["first_db_request_ms"] = round(statistics.median(first_db), 1)
+    profile["runs"] = runs
+    return profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile worker startup")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url
+    if database_url.startswith("sqlite:///./"):
+        database_url = "sqlite:///" + os.path.abspath(database_url[len("sqlite:///"):])
+    print(json.dumps(measure(database_url, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+-- NOTE: superseded by the versioned migrations in app/migrations (python -m app.migrations upgrade).
+-- Kept for reference only; do not apply by hand.
 -- Add image_url column to cards table
 DO $$ 
 BEGIN 
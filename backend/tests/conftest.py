@@ -0,0 +1,111 @@
+"""
+Tests run against a throwaway SQLite database that the app migrates on
+startup. DATABASE_URL is read at import, so it is set before anything from
+app is imported.
+"""
+import os
+import tempfile
+import uuid
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="cback-tests-"), "test.db")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def session(client):
+    from app.database import engine
+
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def login(client):
+    """login(profile_id): later requests are authenticated as that profile"""
+    from app.auth import get_current_profile
+    from app.database import get_session
+    from app.main import app
+    from app.models import Profile
+
+    def as_profile(profile_id: uuid.UUID):
+        def current_profile(session: Session = Depends(get_session)):
+            return session.get(Profile, profile_id)
+        app.dependency_overrides[get_current_profile] = current_profile
+
+    yield as_profile
+    app.dependency_overrides.pop(get_current_profile, None)
+
+
+@pytest.fixture
+def seed(session):
+    """seed(cards=1, profiles=0): commits that many fresh cards and profiles, returns (cards, profiles)"""
+    from app.models import Card, Profile
+
+    def make(cards: int = 1, profiles: int = 0):
+        tag = uuid.uuid4().hex[:8]
+        new_cards = [
+            Card(slug=f"card-{tag}-{i}", name=f"Card {tag} {i}", issuer="Test", network="Visa") for i in range(cards)
+        ]
+        new_profiles = [Profile(id=uuid.uuid4(), email=f"{tag}-{i}@example.com") for i in range(profiles)]
+        session.add_all([*new_cards, *new_profiles])
+        session.commit()
+        return new_cards, new_profiles
+
+    return make
+
+
+@pytest.fixture
+def add_entry(client, login):
+    """add_entry(profile, card, statement_name, rate="5"): POST /entries/ as that profile, returns the JSON"""
+
+    def post(profile, card, statement_name: str, rate: str = "5"):
+        login(profile.id)
+        response = client.post("/entries/", json={
+            "card_id": str(card.id), "statement_name": statement_name, "cashback_rate": rate,
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return post
+
+
+@pytest.fixture
+def vote(client, login):
+    """vote(profile, entry_id, vote_type="up"): POST /votes/entries/{id} as that profile, returns the JSON"""
+
+    def post(profile, entry_id, vote_type: str = "up"):
+        login(profile.id)
+        response = client.post(f"/votes/entries/{entry_id}", json={"vote_type": vote_type})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return post
+
+
+@pytest.fixture
+def login_admin(session, login):
+    """login_admin(): later requests are authenticated as a fresh admin profile, which is returned"""
+    from app.models import Profile
+
+    def as_admin():
+        admin = Profile(id=uuid.uuid4(), email=f"admin-{uuid.uuid4().hex[:8]}@example.com", role="admin")
+        session.add(admin)
+        session.commit()
+        login(admin.id)
+        return admin
+
+    return as_admin
@@ -0,0 +1,17 @@
+def test_best_cards_follow_rates_and_votes(client, seed, add_entry, vote):
+    (low_card, high_card), profiles = seed(cards=2, profiles=7)
+    low = add_entry(profiles[0], low_card, "Best Bazaar", "2")
+    high = add_entry(profiles[1], high_card, "Best Bazaar", "5")
+    assert low["merchant_id"] == high["merchant_id"]
+    merchant_id = low["merchant_id"]
+
+    ranked = client.get(f"/merchants/{merchant_id}/best-cards").json()["cards"]
+    assert [(row["card"]["id"], row["rate"]) for row in ranked] == [(str(high_card.id), 5.0), (str(low_card.id), 2.0)]
+    assert ranked[0]["entry_id"] == high["id"]
+
+    # Five upvotes verify the 2% entry, which makes it more trusted than the unvoted 5% one
+    for voter in profiles[2:]:
+        vote(voter, low["id"])
+    ranked = client.get(f"/merchants/{merchant_id}/best-cards").json()["cards"]
+    assert [row["card"]["id"] for row in ranked] == [str(low_card.id), str(high_card.id)]
+    assert ranked[0]["verified_count"] == 1
@@ -0,0 +1,38 @@
+import uuid
+
+from app import bloom
+from app.models import Merchant, MerchantAlias
+
+
+def test_filter_has_no_false_negatives():
+    bloom_filter = bloom.BloomFilter(capacity=5000, fp_rate=0.01, max_bytes=1024 * 1024)
+    added = [f"alias:merchant {i}" for i in range(5000)]
+    for key in added:
+        bloom_filter.add(key)
+    assert all(key in bloom_filter for key in added)
+
+    absent = sum(f"alias:unknown {i}" in bloom_filter for i in range(20000))
+    assert absent / 20000 < 0.03
+    assert bloom_filter.estimated_fp_rate < 0.03
+
+
+def test_known_names_pass_and_other_workers_rows_are_synced(client, session, seed, add_entry, monkeypatch):
+    (card,), profiles = seed(cards=1, profiles=2)
+    state = bloom.build(session)
+    monkeypatch.setattr(bloom, "_state", state)
+
+    first = add_entry(profiles[0], card, "Filtered  Florist")
+    assert bloom.might_exist("alias", "FILTERED florist")
+    assert bloom.might_exist("merchant", "filtered florist")
+    # A variant must not be ruled out: it resolves to the same merchant
+    assert add_entry(profiles[1], card, "filtered florist")["merchant_id"] == first["merchant_id"]
+
+    # Inserted by another worker: unknown here until the next sync
+    merchant = Merchant(canonical_name=f"Elsewhere {uuid.uuid4().hex[:6]}")
+    session.add(merchant)
+    session.flush()
+    session.add(MerchantAlias(merchant_id=merchant.id, alias_text="ELSEWHERE POS 77", alias_key="elsewhere pos 77"))
+    session.commit()
+    bloom.sync(session, state)
+    assert bloom.might_exist("alias", "elsewhere pos 77")
+    assert bloom.might_exist("merchant", merchant.canonical_name)
@@ -0,0 +1,65 @@
+import threading
+import uuid
+
+from sqlmodel import Session
+
+from app import catalog
+from app.database import engine
+from app.models import Card
+
+
+def _card(session):
+    card = Card(slug=f"catalog-{uuid.uuid4().hex[:8]}", name="Catalog Card", issuer="Test", network="Visa")
+    session.add(card)
+    session.commit()
+    return card
+
+
+def test_card_write_loads_a_newer_version(client, session):
+    before = catalog.get_catalog(session)
+    card = _card(session)
+
+    after = catalog.get_catalog(session)
+    assert after.version > before.version
+    assert after.get(card.id).slug == card.slug
+    assert after.get_by_slug(card.slug).id == card.id
+    assert client.get("/cards/").headers["etag"] == after.etag
+
+
+class _SlowSession:
+    """Reads the cards, then waits for `release` before handing them over"""
+
+    def __init__(self, session, release):
+        self.session, self.release = session, release
+        self.read = threading.Event()
+
+    def exec(self, statement):
+        rows = self.session.exec(statement).all()
+        self.read.set()
+        self.release.wait(5)
+        return _Rows(rows)
+
+
+class _Rows(list):
+    def all(self):
+        return list(self)
+
+
+def test_slow_older_load_does_not_replace_a_newer_snapshot(client, session):
+    release = threading.Event()
+    slow = _SlowSession(Session(engine), release)
+    loaded = []
+    thread = threading.Thread(target=lambda: loaded.append(catalog.refresh(slow)))
+    thread.start()
+    assert slow.read.wait(5)
+
+    card = _card(session)  # invalidates the catalog after commit
+    newer = catalog.refresh(session)
+    release.set()
+    thread.join(5)
+
+    slow.session.close()
+
+    assert loaded[0] is newer  # the slow load hands back the newer snapshot instead of its own read
+    assert catalog.get_catalog(session) is newer
+    assert catalog.get_catalog(session).get(card.id) is not None
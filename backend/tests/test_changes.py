@@ -0,0 +1,41 @@
+def _sync(client, since=None, limit=500):
+    """Pages through /entries/changes; returns (entry ids in order, deleted ids, next token)"""
+    entries, deleted = [], []
+    while True:
+        params = {"limit": limit}
+        if since is not None:
+            params["since"] = since
+        response = client.get("/entries/changes", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        entries += [row["id"] for row in page["entries"]]
+        deleted += page["deleted"]
+        since = page["next"]
+        if not page["has_more"]:
+            return entries, deleted, since
+
+
+def test_changes_since_token_include_updates_and_tombstones(client, seed, add_entry, vote, login_admin):
+    (card,), (author, other, voter) = seed(cards=1, profiles=3)
+    _, _, token = _sync(client)
+
+    kept = add_entry(author, card, "Delta Diner", "3")
+    merged = add_entry(other, card, "Delta Diner Express", "3")
+    untouched = add_entry(other, card, "Delta Deli", "2")
+    entries, deleted, token = _sync(client, token)
+    assert entries == [kept["id"], merged["id"], untouched["id"]] and deleted == []
+
+    vote(voter, kept["id"])
+    login_admin()
+    response = client.post("/admin/entries/merge", json={"target_id": kept["id"], "source_ids": [merged["id"]]})
+    assert response.status_code == 200, response.text
+
+    # One page at a time: the vote and merge show as the kept entry's latest state plus a tombstone
+    entries, deleted, token = _sync(client, token, limit=1)
+    assert entries == [kept["id"]] and deleted == [merged["id"]]
+    assert _sync(client, token) == ([], [], token)
+
+
+def test_invalid_token(client):
+    assert client.get("/entries/changes", params={"since": "abc"}).status_code == 400
+    assert client.get("/entries/changes", params={"since": "-1"}).status_code == 400
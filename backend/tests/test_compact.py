@@ -0,0 +1,43 @@
+from app import compact
+
+
+def _decode(payload):
+    """The client-side decoding described in app/compact.py"""
+    rows = []
+    for values in payload["rows"]:
+        row = dict(zip(payload["columns"], values))
+        for field, name in compact.SIDE_TABLES.items():
+            side = payload[name]
+            row[field] = dict(zip(side["columns"], side["rows"][row[field]]))
+            row[f"{field}_id"] = row[field]["id"]
+        rows.append(row)
+    return rows
+
+
+def test_compact_page_decodes_to_the_json_page(client, seed, add_entry):
+    (card,), profiles = seed(cards=1, profiles=2)
+    add_entry(profiles[0], card, "Compact Cafe", "3")
+    add_entry(profiles[1], card, "Compact Cafe Two", "4")
+    add_entry(profiles[0], card, "Compact Cafe Three", "5")
+    params = {"card_id": str(card.id), "sort": "newest"}
+
+    plain = client.get("/entries/", params=params)
+    by_query = client.get("/entries/", params=dict(params, format="compact"))
+    by_accept = client.get("/entries/", params=params, headers={"Accept": compact.MEDIA_TYPE})
+
+    assert plain.headers["content-type"].startswith("application/json")
+    assert by_query.headers["content-type"].startswith(compact.MEDIA_TYPE)
+    assert by_query.json() == by_accept.json()
+    payload = by_query.json()
+    assert len(payload["rows"]) == 3
+    assert len(payload["cards"]["rows"]) == 1 and len(payload["contributors"]["rows"]) == 2
+    assert _decode(payload) == plain.json()
+
+
+def test_empty_page():
+    assert compact.encode([]) == {
+        "columns": [], "rows": [],
+        "merchants": {"columns": [], "rows": []},
+        "cards": {"columns": [], "rows": []},
+        "contributors": {"columns": [], "rows": []},
+    }
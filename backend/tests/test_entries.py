@@ -0,0 +1,106 @@
+import uuid
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlmodel import Session, select
+
+from app import dedup, feed_cache, migrations
+from app.models import Card, CashbackEntry, EntryStatus, EntryVote, Merchant, Profile, VoteType, ist_now
+
+
+def _card_and_profiles(session, count: int):
+    card = Card(slug=f"test-{uuid.uuid4().hex[:8]}", name="Test Card", issuer="Test", network="Visa")
+    profiles = [Profile(id=uuid.uuid4(), email=f"user{i}@example.com") for i in range(count)]
+    session.add_all([card, *profiles])
+    session.commit()
+    return card, profiles
+
+
+def test_resubmission_ignores_case_and_spacing(client, session, login):
+    card, profiles = _card_and_profiles(session, 3)
+    body = {"card_id": str(card.id), "cashback_rate": "5"}
+
+    login(profiles[0].id)
+    first = client.post("/entries/", json=dict(body, statement_name="Acme Grocer Store"))
+    assert first.status_code == 200, first.text
+
+    for profile, variant in zip(profiles[1:], ("acme  grocer store", " ACME Grocer  Store ")):
+        login(profile.id)
+        response = client.post("/entries/", json=dict(body, statement_name=variant))
+        assert response.status_code == 200, response.text
+        assert response.json()["duplicate"] is True
+        assert response.json()["id"] == first.json()["id"]
+
+    entries = session.exec(select(CashbackEntry).where(CashbackEntry.card_id == card.id)).all()
+    assert len(entries) == 1
+    merchants = session.exec(
+        select(Merchant).where(sa.func.lower(Merchant.canonical_name).in_(["acme grocer store", "acme  grocer store"]))
+    ).all()
+    assert len(merchants) == 1
+
+
+def test_resubmission_at_another_rate_is_a_suggestion(client, session, login):
+    card, profiles = _card_and_profiles(session, 2)
+    body = {"card_id": str(card.id), "statement_name": "Rate Change Mart"}
+    login(profiles[0].id)
+    first = client.post("/entries/", json=dict(body, cashback_rate="5")).json()
+
+    login(profiles[1].id)
+    response = client.post("/entries/", json=dict(body, cashback_rate="7")).json()
+    assert (response["id"], response["confirmation"], response["upvote_count"]) == (first["id"], "suggestion", 0)
+    suggestions = client.get(f"/entries/{first['id']}/suggestions").json()
+    assert [s["proposed_rate"] for s in suggestions] == [7.0]
+
+
+def test_contributor_resubmission_reverifies_a_verified_entry(client, session, login):
+    card, (profile,) = _card_and_profiles(session, 1)
+    body = {"card_id": str(card.id), "statement_name": "Reverify Rooms", "cashback_rate": "5"}
+    login(profile.id)
+    first = client.post("/entries/", json=body).json()
+    entry = session.get(CashbackEntry, uuid.UUID(first["id"]))
+    entry.status = EntryStatus.verified
+    entry.last_verified_at = ist_now() - timedelta(days=90)
+    session.add(entry)
+    session.commit()
+
+    response = client.post("/entries/", json=body).json()
+    assert response["confirmation"] == "verified"
+    session.refresh(entry)
+    assert abs(entry.last_verified_at - ist_now()) < timedelta(minutes=1)
+
+
+def test_dedup_job_merges_existing_duplicates(tmp_path, monkeypatch):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'dedup.db'}")
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(sa.text(f"DROP INDEX {dedup.UNIQUE_INDEX}"))
+
+    with Session(engine) as session:
+        card, profiles = _card_and_profiles(session, 3)
+        merchant = Merchant(canonical_name="Twice Bakery")
+        session.add(merchant)
+        session.flush()
+        entries = [
+            CashbackEntry(card_id=card.id, merchant_id=merchant.id, contributor_id=profile.id, statement_name=name,
+                          statement_key=dedup.statement_key(name), reported_cashback_rate=4)
+            for profile, name in zip(profiles[:2], ("TWICE BAKERY", "Twice  Bakery"))
+        ]
+        session.add_all(entries)
+        session.flush()
+        session.add(EntryVote(entry_id=entries[1].id, user_id=profiles[2].id, vote_type=VoteType.up))
+        entries[1].upvote_count = 1
+        session.commit()
+        ids = [entry.id for entry in entries]
+        card_id, merchant_id = card.id, merchant.id
+
+    invalidated = []
+    monkeypatch.setattr(feed_cache, "invalidate", lambda *tags: invalidated.extend(tags))
+    assert dedup.run(engine) == {"keys_backfilled": 0, "groups_merged": 1, "entries_removed": 1}
+
+    with Session(engine) as session:
+        (survivor,) = session.exec(select(CashbackEntry).where(CashbackEntry.card_id == card_id)).all()
+        # The best-voted entry survives; the other contributor counts as an upvote
+        assert survivor.id == ids[1] and survivor.upvote_count == 2
+        assert len(session.exec(select(EntryVote).where(EntryVote.entry_id == survivor.id)).all()) == 2
+    assert dedup.UNIQUE_INDEX in {index["name"] for index in sa.inspect(engine).get_indexes("cashback_entries")}
+    assert {"feed", f"card:{card_id}", f"merchant:{merchant_id}", *(f"entry:{i}" for i in ids)} <= set(invalidated)
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import uuid
+
+from app import events
+
+
+def _entry_event(entry_id, card_id, upvotes):
+    return {"type": "entry", "entry_id": str(entry_id), "card_id": str(card_id), "upvotes": upvotes}
+
+
+def test_dispatch_fans_out_to_entry_and_card_subscribers(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_COALESCE_SECONDS", 0)
+    bus, entry_id, other_id, card_id = events.Bus(), uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    async def run():
+        by_entry = bus.subscribe([f"entry:{entry_id}"])
+        by_card = bus.subscribe([f"card:{card_id}"])
+        # Handlers publish from threadpool threads
+        publisher = threading.Thread(target=lambda: [
+            bus.dispatch(_entry_event(entry_id, card_id, 1)),
+            bus.dispatch(_entry_event(entry_id, card_id, 2)),
+            bus.dispatch(_entry_event(other_id, card_id, 7)),
+        ])
+        publisher.start()
+        publisher.join()
+        await asyncio.sleep(0)
+        batches = await by_entry.next_batch(1), await by_card.next_batch(1)
+        bus.unsubscribe(by_entry)
+        bus.unsubscribe(by_card)
+        return batches
+
+    entry_batch, card_batch = asyncio.run(run())
+    # Snapshots of one entry coalesce to the newest
+    assert entry_batch == [_entry_event(entry_id, card_id, 2)]
+    assert card_batch == [_entry_event(entry_id, card_id, 2), _entry_event(other_id, card_id, 7)]
+    assert bus.subscriptions == {}
+
+
+def test_subscriber_too_far_behind_gets_a_resync(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_MAX_PENDING", 3)
+    monkeypatch.setattr(events, "EVENTS_COALESCE_SECONDS", 0)
+
+    async def run():
+        subscription = events.Subscription(asyncio.get_running_loop(), ["card:x"])
+        for i in range(5):
+            subscription.offer({"type": "comment", "entry_id": "e", "comment": {"id": i}})
+        return await subscription.next_batch(1)
+
+    assert asyncio.run(run()) == [events.RESYNC]
+
+
+def test_unreachable_broker_answers_503(client, monkeypatch):
+    def unreachable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(events, "get_broker", unreachable)
+    response = client.get(f"/live/entries/{uuid.uuid4()}")
+    assert response.status_code == 503
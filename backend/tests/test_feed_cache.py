@@ -0,0 +1,48 @@
+from app.feed_cache import InProcessBackend
+
+
+def test_bumped_tag_makes_its_pages_stale():
+    backend = InProcessBackend(max_pages=10)
+    assert backend.put("a", ["a"], ["feed", "entry:1"], backend.begin(), 60)
+    assert backend.put("b", ["b"], ["feed", "entry:2"], backend.begin(), 60)
+
+    backend.bump(["entry:1"])
+    assert backend.get("a") == (None, True)
+    assert backend.get("b") == (["b"], False)
+
+
+def test_page_read_before_a_write_is_not_stored():
+    backend = InProcessBackend(max_pages=10)
+    token = backend.begin()
+    backend.bump(["entry:1"])
+    assert not backend.put("a", ["a"], ["feed", "entry:1"], token, 60)
+    assert backend.get("a") == (None, False)
+
+
+def test_tag_versions_are_bounded_by_cached_pages():
+    backend = InProcessBackend(max_pages=2)
+    for i in range(50):
+        backend.put(f"page{i}", [i], ["feed", f"entry:{i}"], backend.begin(), 60)
+        backend.bump([f"entry:{i}", f"entry:gone{i}"])
+    assert list(backend.pages) == ["page48", "page49"]
+    assert backend.refs == {"feed": 2, "entry:48": 1, "entry:49": 1}
+    assert set(backend.tags) == {"entry:48", "entry:49"}  # never the evicted pages' or unreferenced tags
+    assert backend.get("page48") == (None, True) and backend.get("page49") == (None, True)
+    assert backend.tags == {} and backend.refs == {}
+
+    for i in range(5):
+        backend.put(f"page{i}", [i], ["feed", f"entry:{i}"], backend.begin(), 60)
+    backend.bump(["feed"])
+    assert set(backend.refs) == {"feed", "entry:3", "entry:4"}
+    assert set(backend.tags) <= set(backend.refs)
+
+
+def test_vote_invalidates_the_cached_feed_page(client, seed, add_entry, vote):
+    (card,), (author, voter) = seed(cards=1, profiles=2)
+    entry = add_entry(author, card, "Cached Corner")
+    page = client.get("/entries/", params={"card_id": str(card.id)}).json()
+    assert [(row["id"], row["upvote_count"]) for row in page] == [(entry["id"], 0)]
+
+    vote(voter, entry["id"])
+    page = client.get("/entries/", params={"card_id": str(card.id)}).json()
+    assert [(row["id"], row["upvote_count"]) for row in page] == [(entry["id"], 1)]
@@ -0,0 +1,63 @@
+import json
+import uuid
+from datetime import timedelta
+
+import sqlalchemy as sa
+from sqlmodel import select
+
+from app import database, idempotency
+from app.models import CashbackEntry, IdempotencyKey, ist_now
+
+
+def _post(client, body: dict, key: str):
+    return client.post("/entries/", content=json.dumps(body),
+                       headers={"Content-Type": "application/json", "Idempotency-Key": key})
+
+
+def test_retry_replays_the_first_response_with_its_headers(client, session, seed, login, monkeypatch):
+    # A replica makes every write set the read-your-writes cookie
+    monkeypatch.setattr(database, "replica_engine", sa.create_engine("sqlite://"))
+    (card,), (profile,) = seed(cards=1, profiles=1)
+    login(profile.id)
+    body = {"card_id": str(card.id), "statement_name": "Retry Roasters", "cashback_rate": "5"}
+    key = str(uuid.uuid4())
+
+    first = _post(client, body, key)
+    retry = _post(client, body, key)
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true" and "idempotent-replayed" not in first.headers
+    assert retry.json() == first.json()
+    assert retry.headers["content-type"] == first.headers["content-type"]
+    assert database.STICKY_COOKIE in retry.headers["set-cookie"]
+    assert len(session.exec(select(CashbackEntry).where(CashbackEntry.card_id == card.id)).all()) == 1
+
+
+def test_same_key_with_another_request_is_rejected(client, seed, login):
+    (card,), (profile,) = seed(cards=1, profiles=1)
+    login(profile.id)
+    body = {"card_id": str(card.id), "statement_name": "Mismatch Mart", "cashback_rate": "5"}
+    key = str(uuid.uuid4())
+    assert _post(client, body, key).status_code == 200
+    assert _post(client, dict(body, cashback_rate="6"), key).status_code == 422
+
+
+def test_key_in_progress_is_409_until_abandoned(client, session, seed, login, monkeypatch):
+    (card,), (profile,) = seed(cards=1, profiles=1)
+    login(profile.id)
+    body = {"card_id": str(card.id), "statement_name": "Pending Pantry", "cashback_rate": "5"}
+    key = str(uuid.uuid4())
+    # Another attempt reserved the key and has not answered yet
+    stored_key = idempotency._digest("anonymous", key)
+    session.add(IdempotencyKey(
+        key=stored_key, fingerprint=idempotency._digest("POST", "/entries/", "", json.dumps(body).encode()),
+        expires_at=ist_now() + timedelta(hours=1),
+    ))
+    session.commit()
+
+    response = _post(client, body, key)
+    assert response.status_code == 409 and response.headers["retry-after"] == "1"
+
+    # Past IDEMPOTENCY_LOCK_SECONDS the reservation is taken over
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_LOCK_SECONDS", 0)
+    assert _post(client, body, key).status_code == 200
+    assert _post(client, body, key).headers["idempotent-replayed"] == "true"
@@ -0,0 +1,66 @@
+from app import leaderboard
+from app.auth import get_optional_profile
+from app.main import app
+from app.models import Profile
+
+
+def _row(name, score):
+    return {"id": name, "display_name": name, "avatar_url": None, "reputation_score": score}
+
+
+def test_card_board_follows_commits_without_reloading(client, session, seed, add_entry, monkeypatch):
+    monkeypatch.setattr(leaderboard, "LEADERBOARD_TTL_SECONDS", 3600)
+    loads = []
+    load = leaderboard._load
+    monkeypatch.setattr(leaderboard, "_load", lambda *args: loads.append(args[1]) or load(*args))
+    (card,), (top, second, newcomer) = seed(cards=1, profiles=3)
+    add_entry(top, card, "Board Books")
+    add_entry(top, card, "Board Bikes")
+    add_entry(second, card, "Board Bread")
+
+    def leaders():
+        body = client.get("/profile/leaderboard", params={"card_id": str(card.id)}).json()
+        return [(row["id"], row["reputation_score"], row["rank"]) for row in body["leaders"]]
+
+    assert leaders() == [(str(top.id), 100, 1), (str(second.id), 50, 2)]
+    assert leaders() and len(loads) == 1  # cached
+
+    # Score changes are applied to the cached list as they commit
+    session.refresh(second)
+    second.reputation_score = 100
+    session.add(second)
+    session.commit()
+    assert leaders() == [(str(top.id), 100, 1), (str(second.id), 100, 1)]
+    assert len(loads) == 1
+
+    # A new contributor on the card drops its list
+    add_entry(newcomer, card, "Board Beans")
+    assert leaders()[-1] == (str(newcomer.id), 50, 3)
+    assert len(loads) == 2
+
+
+def test_my_global_rank(client, session, seed, monkeypatch):
+    _, (me, runner_up) = seed(profiles=2)
+    monkeypatch.setitem(app.dependency_overrides, get_optional_profile, lambda: session.get(Profile, runner_up.id))
+    for profile, score in ((me, 10 ** 6), (runner_up, 10 ** 6 - 1)):
+        profile.reputation_score = score
+        session.add(profile)
+    session.commit()
+
+    body = client.get("/profile/leaderboard", params={"limit": 2}).json()
+    assert [row["id"] for row in body["leaders"]] == [str(me.id), str(runner_up.id)]
+    assert body["me"] == {"id": str(runner_up.id), "rank": 2, "reputation_score": 10 ** 6 - 1}
+    assert leaderboard.Histogram({300: 1, 100: 2, 0: 5}).rank(100) == 2
+
+
+def test_full_board_drops_when_a_member_falls_below_its_last_row(monkeypatch):
+    monkeypatch.setattr(leaderboard, "LEADERBOARD_TOP_K", 3)
+    board = leaderboard.Board([_row("a", 300), _row("b", 200), _row("c", 100)])
+
+    assert leaderboard._apply(board, _row("b", 400), member=True)
+    assert [row["id"] for row in board.rows] == ["b", "a", "c"]
+    assert leaderboard._apply(board, _row("d", 50), member=True)  # still below the list
+    assert leaderboard._apply(board, _row("d", 250), member=True)  # joins, pushing c off
+    assert [row["id"] for row in board.rows] == ["b", "a", "d"]
+    # Someone off the list may now be ahead of "a"
+    assert not leaderboard._apply(board, _row("a", 10), member=True)
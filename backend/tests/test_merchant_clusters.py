@@ -0,0 +1,53 @@
+import uuid
+
+from sqlmodel import select
+
+from app import merchant_clusters
+from app.database import engine
+from app.models import CashbackEntry, Merchant, MerchantMergeProposal
+
+
+def test_propose_review_and_apply_a_merge(client, session, seed, add_entry, login, login_admin):
+    tag = uuid.uuid4().hex[:6]
+    (card, other_card), profiles = seed(cards=2, profiles=3)
+    target = add_entry(profiles[0], card, f"Quibble {tag}")
+    add_entry(profiles[1], other_card, f"Quibble {tag}")
+    login(profiles[2].id)
+    source = client.post("/entries/", json={
+        "card_id": str(card.id), "statement_name": f"QBL*{tag} ONLINE", "name": f"Quibble {tag} Pvt Ltd",
+        "cashback_rate": "5",
+    }).json()
+    assert source["merchant_id"] != target["merchant_id"]
+
+    merchant_clusters.propose(engine)
+    proposal = session.exec(
+        select(MerchantMergeProposal).where(MerchantMergeProposal.source_merchant_id == uuid.UUID(source["merchant_id"]))
+    ).one()
+    assert str(proposal.target_merchant_id) == target["merchant_id"]  # more entries
+    assert proposal.score == 1.0  # "PVT LTD" is noise
+
+    login_admin()
+    pending = client.get("/admin/merchant-merges").json()
+    assert str(proposal.id) in {row["id"] for row in pending}
+    response = client.post(f"/admin/merchant-merges/{proposal.id}", json={"status": "approved"})
+    assert response.status_code == 200, response.text
+
+    assert merchant_clusters.apply(engine)["merchants_merged"] == 1
+    session.expire_all()
+    assert session.get(Merchant, uuid.UUID(source["merchant_id"])) is None
+    moved = session.get(CashbackEntry, uuid.UUID(source["id"]))
+    assert str(moved.merchant_id) == target["merchant_id"]
+    # Both the source's alias and its old name now resolve to the target
+    assert add_entry(profiles[0], other_card, f"qbl*{tag} online")["merchant_id"] == target["merchant_id"]
+    assert add_entry(profiles[1], card, f"QUIBBLE {tag} pvt ltd")["merchant_id"] == target["merchant_id"]
+
+
+def test_blocking_keeps_unrelated_names_apart():
+    keys = ["SWIGGY", "SWIGY", "ZOMATO", "SWIGGY INSTAMART"]
+    blocks, positions = merchant_clusters.build_blocks(keys)
+    pairs = set(merchant_clusters.candidate_pairs(keys, blocks, positions))
+    assert (0, 1) in pairs and (0, 3) in pairs
+    assert not any(2 in pair for pair in pairs)
+    assert merchant_clusters.score_pair(
+        {"key": "SWIGGY", "mcc": "5812", "category": None}, {"key": "SWIGY", "mcc": "5999", "category": None}
+    )[0] < merchant_clusters.name_score("SWIGGY", "SWIGY")
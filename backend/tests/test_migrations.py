@@ -0,0 +1,178 @@
+"""Upgrades to the latest version, from an empty database and from the V1 schema"""
+import uuid
+from datetime import date, datetime
+
+import pytest
+import sqlalchemy as sa
+from sqlmodel import SQLModel
+
+from app import migrations
+from app.models import CashbackEntry  # noqa: F401 - fills SQLModel.metadata
+
+# The schema the app created before versioned migrations (m0001's starting point)
+V1 = sa.MetaData()
+ENTRY_STATUS = sa.Enum("pending", "verified", "disputed", "rejected", name="entry_status")
+VOTE_TYPE = sa.Enum("up", "down", name="vote_type")
+sa.Table(
+    "profiles", V1,
+    sa.Column("id", sa.Uuid, primary_key=True),
+    sa.Column("email", sa.String, nullable=False),
+    sa.Column("display_name", sa.String),
+    sa.Column("avatar_url", sa.String),
+    sa.Column("role", sa.String, nullable=False),
+    sa.Column("reputation_score", sa.Integer, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "cards", V1,
+    sa.Column("id", sa.Uuid, primary_key=True),
+    sa.Column("slug", sa.String, nullable=False, unique=True, index=True),
+    sa.Column("name", sa.String, nullable=False),
+    sa.Column("issuer", sa.String, nullable=False),
+    sa.Column("network", sa.String, nullable=False),
+    sa.Column("description", sa.String),
+    sa.Column("max_cashback_rate", sa.Float, nullable=False),
+    sa.Column("active", sa.Boolean, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "merchants", V1,
+    sa.Column("id", sa.Uuid, primary_key=True),
+    sa.Column("canonical_name", sa.String, nullable=False, index=True),
+    sa.Column("category", sa.String),
+    sa.Column("default_mcc", sa.String),
+    sa.Column("website", sa.String),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "merchant_aliases", V1,
+    sa.Column("id", sa.Uuid, primary_key=True),
+    sa.Column("merchant_id", sa.Uuid, sa.ForeignKey("merchants.id"), nullable=False, index=True),
+    sa.Column("alias_text", sa.String, nullable=False, index=True),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "cashback_entries", V1,
+    sa.Column("id", sa.Uuid, primary_key=True),
+    sa.Column("card_id", sa.Uuid, sa.ForeignKey("cards.id"), nullable=False, index=True),
+    sa.Column("merchant_id", sa.Uuid, sa.ForeignKey("merchants.id"), nullable=False, index=True),
+    sa.Column("contributor_id", sa.Uuid, sa.ForeignKey("profiles.id"), nullable=False, index=True),
+    sa.Column("statement_name", sa.String, nullable=False, index=True),
+    sa.Column("reported_cashback_rate", sa.Float, nullable=False),
+    sa.Column("mcc", sa.String),
+    sa.Column("notes", sa.String),
+    sa.Column("status", ENTRY_STATUS, nullable=False),
+    sa.Column("transaction_date", sa.Date),
+    sa.Column("last_verified_at", sa.DateTime),
+    sa.Column("upvote_count", sa.Integer, nullable=False),
+    sa.Column("downvote_count", sa.Integer, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "entry_votes", V1,
+    sa.Column("entry_id", sa.Uuid, sa.ForeignKey("cashback_entries.id"), primary_key=True),
+    sa.Column("user_id", sa.Uuid, sa.ForeignKey("profiles.id"), primary_key=True),
+    sa.Column("vote_type", VOTE_TYPE, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+sa.Table(
+    "entry_comments", V1,
+    sa.Column("id", sa.Uuid, primary_key=True),
+    sa.Column("entry_id", sa.Uuid, sa.ForeignKey("cashback_entries.id"), nullable=False, index=True),
+    sa.Column("author_id", sa.Uuid, sa.ForeignKey("profiles.id"), nullable=False, index=True),
+    sa.Column("content", sa.String, nullable=False),
+    sa.Column("is_deleted", sa.Boolean, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime),
+)
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+# lower(canonical_name) (m0013) can't be reflected on SQLite
+pytestmark = pytest.mark.filterwarnings("ignore:Skipped unsupported reflection")
+
+
+def _engine(tmp_path):
+    return sa.create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+
+
+def _assert_matches_models(engine):
+    """Every table, column and index the models declare exists"""
+    inspector = sa.inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name == "schema_version":
+            continue
+        assert inspector.has_table(table.name), table.name
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert {column.name for column in table.columns} <= columns, table.name
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+
+
+def test_upgrade_empty_database(tmp_path):
+    engine = _engine(tmp_path)
+    assert migrations.upgrade(engine) == list(range(1, migrations.LATEST_VERSION + 1))
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    _assert_matches_models(engine)
+    assert migrations.upgrade(engine) == []
+
+
+def test_upgrade_v1_database(tmp_path):
+    engine = _engine(tmp_path)
+    V1.create_all(engine)
+    ids = {name: uuid.uuid4() for name in ("profile", "voter", "card", "merchant", "entry")}
+    tables = V1.tables
+    with engine.begin() as conn:
+        conn.execute(tables["profiles"].insert(), [
+            {"id": ids[name], "email": f"{name}@example.com", "role": "user", "reputation_score": 0, "created_at": NOW}
+            for name in ("profile", "voter")
+        ])
+        conn.execute(tables["cards"].insert(), {
+            "id": ids["card"], "slug": "v1-card", "name": "V1 Card", "issuer": "Bank", "network": "Visa",
+            "max_cashback_rate": 5.0, "active": True, "created_at": NOW,
+        })
+        conn.execute(tables["merchants"].insert(), {"id": ids["merchant"], "canonical_name": "Corner Shop", "created_at": NOW})
+        conn.execute(tables["merchant_aliases"].insert(), {
+            "id": uuid.uuid4(), "merchant_id": ids["merchant"], "alias_text": "CORNER  SHOP", "created_at": NOW,
+        })
+        conn.execute(tables["cashback_entries"].insert(), {
+            "id": ids["entry"], "card_id": ids["card"], "merchant_id": ids["merchant"], "contributor_id": ids["profile"],
+            "statement_name": "CORNER  SHOP", "reported_cashback_rate": 5.0, "status": "verified",
+            "transaction_date": date(2025, 12, 20), "last_verified_at": NOW,
+            "upvote_count": 1, "downvote_count": 0, "created_at": NOW, "updated_at": NOW,
+        })
+        conn.execute(tables["entry_votes"].insert(), {
+            "entry_id": ids["entry"], "user_id": ids["voter"], "vote_type": "up", "created_at": NOW,
+        })
+
+    assert migrations.upgrade(engine) == list(range(1, migrations.LATEST_VERSION + 1))
+    _assert_matches_models(engine)
+    with engine.connect() as conn:
+        feed = conn.execute(sa.text("SELECT merchant_name, card_slug, trust_score FROM entry_feed")).one()
+        assert feed.merchant_name == "Corner Shop" and feed.card_slug == "v1-card"
+        assert feed.trust_score > 0
+        entry = conn.execute(sa.text("SELECT statement_key, change_seq, trust_score FROM cashback_entries")).one()
+        assert entry.statement_key == "corner shop"
+        assert entry.change_seq == 1
+        assert entry.trust_score == pytest.approx(feed.trust_score)
+        assert conn.execute(sa.text("SELECT rate FROM merchant_best_cards")).scalar() == 5.0
+
+
+def test_check_schema_upgrades_only_when_behind(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    assert migrations.upgrade(engine, target=5) == [1, 2, 3, 4, 5]
+
+    monkeypatch.setattr(migrations, "AUTO_MIGRATE", False)
+    with pytest.raises(migrations.SchemaOutOfDate):
+        migrations.check_schema(engine)
+
+    monkeypatch.setattr(migrations, "AUTO_MIGRATE", True)
+    assert migrations.check_schema(engine) == migrations.LATEST_VERSION
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    _assert_matches_models(engine)
+
+    monkeypatch.setattr(migrations, "upgrade", lambda *args, **kwargs: pytest.fail("upgrade on a current schema"))
+    assert migrations.check_schema(engine) == migrations.LATEST_VERSION
@@ -0,0 +1,51 @@
+import json
+
+from app import moderation
+
+
+def test_bulk_status_change_streams_progress_and_updates_derived_state(client, seed, add_entry, login, login_admin,
+                                                                       monkeypatch):
+    monkeypatch.setattr(moderation, "MODERATION_CHUNK", 2)
+    (card, other_card), (spammer, honest) = seed(cards=2, profiles=2)
+    spam = [add_entry(spammer, card, f"Spam Shop {i}", "50") for i in range(3)]
+    kept = add_entry(honest, other_card, "Spam Shop 0", "2")
+    merchant_id = spam[0]["merchant_id"]
+    assert [row["rate"] for row in client.get(f"/merchants/{merchant_id}/best-cards").json()["cards"]] == [50.0, 2.0]
+    page = client.get("/entries/", params={"card_id": str(card.id)}).json()  # cached
+    assert {row["status"] for row in page} == {"pending"}
+
+    login(spammer.id)
+    assert client.post("/admin/entries/status", json={"status": "rejected", "contributor_id": str(spammer.id)}).status_code == 403
+
+    login_admin()
+    response = client.post("/admin/entries/status", json={"status": "rejected", "contributor_id": str(spammer.id)},
+                           headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    steps = [json.loads(line) for line in response.text.splitlines()]
+    assert [(step["done"], step["total"]) for step in steps] == [(0, 3), (2, 3), (3, 3), (3, 3)]
+    assert steps[-1]["finished"] is True
+
+    page = client.get("/entries/", params={"card_id": str(card.id)}).json()
+    assert {row["status"] for row in page} == {"rejected"}
+    assert client.get(f"/entries/{kept['id']}").json()["status"] == "pending"
+    assert [row["rate"] for row in client.get(f"/merchants/{merchant_id}/best-cards").json()["cards"]] == [2.0]
+
+
+def test_soft_delete_author_comments(client, seed, add_entry, login, login_admin):
+    (card,), (author, troll) = seed(cards=1, profiles=2)
+    entry = add_entry(author, card, "Comment Corner")
+    for profile, content in ((troll, "spam one"), (troll, "spam two"), (author, "useful")):
+        login(profile.id)
+        assert client.post("/comments/", json={"entry_id": entry["id"], "content": content}).status_code == 200
+
+    login_admin()
+    summary = client.post("/admin/comments/soft-delete", json={"author_id": str(troll.id)}).json()
+    assert (summary["done"], summary["finished"]) == (2, True)
+    comments = client.get(f"/comments/entry/{entry['id']}").json()
+    assert [comment["content"] for comment in comments] == ["useful"]
+
+
+def test_bulk_status_needs_a_filter(client, login_admin):
+    login_admin()
+    assert client.post("/admin/entries/status", json={"status": "rejected"}).status_code == 400
+    assert client.post("/admin/entries/status", json={"status": "gone", "ids": []}).status_code == 400
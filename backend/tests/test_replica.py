@@ -0,0 +1,71 @@
+import time
+
+import pytest
+import sqlalchemy as sa
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import database
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(database, "replica_engine", sa.create_engine("sqlite://"))
+    monkeypatch.setattr(database, "_replica_healthy", True)
+    monkeypatch.setattr(database, "_recent_writers", {})
+
+
+def _request(method="GET", token="token-a", cookie=None, host="10.0.0.1"):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    if cookie:
+        headers.append((b"cookie", cookie.encode()))
+    return Request({
+        "type": "http", "method": method, "path": "/entries/", "query_string": b"", "headers": headers,
+        "client": (host, 1234), "scheme": "http", "server": ("testserver", 80),
+    })
+
+
+def _reads_replica(request) -> bool:
+    sessions = database.get_session(request)
+    session = next(sessions)
+    try:
+        return session.info["replica"]
+    finally:
+        sessions.close()
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(replica):
+    assert _reads_replica(_request())
+    assert not _reads_replica(_request(method="POST"))
+
+
+def test_writer_reads_its_own_writes_from_the_primary(replica):
+    response = Response()
+    database.mark_write(_request(method="POST"), response)
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith(database.STICKY_COOKIE + "=")
+
+    assert not _reads_replica(_request())  # same worker, same caller
+    assert _reads_replica(_request(token="token-b"))  # someone else
+
+    # Another worker only sees the cookie
+    database._recent_writers.clear()
+    value = cookie.split(";")[0]
+    assert not _reads_replica(_request(token="token-b", cookie=value))
+    expired = f"{database.STICKY_COOKIE}={int(time.time()) - 1}"
+    assert _reads_replica(_request(token="token-b", cookie=expired))
+
+
+def test_failed_write_does_not_stick(replica):
+    response = Response(status_code=400)
+    database.mark_write(_request(method="POST"), response)
+    assert "set-cookie" not in response.headers
+    assert _reads_replica(_request())
+
+
+def test_unhealthy_replica_reads_from_the_primary(replica, monkeypatch):
+    monkeypatch.setattr(database, "_replica_healthy", False)
+    assert not _reads_replica(_request())
+
+    database.check_replica()  # SQLite replica: reachable, no lag, back in rotation
+    assert _reads_replica(_request())
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from app.single_flight import Group, SingleFlightTimeout
+
+
+def _run_together(group, key, fn, callers: int):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def _slow(calls, outcome):
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return load
+
+
+def test_concurrent_callers_share_one_execution():
+    calls, page = [], ["rows"]
+    results, errors = _run_together(Group("test"), "key", _slow(calls, page), callers=8)
+    assert len(calls) == 1
+    assert errors == [] and len(results) == 8 and all(result is page for result in results)
+
+
+def test_concurrent_callers_share_the_error():
+    calls, failure = [], ValueError("boom")
+    results, errors = _run_together(Group("test"), "key", _slow(calls, failure), callers=4)
+    assert len(calls) == 1
+    assert results == [] and errors == [failure] * 4
+
+
+def test_next_call_after_a_flight_runs_again():
+    group, calls = Group("test"), []
+    assert group.do("key", lambda: calls.append(1) or len(calls)) == 1
+    assert group.do("key", lambda: calls.append(1) or len(calls)) == 2
+
+
+def test_waiter_times_out():
+    group, started, release = Group("test"), threading.Event(), threading.Event()
+    leader = threading.Thread(target=lambda: group.do("key", lambda: started.set() or release.wait(5)))
+    leader.start()
+    assert started.wait(5)
+    with pytest.raises(SingleFlightTimeout):
+        group.do("key", lambda: pytest.fail("a waiter must not run the call"), timeout=0.05)
+    release.set()
+    leader.join(5)
@@ -0,0 +1,44 @@
+import json
+
+from app import statement_match
+
+
+def test_statement_lines_match_alias_and_fuzzy(client, seed, add_entry):
+    (card,), (profile,) = seed(cards=1, profiles=1)
+    entry = add_entry(profile, card, "Zestful Kitchen", "4")
+
+    response = client.post("/match/statement", json={"lines": [
+        "zestful   KITCHEN",
+        "PPSL* Zestful Kitchens Company PTE Gurgaon HAR",
+        "Nothing Like It 1234",
+    ]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["matched"], body["total"]) == (2, 3)
+    alias, fuzzy, unmatched = body["results"]
+    assert alias["match"] == "alias" and alias["merchant"]["id"] == entry["merchant_id"]
+    assert alias["cards"] == [dict(alias["cards"][0], card_id=str(card.id), rate=4.0)]
+    assert fuzzy["match"] == "fuzzy" and fuzzy["merchant"]["id"] == entry["merchant_id"]
+    assert 0.75 <= fuzzy["similarity"] < 1
+    assert unmatched["merchant"] is None and unmatched["cards"] == []
+
+    streamed = client.post("/match/statement", json={"text": "zestful kitchen\nunknown"},
+                           headers={"Accept": "application/x-ndjson"})
+    rows = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [(row["line_no"], row["match"]) for row in rows] == [(0, "alias"), (1, None)]
+
+
+def test_fuzzy_terms_are_capped(client, seed, add_entry, monkeypatch):
+    (card,), (profile,) = seed(cards=1, profiles=1)
+    add_entry(profile, card, "Quokka Outfitters")
+    add_entry(profile, card, "Wombat Provisions")
+    monkeypatch.setattr(statement_match, "MAX_FUZZY_TERMS", 1)
+
+    results = client.post("/match/statement", json={"lines": ["QUOKKA OUTFITTER", "WOMBAT PROVISION"]}).json()["results"]
+    assert [result["match"] for result in results] == ["fuzzy", None]
+
+
+def test_statement_body_is_validated(client):
+    assert client.post("/match/statement", json={"lines": ["x"], "cards_per_line": 0}).status_code == 422
+    assert client.post("/match/statement", json={"lines": ["x"], "cards_per_line": "many"}).status_code == 422
+    assert client.post("/match/statement", json={}).status_code == 400
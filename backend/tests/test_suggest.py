@@ -0,0 +1,28 @@
+import uuid
+
+from app.suggest import SuggestIndex
+
+
+def test_trie_ranks_prefixes_words_and_aliases():
+    index = SuggestIndex()
+    popular, quiet, other = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index.add_merchant(quiet, "Bired Cafe", entry_count=1)
+    index.add_merchant(popular, "Bird Bakery", entry_count=9)
+    index.add_merchant(other, "Cafe Coffee Day", entry_count=3, upvotes=10)
+    index.add_alias(quiet, "PPSL* BIREDCAFE GURGAON HAR")
+
+    assert [r["canonical_name"] for r in index.search("bi")] == ["Bird Bakery", "Bired Cafe"]
+    assert [r["canonical_name"] for r in index.search("BIRE")] == ["Bired Cafe"]
+    assert [r["canonical_name"] for r in index.search("cafe")] == ["Cafe Coffee Day", "Bired Cafe"]
+    assert [r["canonical_name"] for r in index.search("biredc")] == ["Bired Cafe"]
+    assert index.search("bi", limit=1)[0]["entry_count"] == 9
+    assert index.search("birx") == [] and index.search("  ") == []
+
+
+def test_new_merchant_is_suggested_right_away(client, seed, add_entry):
+    (card,), (profile,) = seed(cards=1, profiles=1)
+    client.get("/merchants/suggest", params={"q": "x"})  # build the index first
+    entry = add_entry(profile, card, "Xylophone Traders")
+
+    results = client.get("/merchants/suggest", params={"q": "xyloph"}).json()
+    assert [r["id"] for r in results] == [entry["merchant_id"]]
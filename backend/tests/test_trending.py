@@ -0,0 +1,52 @@
+import uuid
+from datetime import timedelta
+
+from app import trending
+from app.models import ActivityBucket, ist_now
+
+
+def _trending(client, window):
+    body = client.get("/entries/trending", params={"window": window, "limit": 100}).json()
+    return [row["id"] for row in body["entries"]], {row["id"]: row["activity"] for row in body["entries"]}, body
+
+
+def test_votes_and_comments_rank_entries_within_their_window(client, session, seed, add_entry, vote, login,
+                                                             monkeypatch):
+    monkeypatch.setattr(trending, "TRENDING_REFRESH_SECONDS", 0)
+    (card,), profiles = seed(cards=1, profiles=4)
+    commented = add_entry(profiles[0], card, "Trend Tacos")
+    voted = add_entry(profiles[0], card, "Trend Tea")
+    last_week = add_entry(profiles[0], card, "Trend Tiles")
+
+    vote(profiles[1], voted["id"])
+    vote(profiles[2], voted["id"])
+    vote(profiles[1], commented["id"])
+    login(profiles[3].id)
+    assert client.post("/comments/", json={"entry_id": commented["id"], "content": "still true"}).status_code == 200
+    # Busy two days ago, and long before that
+    for days, votes in ((2, 10), (9, 50)):
+        hour = trending.hour_of(ist_now() - timedelta(days=days))
+        for kind, subject in (("entry", last_week["id"]), ("merchant", last_week["merchant_id"])):
+            session.add(ActivityBucket(kind=kind, subject_id=uuid.UUID(subject), hour=hour, votes=votes, comments=0))
+    session.commit()
+
+    order, activity, body = _trending(client, "24h")
+    assert order.index(commented["id"]) < order.index(voted["id"])
+    assert activity[commented["id"]] == {"votes": 1, "comments": 1, "score": 1 + trending.COMMENT_WEIGHT}
+    assert activity[voted["id"]] == {"votes": 2, "comments": 0, "score": 2}
+    assert last_week["id"] not in order
+    assert commented["merchant_id"] in {row["id"] for row in body["merchants"]}
+
+    order, activity, _ = _trending(client, "7d")
+    assert order.index(last_week["id"]) < order.index(commented["id"])
+    assert activity[last_week["id"]]["votes"] == 10  # the 9-day-old bucket is outside the window
+
+
+def test_withdrawn_vote_is_not_activity(client, seed, add_entry, vote, monkeypatch):
+    monkeypatch.setattr(trending, "TRENDING_REFRESH_SECONDS", 0)
+    (card,), (author, voter) = seed(cards=1, profiles=2)
+    entry = add_entry(author, card, "Trend Toggle")
+    vote(voter, entry["id"])
+    vote(voter, entry["id"])  # toggles it off
+    _, activity, _ = _trending(client, "24h")
+    assert activity[entry["id"]]["votes"] == 1
@@ -0,0 +1,17 @@
+from datetime import date, datetime, timedelta
+
+from app import trust
+from app.models import EntryStatus
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def test_old_transaction_date_lowers_score():
+    reported_today = trust.score(20, 1, EntryStatus.pending, None, None, NOW, NOW)
+    old_transaction = trust.score(20, 1, EntryStatus.pending, None, date(2026, 1, 1), NOW, NOW)
+    assert 0 < old_transaction < reported_today
+
+
+def test_verification_restarts_the_clock():
+    verified_today = trust.score(20, 1, EntryStatus.verified, NOW, date(2026, 1, 1), NOW - timedelta(days=200), NOW)
+    assert verified_today == trust.score(20, 1, EntryStatus.verified, None, None, NOW, NOW)